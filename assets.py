@@ -0,0 +1,48 @@
+import base64
+import io
+import os
+
+import streamlit as st
+
+# 中南大学Logo原图（本地图片路径）
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "WechatIMG250.jpg")
+
+
+# 生成指定尺寸的缩略图，透明背景按需铺白
+def _thumbnail(image_path, size, flatten=False):
+    from PIL import Image
+
+    image = Image.open(image_path)
+    image = image.resize((size, size), Image.LANCZOS)
+    if flatten and image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    return image
+
+
+# 编码WebP缩略图为data URI；以原图修改时间作为缓存键的一部分，原图更新后自动失效
+@st.cache_data(show_spinner=False)
+def _webp_data_uri(image_path, size, mtime):
+    buffer = io.BytesIO()
+    _thumbnail(image_path, size).save(buffer, format="WEBP", quality=85, method=6)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+# 压缩JPEG缩略图，返回字节
+@st.cache_data(show_spinner=False)
+def _jpeg_bytes(image_path, size, mtime):
+    buffer = io.BytesIO()
+    _thumbnail(image_path, size, flatten=True).save(buffer, format="JPEG", quality=85, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+# 页眉和侧边栏使用的小尺寸Logo（WebP），以data URI形式内嵌；跨会话缓存
+def logo_data_uri(image_path=LOGO_PATH, size=120):
+    return _webp_data_uri(image_path, size, os.path.getmtime(image_path))
+
+
+# 侧边栏展示图片（JPEG）；跨会话缓存
+def sidebar_image_bytes(image_path=LOGO_PATH, size=300):
+    return _jpeg_bytes(image_path, size, os.path.getmtime(image_path))
@@ -0,0 +1,125 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from features import RAW_COLUMNS, validate_ranges
+from inference import PROBA_COLUMNS, load_model_bundle, predict_batch
+
+# CSV中必须提供的原始参数列；比值列σθ/σc、σc/σt缺失时自动推导
+REQUIRED_COLUMNS = RAW_COLUMNS
+
+# 输出中追加的预测结果列
+RESULT_COLUMNS = ["prediction", "prediction_text"] + PROBA_COLUMNS
+
+# 默认每块行数
+DEFAULT_CHUNK_ROWS = 50000
+
+
+# 工作进程初始化：每个进程只加载并预热一次模型
+def init_worker():
+    try:
+        load_model_bundle()
+    except Exception as e:
+        print(f"无法加载模型，将使用备用模型: {e}", file=sys.stderr)
+
+
+# 评分一块数据：按输入控件的范围校验，无效行不送入模型，结果列留空
+def score_chunk(chunk):
+    start_time = time.perf_counter()
+    values, errors = validate_ranges(chunk)
+    valid = errors == ""
+
+    result = pd.DataFrame(index=chunk.index, columns=RESULT_COLUMNS)
+    degraded = False
+    if valid.any():
+        scored = predict_batch(values[valid], return_uncertainty=False)
+        scored.index = values.index[valid]
+        result = scored[RESULT_COLUMNS].reindex(chunk.index)
+        degraded = scored.attrs.get("degraded", False)
+    result["prediction"] = result["prediction"].astype("Int64")
+
+    # 输入列按读入的原文写回，只追加校验结果和预测列
+    output = pd.concat([chunk.assign(校验结果=errors.where(~valid, "有效")), result], axis=1)
+    return output, int((~valid).sum()), degraded, time.perf_counter() - start_time
+
+
+def score_csv(input_path, output_path, chunk_rows=DEFAULT_CHUNK_ROWS, workers=None, verbose=True):
+    """分块读取CSV、在进程池中评分并按原顺序逐块写出，内存占用与文件大小无关
+
+    同时在途的块数不超过工作进程数的两倍。返回 (总行数, 无效行数)。
+    """
+    workers = workers or os.cpu_count() or 1
+    # 全部按文本读入，输入列原样写回（如 50 不会变成 50.0），数值化只在校验时进行
+    reader = pd.read_csv(input_path, chunksize=chunk_rows, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    total_rows = 0
+    invalid_rows = 0
+    start_time = time.perf_counter()
+
+    def write(index, output, invalid, degraded, elapsed):
+        nonlocal total_rows, invalid_rows
+        output.to_csv(output_path, mode="w" if index == 0 else "a", header=index == 0,
+                      index=False, encoding="utf-8-sig" if index == 0 else "utf-8")
+        total_rows += len(output)
+        invalid_rows += invalid
+        if verbose:
+            note = "（备用模型）" if degraded else ""
+            print(f"块 {index}: {len(output)} 行, 无效 {invalid} 行, 用时 {elapsed:.2f}s, "
+                  f"{len(output) / max(elapsed, 1e-9):,.0f} 行/秒{note}", file=sys.stderr)
+
+    chunks = enumerate(reader)
+    first = next(chunks, None)
+    if first is None:
+        raise ValueError(f"输入文件为空: {input_path}")
+    missing = [col for col in REQUIRED_COLUMNS if col not in first[1].columns]
+    if missing:
+        raise ValueError(f"输入文件缺少必要的列: {missing}")
+
+    if workers == 1:
+        init_worker()
+        for index, chunk in _prepend(first, chunks):
+            write(index, *score_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            pending = deque()
+            for index, chunk in _prepend(first, chunks):
+                pending.append((index, executor.submit(score_chunk, chunk)))
+                # 在途块数有上限，按提交顺序写出已完成的块
+                while len(pending) >= workers * 2 or (pending and pending[0][1].done()):
+                    done_index, future = pending.popleft()
+                    write(done_index, *future.result())
+            while pending:
+                done_index, future = pending.popleft()
+                write(done_index, *future.result())
+
+    if verbose:
+        elapsed = time.perf_counter() - start_time
+        print(f"完成: {total_rows} 行 (无效 {invalid_rows} 行), 总用时 {elapsed:.1f}s, "
+              f"{total_rows / max(elapsed, 1e-9):,.0f} 行/秒 -> {output_path}", file=sys.stderr)
+    return total_rows, invalid_rows
+
+
+# 将已读取的首块放回迭代序列的开头
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+# 命令行：python batch_score.py 输入.csv 输出.csv [--chunk-rows N] [--workers N]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="分块、多进程评分岩石样本CSV文件")
+    parser.add_argument("input", help="输入CSV，需包含列: " + ", ".join(REQUIRED_COLUMNS))
+    parser.add_argument("output", help="输出CSV，在输入列之后追加校验结果、预测等级和各类别概率")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="每块行数")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认CPU核数，1表示单进程）")
+    args = parser.parse_args()
+
+    try:
+        score_csv(args.input, args.output, args.chunk_rows, args.workers)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,142 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+# 合批参数默认值，可通过环境变量覆盖：最长等待时间（毫秒）和单批最大行数
+DEFAULT_MAX_WAIT_MS = float(os.environ.get("ROCKBURST_BATCH_MAX_WAIT_MS", "2"))
+DEFAULT_MAX_BATCH = int(os.environ.get("ROCKBURST_BATCH_MAX_SIZE", "256"))
+
+# 批大小直方图的桶上界（行数），最后一个桶收纳更大的批
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+
+class _Request:
+    """等待合批执行的一次调用"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.done = threading.Event()
+        self.result = None
+        self.timings = None
+        self.error = None
+
+
+class MicroBatcher:
+    """跨线程的动态合批器
+
+    在 max_wait 秒内到达的请求（或累计达到 max_batch 行）合并为一次 predict_fn 调用，
+    再按行切分结果交还给各调用方。predict_fn 接收 (N, 列数) 数组和 timings 字典，返回行数相同的DataFrame。
+    """
+
+    def __init__(self, predict_fn, max_wait=DEFAULT_MAX_WAIT_MS / 1000.0, max_batch=DEFAULT_MAX_BATCH):
+        self.predict_fn = predict_fn
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        self.max_batch_rows = 0
+        self.histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    def submit(self, rows, timings=None):
+        """提交若干行并阻塞等待所在批次的结果；timings 累加该批次的特征构建和推理耗时"""
+        request = _Request(np.atleast_2d(np.asarray(rows, dtype=np.float64)))
+        self._ensure_worker()
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        if timings is not None:
+            for stage, seconds in request.timings.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+        return request.result
+
+    # 工作线程在首次提交时启动，守护线程随进程退出
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            n_rows = len(batch[0].rows)
+            deadline = time.monotonic() + self.max_wait
+            while n_rows < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                n_rows += len(request.rows)
+            self._execute(batch, n_rows)
+
+    # 执行一批请求：一次predict_fn调用，结果按各请求的行数切分
+    def _execute(self, batch, n_rows):
+        try:
+            self._score(batch)
+        finally:
+            self._record(len(batch), n_rows)
+            for request in batch:
+                request.done.set()
+
+    # 合批调用失败时二分重试，只有导致失败的请求收到异常，同批的其他调用方不受影响
+    def _score(self, batch):
+        timings = {}
+        try:
+            result = self.predict_fn(np.vstack([request.rows for request in batch]), timings)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].error = e
+                return
+            middle = len(batch) // 2
+            self._score(batch[:middle])
+            self._score(batch[middle:])
+        except BaseException as e:
+            for request in batch:
+                request.error = e
+        else:
+            offset = 0
+            for request in batch:
+                part = result.iloc[offset:offset + len(request.rows)].reset_index(drop=True)
+                part.attrs = dict(result.attrs)
+                request.result = part
+                request.timings = timings
+                offset += len(request.rows)
+
+    def _record(self, n_requests, n_rows):
+        with self._lock:
+            self.batches += 1
+            self.requests += n_requests
+            self.rows += n_rows
+            self.max_batch_rows = max(self.max_batch_rows, n_rows)
+            bucket = np.searchsorted(BATCH_SIZE_BUCKETS, n_rows)
+            self.histogram[bucket] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "rows": self.rows,
+                "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+                "mean_batch_requests": self.requests / self.batches if self.batches else 0.0,
+                "max_batch_rows": self.max_batch_rows,
+                "batch_rows_histogram": {
+                    (f"<={bound}" if i < len(BATCH_SIZE_BUCKETS) else f">{BATCH_SIZE_BUCKETS[-1]}"): count
+                    for i, (bound, count) in enumerate(zip(BATCH_SIZE_BUCKETS + [None], self.histogram))
+                },
+                "max_wait_ms": self.max_wait * 1000.0,
+                "max_batch": self.max_batch,
+            }
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# 仓库根目录，子进程在此目录下运行以便导入项目模块
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在全新子进程中执行的加载代码：{setup} 为需要的导入，{load} 为加载语句
+_PROBE = """
+import json, time
+def rss():
+    fields = {{}}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0]) / 1024.0
+    return fields
+before = rss()
+start = time.perf_counter()
+{setup}
+imported = time.perf_counter()
+model = {load}
+loaded = time.perf_counter()
+after = rss()
+print(json.dumps({{
+    "import_s": imported - start,
+    "load_s": loaded - imported,
+    "total_s": loaded - start,
+    "rss_mb": after["VmRSS"] - before["VmRSS"],
+    "anon_mb": after["RssAnon"] - before["RssAnon"],
+    "file_mb": after["RssFile"] - before["RssFile"],
+}}))
+"""
+
+
+# 在子进程中执行一次加载，返回耗时和常驻内存增量
+def probe(setup, load):
+    result = subprocess.run([sys.executable, "-c", _PROBE.format(setup=setup, load=load)],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(pickle_path, native_path, repeat=5):
+    """比较pickle、原生（内存映射）和原生（zlib压缩）三种模型文件的加载耗时与内存，各取耗时最短的一次"""
+    from tree_engine import TreeEngine
+
+    compressed_path = os.path.join(tempfile.mkdtemp(), "compressed" + os.path.splitext(native_path)[1])
+    TreeEngine.load(native_path).save(compressed_path, compress=True)
+
+    cases = {
+        "pickle (joblib.load)": ("import joblib", f"joblib.load({pickle_path!r})", pickle_path),
+        "native (mmap)": ("from tree_engine import TreeEngine", f"TreeEngine.load({native_path!r})", native_path),
+        "native (zlib)": ("from tree_engine import TreeEngine", f"TreeEngine.load({compressed_path!r})",
+                          compressed_path),
+    }
+    report = {}
+    for name, (setup, load, path) in cases.items():
+        runs = [probe(setup, load) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["total_s"])
+        best["file_kb"] = os.path.getsize(path) / 1024.0
+        report[name] = best
+    return report
+
+
+# 命令行：python benchmarks/artifact_load.py [--repeat N] [--json 输出文件]
+if __name__ == "__main__":
+    sys.path.insert(0, ROOT)
+    parser = argparse.ArgumentParser(description="比较pickle与原生模型文件的加载耗时和常驻内存")
+    parser.add_argument("--pickle", default=os.path.join(ROOT, "best_model_final.pkl"), help="pickle模型文件")
+    parser.add_argument("--native", default=os.path.join(ROOT, "best_model_final.rbtree"), help="原生模型文件")
+    parser.add_argument("--repeat", type=int, default=5, help="每种格式的测量次数，取最快一次")
+    parser.add_argument("--json", help="将测量结果写入JSON文件")
+    args = parser.parse_args()
+
+    report = run(args.pickle, args.native, args.repeat)
+    print(f"{'格式':<22}{'文件(KB)':>10}{'导入(ms)':>10}{'加载(ms)':>10}{'合计(ms)':>10}"
+          f"{'RSS(MB)':>10}{'匿名(MB)':>10}{'文件页(MB)':>12}")
+    for name, r in report.items():
+        print(f"{name:<22}{r['file_kb']:>10.0f}{r['import_s'] * 1000:>10.1f}{r['load_s'] * 1000:>10.1f}"
+              f"{r['total_s'] * 1000:>10.1f}{r['rss_mb']:>10.1f}{r['anon_mb']:>10.1f}{r['file_mb']:>12.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
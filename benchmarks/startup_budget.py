@@ -0,0 +1,78 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# 仓库根目录及默认的导入耗时预算文件
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+
+# 在全新子进程中以 -X importtime 导入模块，解析每个模块的累计导入耗时（微秒）
+def import_times(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            # 同一模块只会真正导入一次，保留首次记录
+            times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+# 重复测量取最小值，减少磁盘缓存和调度带来的抖动
+def measure(module, repeat):
+    runs = [import_times(module) for _ in range(repeat)]
+    best = min(runs, key=lambda times: times.get(module, 0))
+    return best.get(module, 0) / 1000.0, set(best)
+
+
+def check(budgets, repeat=5, verbose=True):
+    """逐个模块检查导入耗时和禁止的传递依赖，返回超出预算的问题列表"""
+    problems = []
+    report = {}
+    for module, budget in budgets.items():
+        elapsed_ms, loaded = measure(module, repeat)
+        forbidden = sorted(
+            name for name in budget.get("forbidden", [])
+            if name in loaded or any(m.startswith(name + ".") for m in loaded)
+        )
+        report[module] = {"import_ms": round(elapsed_ms, 1), "budget_ms": budget["max_ms"], "forbidden": forbidden}
+        if elapsed_ms > budget["max_ms"]:
+            problems.append(f"{module}: 导入耗时 {elapsed_ms:.1f}ms 超出预算 {budget['max_ms']}ms")
+        if forbidden:
+            problems.append(f"{module}: 导入了不应加载的模块 {', '.join(forbidden)}")
+        if verbose:
+            status = "超出预算" if elapsed_ms > budget["max_ms"] or forbidden else "OK"
+            print(f"{module:<20} {elapsed_ms:8.1f}ms / {budget['max_ms']}ms  {status}")
+    return problems, report
+
+
+# 命令行：python benchmarks/startup_budget.py [--repeat N] [--json 输出文件]
+# 任一模块超出预算或加载了禁止的依赖时以状态码1退出，可直接用于CI
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="检查各模块的冷启动导入耗时是否超出预算")
+    parser.add_argument("--budget", default=BUDGET_PATH, help="预算文件（JSON）")
+    parser.add_argument("--repeat", type=int, default=5, help="每个模块的测量次数，取最小值")
+    parser.add_argument("--json", help="将测量结果写入JSON文件")
+    args = parser.parse_args()
+
+    with open(args.budget, encoding="utf-8") as f:
+        budgets = json.load(f)
+    problems, report = check(budgets, args.repeat)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,300 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import runpy
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+# 仓库根目录；结果默认按提交写入 benchmarks/results/<提交>.json
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# 比较两次结果时，中位数变慢超过该比例视为回归
+REGRESSION_THRESHOLD = 1.25
+
+# 与界面默认参数一致的样本
+DEFAULT_INPUT = {
+    "rock_type": 1.0,
+    "sigma_theta": 50.0,
+    "sigma_c": 100.0,
+    "sigma_t": 10.0,
+    "sigma_theta_c_ratio": 0.5,
+    "sigma_c_t_ratio": 10.0,
+    "wet": 0.5,
+}
+
+# 已注册的基准：名称 -> (准备函数, 重复次数)；准备函数返回被测的无参函数
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=50):
+    def register(setup):
+        BENCHMARKS[name] = (setup, repeat)
+        return setup
+    return register
+
+
+# 汇总单次耗时（秒）
+def summarize(samples, **extra):
+    samples = sorted(samples)
+    result = {
+        "n": len(samples),
+        "min_s": samples[0],
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "p95_s": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+    result.update(extra)
+    return result
+
+
+# 先预热一次再重复计时
+def measure(func, repeat):
+    func()
+    samples = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start_time)
+    return samples
+
+
+# ---------------------------------------------------------------- 推理
+
+@benchmark("predict_locally", repeat=200)
+def bench_predict_locally():
+    """单样本预测（经合批器），分别记录特征构建、推理和其余开销（合批等待、结果组装）"""
+    from inference import predict_locally
+
+    stages = {"features": [], "inference": [], "other": []}
+
+    def run():
+        timings = {}
+        start_time = time.perf_counter()
+        predict_locally(DEFAULT_INPUT, timings)
+        total = time.perf_counter() - start_time
+        stages["features"].append(timings.get("features", 0.0))
+        stages["inference"].append(timings.get("inference", 0.0))
+        stages["other"].append(total - timings.get("features", 0.0) - timings.get("inference", 0.0))
+
+    def result(samples):
+        # 丢弃预热那一次的阶段耗时
+        return summarize(samples, stages={
+            stage: summarize(values[1:]) for stage, values in stages.items()
+        })
+
+    run.summarize = result
+    return run
+
+
+def _batch_benchmark(rows):
+    def setup():
+        from inference import predict_batch
+        from tree_engine import random_corpus
+
+        corpus = random_corpus(rows, seed=1)
+
+        def run():
+            predict_batch(corpus)
+
+        run.summarize = lambda samples: summarize(samples, rows=rows,
+                                                  rows_per_s=rows / statistics.median(samples))
+        return run
+    return setup
+
+
+benchmark("predict_batch[1]", repeat=200)(_batch_benchmark(1))
+benchmark("predict_batch[100]", repeat=50)(_batch_benchmark(100))
+benchmark("predict_batch[10000]", repeat=5)(_batch_benchmark(10000))
+
+
+def _feature_benchmark(rows):
+    def setup():
+        from inference import load_feature_plan
+        from tree_engine import random_corpus
+
+        plan = load_feature_plan()
+        corpus = random_corpus(rows, seed=1)
+
+        def run():
+            plan.transform(corpus)
+
+        run.summarize = lambda samples: summarize(samples, rows=rows, n_features=plan.n_features)
+        return run
+    return setup
+
+
+benchmark("feature_build[1]", repeat=200)(_feature_benchmark(1))
+benchmark("feature_build[1000]", repeat=20)(_feature_benchmark(1000))
+
+
+@benchmark("explain", repeat=50)
+def bench_explain():
+    """单样本TreeSHAP解释（不经缓存），解释器的路径编译在准备阶段完成"""
+    from features import COLUMN_MAPPING
+    from inference import load_explainer
+
+    explainer = load_explainer()
+    rows = [[DEFAULT_INPUT[key] for key in COLUMN_MAPPING]]
+
+    def run():
+        explainer.explain_base(rows)
+
+    run.summarize = lambda samples: summarize(samples, leaves=int(explainer.path_features.shape[0]),
+                                              depth=explainer.depth)
+    return run
+
+
+# ---------------------------------------------------------------- 图表
+
+def _chart_benchmark(builder_name, *args):
+    def setup():
+        import charts
+
+        builder = getattr(charts, builder_name)
+        return lambda: builder(*args)
+    return setup
+
+
+_PROBABILITIES = {"Class 0": 0.05, "Class 1": 0.1, "Class 2": 0.25, "Class 3": 0.6}
+benchmark("chart.create_risk_gauge", repeat=30)(_chart_benchmark("create_risk_gauge", 3, "强岩爆倾向"))
+benchmark("chart.create_probability_chart", repeat=30)(
+    _chart_benchmark("create_probability_chart", _PROBABILITIES))
+benchmark("chart.create_parameter_impact_radar", repeat=30)(
+    _chart_benchmark("create_parameter_impact_radar", DEFAULT_INPUT))
+benchmark("chart.create_grade_distribution_pie", repeat=30)(
+    _chart_benchmark("create_grade_distribution_pie", DEFAULT_INPUT))
+benchmark("chart.create_correlation_heatmap", repeat=30)(
+    _chart_benchmark("create_correlation_heatmap", DEFAULT_INPUT))
+
+
+# ---------------------------------------------------------------- 整页重新运行
+
+@benchmark("app_rerun", repeat=5)
+def bench_app_rerun():
+    """提交表单后整页重新运行一次 streamlit_app.py
+
+    有 streamlit.testing（Streamlit ≥ 1.28）时用 AppTest 点击提交按钮；
+    否则以裸模式执行脚本并让表单提交按钮返回True，二者都覆盖完整的预测、敏感性分析和图表渲染。
+    """
+    script = os.path.join(ROOT, "streamlit_app.py")
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        AppTest = None
+
+    if AppTest is not None:
+        def run():
+            app = AppTest.from_file(script, default_timeout=60).run()
+            app.button[0].click().run()
+        mode = "apptest"
+    else:
+        import streamlit as st
+
+        st.form_submit_button = lambda *args, **kwargs: True
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                runpy.run_path(script, run_name="__main__")
+        mode = "bare"
+
+    run.summarize = lambda samples: summarize(samples, mode=mode)
+    return run
+
+
+# ---------------------------------------------------------------- 运行与比较
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _metadata():
+    import numpy
+    import sklearn
+
+    from model_registry import BACKEND
+
+    # 只运行推理类基准时不需要Streamlit，未安装时版本记为None
+    try:
+        import streamlit
+    except ImportError:
+        streamlit = None
+
+    return {
+        "commit": _git_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "sklearn": sklearn.__version__,
+        "streamlit": streamlit.__version__ if streamlit is not None else None,
+        "backend": BACKEND,
+    }
+
+
+def run(names=None, repeat_scale=1.0, verbose=True):
+    """运行选中的基准，返回 {"meta": ..., "results": {名称: 统计}}"""
+    warnings.filterwarnings("ignore")
+    results = {}
+    for name, (setup, repeat) in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        func = setup()
+        samples = measure(func, max(1, int(repeat * repeat_scale)))
+        results[name] = getattr(func, "summarize", summarize)(samples)
+        if verbose:
+            print(f"{name:<40} 中位数 {results[name]['median_s'] * 1000:10.3f} ms  "
+                  f"(最小 {results[name]['min_s'] * 1000:.3f} ms, n={results[name]['n']})")
+    return {"meta": _metadata(), "results": results}
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """按中位数比较两次结果，返回变慢超过阈值的基准列表"""
+    regressions = []
+    print(f"{'基准':<40}{'基线(ms)':>12}{'当前(ms)':>12}{'比值':>8}")
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["median_s"]
+        ratio = result["median_s"] / before if before else float("inf")
+        flag = "  回归" if ratio > threshold else ""
+        print(f"{name:<40}{before * 1000:>12.3f}{result['median_s'] * 1000:>12.3f}{ratio:>8.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+# 命令行：python benchmarks/suite.py [-k 名称片段 ...] [--compare 基线.json]
+# 结果写入 benchmarks/results/<提交>.json；与基线比较时任一基准回归则以状态码1退出
+if __name__ == "__main__":
+    sys.path.insert(0, ROOT)
+    parser = argparse.ArgumentParser(description="岩爆预测系统性能基准")
+    parser.add_argument("-k", dest="names", nargs="*", help="只运行名称包含这些片段的基准")
+    parser.add_argument("--quick", action="store_true", help="重复次数减为十分之一")
+    parser.add_argument("--output", help="结果JSON路径（默认 benchmarks/results/<提交>.json）")
+    parser.add_argument("--compare", help="与该基线结果比较")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="回归判定的中位数比值")
+    args = parser.parse_args()
+
+    report = run(args.names, 0.1 if args.quick else 1.0)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,323 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+
+import numpy as np
+
+from features import COLUMN_MAPPING, RAW_COLUMNS, ROCK_TYPES
+
+# 历史案例数据集（CSV或Parquet，列名与批量评分相同），可通过环境变量指定
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CASES_PATH = os.environ.get("ROCKBURST_CASES", os.path.join(ROOT, "data", "cases.csv"))
+
+# 首次统计时每次读入的行数，内存占用与数据集大小无关
+CASE_CHUNK_ROWS = 50_000
+
+# 参与相关性统计的参数（与热图坐标轴 CORRELATION_NAMES 的顺序一致）
+CORRELATION_KEYS = ['sigma_theta', 'sigma_c', 'sigma_t', 'sigma_theta_c_ratio', 'sigma_c_t_ratio', 'wet']
+
+# 计算相关系数所需的最少案例数
+MIN_CASES = 3
+
+# 统计快照文件格式；快照与数据集同目录，记录已读取到的位置，进程重启后只需读取新增部分
+SNAPSHOT_FORMAT = "case-stats/1"
+SNAPSHOT_SUFFIX = ".stats.json"
+
+# 校验数据集未被改写时比对的文件头字节数
+HEAD_BYTES = 65536
+
+
+class CovarianceAccumulator:
+    """流式均值和协方差（Welford算法）；整批数据先求批内统计量，再按Chan等人的公式合并"""
+
+    def __init__(self, n_features, count=0, mean=None, comoment=None):
+        self.count = int(count)
+        self.mean = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+        self.comoment = (np.zeros((n_features, n_features)) if comoment is None
+                         else np.asarray(comoment, dtype=np.float64))
+
+    def add(self, x):
+        """加入一个样本，O(特征数²)"""
+        x = np.asarray(x, dtype=np.float64)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.comoment += np.outer(delta, x - self.mean)
+
+    def add_batch(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if len(X):
+            mean = X.mean(axis=0)
+            centered = X - mean
+            self.merge(len(X), mean, centered.T @ centered)
+
+    def merge(self, count, mean, comoment):
+        total = self.count + count
+        delta = mean - self.mean
+        self.comoment += comoment + np.outer(delta, delta) * (self.count * count / total)
+        self.mean += delta * (count / total)
+        self.count = total
+
+    def correlation(self):
+        """Pearson相关系数矩阵；样本不足或方差为0的参数对应的行列为NaN"""
+        if self.count < MIN_CASES:
+            return None
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = self.comoment / np.outer(std, std)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return np.clip(corr, -1.0, 1.0)
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean.tolist(), "comoment": self.comoment.tolist()}
+
+
+# 将原始参数列转换为相关性统计的参数矩阵，返回 (岩石种类编码, 参数矩阵)；缺值或强度不为正的行被丢弃
+def case_matrix(frame):
+    import pandas as pd
+
+    missing = [column for column in RAW_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"案例数据缺少必要的列: {missing}")
+
+    rock = frame[COLUMN_MAPPING['rock_type']]
+    codes = pd.to_numeric(rock, errors="coerce").fillna(rock.map(ROCK_TYPES)).to_numpy(dtype=np.float64)
+    raw = {key: pd.to_numeric(frame[COLUMN_MAPPING[key]], errors="coerce").to_numpy(dtype=np.float64)
+           for key in ['sigma_theta', 'sigma_c', 'sigma_t', 'wet']}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw['sigma_theta_c_ratio'] = raw['sigma_theta'] / raw['sigma_c']
+        raw['sigma_c_t_ratio'] = raw['sigma_c'] / raw['sigma_t']
+    values = np.column_stack([raw[key] for key in CORRELATION_KEYS])
+    valid = np.isfinite(values).all(axis=1) & (raw['sigma_c'] > 0) & (raw['sigma_t'] > 0)
+    return codes[valid], values[valid]
+
+
+class CaseStatistics:
+    """全部案例及按岩石种类分组的协方差累加器
+
+    每次更新后重新计算各分组的相关系数矩阵（分组数 × 特征数²，与案例数无关），页面按岩石种类直接取用。
+    source 记录统计对应的数据集状态（大小、修改时间、已读取的字节位置和文件头摘要）。
+    """
+
+    def __init__(self):
+        self.groups = {None: CovarianceAccumulator(len(CORRELATION_KEYS))}
+        self.source = None
+        self.version = 0
+        self._views = {}
+
+    def _group(self, rock_type):
+        if rock_type not in self.groups:
+            self.groups[rock_type] = CovarianceAccumulator(len(CORRELATION_KEYS))
+        return self.groups[rock_type]
+
+    def _rebuild_views(self):
+        self._views = {rock_type: acc.correlation() for rock_type, acc in self.groups.items()}
+        self.version += 1
+
+    def add_rows(self, rock_types, values):
+        """加入一批案例（case_matrix 的输出）"""
+        self.groups[None].add_batch(values)
+        known = np.isin(rock_types, list(ROCK_TYPES.values()))
+        for rock_type in np.unique(rock_types[known]):
+            self._group(float(rock_type)).add_batch(values[rock_types == rock_type])
+
+    def add_case(self, case):
+        """加入一个案例（输入参数字典），只更新全部案例和该岩石种类两个累加器"""
+        x = [case[key] for key in CORRELATION_KEYS]
+        self.groups[None].add(x)
+        if float(case['rock_type']) in ROCK_TYPES.values():
+            self._group(float(case['rock_type'])).add(x)
+        self._rebuild_views()
+
+    def count(self, rock_type=None):
+        acc = self.groups.get(rock_type)
+        return acc.count if acc is not None else 0
+
+    def correlation(self, rock_type=None):
+        """预先计算好的相关系数矩阵；该分组案例不足时返回None"""
+        return self._views.get(rock_type)
+
+    # ------------------------------------------------------------ 与数据集同步
+
+    def refresh(self, path, stat=None):
+        """使统计与数据集一致，返回是否有变化
+
+        CSV只在末尾追加时从上次读取的位置继续读取新增的完整行；文件被改写或为Parquet时分块重新统计。
+        """
+        stat = stat or os.stat(path)
+        source = self.source
+        if source and source["path"] == path and (source["size"], source["mtime_ns"]) == (stat.st_size,
+                                                                                         stat.st_mtime_ns):
+            return False
+
+        is_csv = not path.lower().endswith(".parquet")
+        appended = (is_csv and source is not None and source["path"] == path
+                    and stat.st_size >= source["offset"] and _head_digest(path, source["offset"]) == source["head"])
+        if appended:
+            offset = self._read_tail(path, source["offset"], source["columns"])
+            columns = source["columns"]
+        else:
+            self.groups = {None: CovarianceAccumulator(len(CORRELATION_KEYS))}
+            offset, columns = self._scan(path) if is_csv else self._scan_parquet(path)
+
+        self.source = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "offset": offset,
+                       "columns": columns, "head": _head_digest(path, offset)}
+        self._rebuild_views()
+        return True
+
+    def _scan(self, path):
+        import pandas as pd
+
+        with open(path, "rb") as f:
+            end = _last_line_end(f)
+            header = f.readline()
+        columns = [str(column) for column in pd.read_csv(io.BytesIO(header), encoding="utf-8-sig", nrows=0).columns]
+        return self._read_tail(path, len(header), columns, end), columns
+
+    def _read_tail(self, path, offset, columns, end=None):
+        """读取 [offset, 最后一个完整行) 之间的数据行，按块加入统计，返回新的读取位置"""
+        import pandas as pd
+
+        with open(path, "rb") as f:
+            end = _last_line_end(f) if end is None else end
+            f.seek(offset)
+            if end <= offset:
+                return offset
+            reader = pd.read_csv(io.BufferedReader(_BoundedReader(f, end - offset)), header=None, names=columns,
+                                 chunksize=CASE_CHUNK_ROWS, encoding="utf-8")
+            for chunk in reader:
+                self.add_rows(*case_matrix(chunk))
+        return end
+
+    def _scan_parquet(self, path):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=CASE_CHUNK_ROWS, columns=RAW_COLUMNS):
+            self.add_rows(*case_matrix(batch.to_pandas()))
+        return os.path.getsize(path), RAW_COLUMNS
+
+    # ------------------------------------------------------------ 快照
+
+    def to_dict(self):
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "keys": CORRELATION_KEYS,
+            "source": self.source,
+            "groups": [[rock_type, acc.to_dict()] for rock_type, acc in self.groups.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("format") != SNAPSHOT_FORMAT or data.get("keys") != CORRELATION_KEYS:
+            raise ValueError("统计快照格式不匹配")
+        stats = cls()
+        stats.groups = {rock_type: CovarianceAccumulator(len(CORRELATION_KEYS), **acc)
+                        for rock_type, acc in data["groups"]}
+        stats.source = data["source"]
+        stats._rebuild_views()
+        return stats
+
+
+# 只向pandas暴露文件中指定长度的字节，避免读到正在写入的半行
+class _BoundedReader(io.RawIOBase):
+    def __init__(self, f, remaining):
+        self._f = f
+        self._remaining = remaining
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._f.read(min(len(buffer), self._remaining))
+        self._remaining -= len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+# 文件中最后一个换行符之后的位置（即完整行的末尾）
+def _last_line_end(f, block=65536):
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    while position > 0:
+        start = max(0, position - block)
+        f.seek(start)
+        data = f.read(position - start)
+        newline = data.rfind(b"\n")
+        if newline >= 0:
+            f.seek(0)
+            return start + newline + 1
+        position = start
+    f.seek(0)
+    return 0
+
+
+# 文件头（至多 HEAD_BYTES 字节、不超过已读取位置）的摘要，用于判断数据集是否只是在末尾追加
+def _head_digest(path, offset):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(min(offset, HEAD_BYTES))).hexdigest()
+
+
+def snapshot_path(path):
+    return path + SNAPSHOT_SUFFIX
+
+
+# 进程内共享的统计（按数据集路径），由 load_case_statistics 维护
+_STATS = {}
+_STATS_LOCK = threading.Lock()
+
+
+def load_case_statistics(path=None):
+    """返回与数据集一致的案例统计，数据集不存在时返回None
+
+    每次调用只检查一次文件大小和修改时间；进程内首次使用时优先读取统计快照，
+    数据集有追加时只读取新增的行，统计变化后写回快照（目录不可写时跳过）。
+    """
+    path = path or CASES_PATH
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    with _STATS_LOCK:
+        stats = _STATS.get(path)
+        if stats is None:
+            stats = CaseStatistics()
+            try:
+                with open(snapshot_path(path), encoding="utf-8") as f:
+                    stats = CaseStatistics.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        if stats.refresh(path, stat):
+            try:
+                tmp_path = snapshot_path(path) + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(stats.to_dict(), f, ensure_ascii=False)
+                os.replace(tmp_path, snapshot_path(path))
+            except OSError:
+                pass
+        _STATS[path] = stats
+        return stats
+
+
+# 命令行：python case_stats.py [数据集] [--rock-type 编码] —— 更新统计快照并输出相关系数矩阵
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="案例数据集的增量相关性统计")
+    parser.add_argument("path", nargs="?", default=CASES_PATH, help="案例数据集（CSV或Parquet）")
+    parser.add_argument("--rock-type", type=float, default=None, help="只看该岩石种类编码的案例")
+    args = parser.parse_args()
+
+    stats = load_case_statistics(args.path)
+    if stats is None:
+        raise SystemExit(f"找不到案例数据集: {args.path}")
+    print(f"案例数: 全部 {stats.count()}，"
+          + "，".join(f"{code:g}: {stats.count(code)}" for code in sorted(k for k in stats.groups if k is not None)))
+    corr = stats.correlation(args.rock_type)
+    if corr is None:
+        raise SystemExit(f"该分组案例不足 {MIN_CASES} 个")
+    print(" " * 22 + "".join(f"{key[:10]:>11}" for key in CORRELATION_KEYS))
+    for key, row in zip(CORRELATION_KEYS, corr):
+        print(f"{key:<22}" + "".join(f"{value:>11.3f}" for value in row))
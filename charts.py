@@ -0,0 +1,670 @@
+import argparse
+import functools
+import threading
+import time
+
+import metrics
+
+# 岩爆等级名称及配色（按等级0~3排列）
+GRADE_NAMES = ["无岩爆倾向", "弱岩爆倾向", "中等岩爆倾向", "强岩爆倾向"]
+GRADE_COLORS = ['#10B981', '#F59E0B', '#EA580C', '#DC2626']
+
+# 仪表盘各等级的指针颜色和阈值线颜色
+GAUGE_COLORS = {
+    0: ['#4ADE80', '#10B981'],  # 绿色 - 无风险
+    1: ['#FBBF24', '#F59E0B'],  # 黄色 - 低风险
+    2: ['#FB923C', '#EA580C'],  # 橙色 - 中风险
+    3: ['#F87171', '#DC2626']   # 红色 - 高风险
+}
+
+# 雷达图和热图的参数名称
+IMPACT_CATEGORIES = ['围岩应力', '单轴抗压强度', '抗拉强度',
+                     '围岩应力/单轴抗压强度比', '单轴抗压强度/抗拉强度比', '含水率']
+CORRELATION_NAMES = ["围岩应力", "单轴抗压强度", "抗拉强度", "σθ/σc", "σc/σt", "含水率"]
+
+# 未传入参数时显示的默认数据
+DEFAULT_IMPACT = [0.85, 0.78, 0.62, 0.91, 0.76, 0.58]
+DEFAULT_DISTRIBUTION = [45, 30, 18, 7]
+DEFAULT_CORRELATION = [
+    [1.00, 0.35, 0.42, 0.85, -0.28, 0.18],
+    [0.35, 1.00, 0.65, 0.25, 0.72, -0.15],
+    [0.42, 0.65, 1.00, 0.48, 0.56, 0.08],
+    [0.85, 0.25, 0.48, 1.00, -0.12, 0.22],
+    [-0.28, 0.72, 0.56, -0.12, 1.00, -0.05],
+    [0.18, -0.15, 0.08, 0.22, -0.05, 1.00]
+]
+
+# 各图表共用的透明背景和字体
+BASE_LAYOUT = dict(
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    font=dict(family="Inter, sans-serif"),
+)
+
+
+def template(func):
+    """图表模板：首次调用时用plotly构建完整图表（布局、配色、px生成的轨迹），之后只返回缓存的图表字典
+
+    每次请求由 _from_template 复制模板并替换轨迹中的数据数组，不再重复执行 update_layout 和 px 的处理流程。
+    缓存的布局去掉了plotly主题（layout.template）：新建图表时自动套用同一默认主题，避免每次校验整套主题。
+    """
+    @functools.lru_cache(maxsize=None)
+    @functools.wraps(func)
+    def cached(*args):
+        spec = func(*args).to_dict()
+        spec["layout"].pop("template", None)
+        return spec
+
+    return cached
+
+
+# 由模板生成新图表：patches[i] 为第i条轨迹需要替换的字段；布局由go.Figure复制，模板本身不会被修改
+def _from_template(spec, patches, layout=None):
+    import plotly.graph_objects as go
+
+    data = [dict(trace, **patch) for trace, patch in zip(spec["data"], patches)]
+    return go.Figure({"data": data, "layout": dict(spec["layout"], **(layout or {}))})
+
+
+# ---------------------------------------------------------------- 风险仪表盘
+
+# 构建单个等级的仪表盘
+def _build_risk_gauge(risk_level, risk_text):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number+delta",
+        value = risk_level,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': risk_text, 'font': {'size': 24, 'color': '#1E293B', 'family': 'Inter'}},
+        delta = {'reference': 0, 'increasing': {'color': "#FF4560"}},
+        gauge = {
+            'axis': {'range': [0, 3], 'tickwidth': 1, 'tickcolor': "#334155"},
+            'bar': {'color': GAUGE_COLORS[risk_level][0]},
+            'bgcolor': "white",
+            'borderwidth': 2,
+            'bordercolor': "#E2E8F0",
+            'steps': [
+                {'range': [0, 0.75], 'color': '#D1FAE5'},
+                {'range': [0.75, 1.5], 'color': '#FEF9C3'},
+                {'range': [1.5, 2.25], 'color': '#FFEDD5'},
+                {'range': [2.25, 3], 'color': '#FEE2E2'}
+            ],
+            'threshold': {
+                'line': {'color': GAUGE_COLORS[risk_level][1], 'width': 4},
+                'thickness': 0.75,
+                'value': risk_level
+            }
+        }
+    ))
+
+    fig.update_layout(
+        height = 300,
+        margin = dict(l=20, r=20, t=50, b=20),
+        **BASE_LAYOUT
+    )
+
+    return fig
+
+
+# 仪表盘只有四种状态，首次使用时一次性全部构建
+_gauge_lock = threading.Lock()
+_gauges = {}
+
+
+def _precomputed_gauges():
+    if not _gauges:
+        with _gauge_lock:
+            if not _gauges:
+                _gauges.update({(level, GRADE_NAMES[level]): _build_risk_gauge(level, GRADE_NAMES[level])
+                                for level in GAUGE_COLORS})
+    return _gauges
+
+
+# 创建自定义岩爆风险可视化函数
+@metrics.timed("figure.create_risk_gauge")
+def create_risk_gauge(risk_level, risk_text):
+    """返回预先构建的仪表盘；该对象在会话间共享，调用方只能读取（st.plotly_chart不会修改图表）"""
+    gauge = _precomputed_gauges().get((risk_level, risk_text))
+    return gauge if gauge is not None else _build_risk_gauge(risk_level, risk_text)
+
+
+# ---------------------------------------------------------------- 概率柱状图
+
+@template
+def _probability_template():
+    import pandas as pd
+    import plotly.express as px
+
+    data = pd.DataFrame({
+        "岩爆等级": GRADE_NAMES,
+        "概率": [0.0] * len(GRADE_NAMES)
+    })
+
+    fig = px.bar(
+        data,
+        x="岩爆等级",
+        y="概率",
+        color="岩爆等级",
+        color_discrete_map=dict(zip(GRADE_NAMES, GRADE_COLORS)),
+        text_auto=True
+    )
+
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=30, b=20),
+        xaxis=dict(
+            title=None,
+            showgrid=False
+        ),
+        yaxis=dict(
+            title="预测概率",
+            showgrid=True,
+            gridcolor='#E2E8F0',
+            range=[0, 1]
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5
+        ),
+        **BASE_LAYOUT
+    )
+
+    fig.update_traces(
+        marker_line_width=0,
+        texttemplate='%{y:.1%}',
+        textposition='outside'
+    )
+
+    return fig
+
+
+# 叠加对比的历史结果使用的线型
+OVERLAY_DASHES = ["dot", "dash", "dashdot", "longdash", "longdashdot"]
+
+
+# 创建岩爆概率分布图：每个等级一条轨迹，只替换柱高
+@metrics.timed("figure.create_probability_chart")
+def create_probability_chart(probabilities, overlays=None, uncertainty=None):
+    """overlays 为 [(名称, 各类别概率序列), ...]，以折线叠加在柱状图上用于对比历史结果
+
+    uncertainty 为predict_locally返回的树间分歧统计，给出时以误差线显示各类别概率的95%置信区间，
+    悬停提示中附带树间标准差和投票比例。
+    """
+    patches = [{"y": [probabilities.get(f"Class {i}", 0)]} for i in range(len(GRADE_NAMES))]
+    if uncertainty:
+        for i, patch in enumerate(patches):
+            key, value = f"Class {i}", patch["y"][0]
+            patch["error_y"] = {
+                "type": "data",
+                "symmetric": False,
+                "array": [uncertainty["ci_high"][key] - value],
+                "arrayminus": [value - uncertainty["ci_low"][key]],
+                "color": "#334155",
+                "thickness": 1.5,
+                "width": 6,
+            }
+            patch["customdata"] = [[uncertainty["ci_low"][key], uncertainty["ci_high"][key],
+                                    uncertainty["std"][key], uncertainty["vote"][key]]]
+            patch["hovertemplate"] = ("%{x}: %{y:.1%}<br>95%置信区间: %{customdata[0]:.1%} ~ %{customdata[1]:.1%}"
+                                      "<br>树间标准差: %{customdata[2]:.3f}<br>投票比例: %{customdata[3]:.1%}"
+                                      "<extra></extra>")
+    fig = _from_template(_probability_template(), patches)
+    if overlays:
+        fig.add_traces([
+            {
+                "type": "scatter",
+                "x": GRADE_NAMES,
+                "y": list(values),
+                "name": name,
+                "mode": "lines+markers",
+                "line": {"color": "#475569", "width": 1.5, "dash": OVERLAY_DASHES[i % len(OVERLAY_DASHES)]},
+                "marker": {"size": 7},
+                "hovertemplate": "%{x}: %{y:.1%}<extra>" + name + "</extra>",
+            }
+            for i, (name, values) in enumerate(overlays)
+        ])
+    return fig
+
+
+# ---------------------------------------------------------------- 参数影响雷达图
+
+# 根据输入参数计算各参数的影响度
+def parameter_impact(input_data=None):
+    if not input_data:
+        return list(DEFAULT_IMPACT)
+
+    # 提取输入参数
+    sigma_theta = input_data.get('sigma_theta', 100)  # 围岩应力
+    sigma_c = input_data.get('sigma_c', 150)          # 单轴抗压强度
+    sigma_t = input_data.get('sigma_t', 20)           # 抗拉强度
+    sigma_theta_c_ratio = input_data.get('sigma_theta_c_ratio', 0.6)  # 围岩应力/单轴抗压强度比
+    sigma_c_t_ratio = input_data.get('sigma_c_t_ratio', 7.5)          # 单轴抗压强度/抗拉强度比
+    wet = input_data.get('wet', 0.5)                  # 含水率
+
+    # 围岩应力影响度：围岩应力越高，岩爆风险越大
+    stress_impact = min(0.3 + (sigma_theta / 200) * 0.7, 1.0)
+
+    # 抗压强度影响度：抗压强度越低，岩爆风险越大
+    strength_impact = min(0.3 + ((300 - sigma_c) / 280) * 0.7, 1.0)
+
+    # 抗拉强度影响度：抗拉强度越低，岩爆风险越大
+    tensile_impact = min(0.3 + ((50 - sigma_t) / 49) * 0.7, 1.0)
+
+    # 应力/抗压比影响度：比值越大，岩爆风险越大
+    stress_ratio_impact = min(sigma_theta_c_ratio * 0.9, 1.0)
+
+    # 抗压/抗拉比影响度：比值越大，岩爆风险越大
+    strength_ratio_impact = min((sigma_c_t_ratio / 15) * 0.8, 1.0)
+
+    # 含水率影响度：含水率对岩爆的影响（支持0-100范围的值）
+    wet_normalized = min(wet / 100, 1.0)  # 归一化含水率，最大参考值为100
+    wet_impact = min(wet_normalized * 0.6, 0.6)
+
+    return [stress_impact, strength_impact, tensile_impact,
+            stress_ratio_impact, strength_ratio_impact, wet_impact]
+
+
+@template
+def _radar_template():
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatterpolar(
+        r=DEFAULT_IMPACT,
+        theta=IMPACT_CATEGORIES,
+        fill='toself',
+        fillcolor='rgba(59, 130, 246, 0.2)',
+        line=dict(color='#3B82F6', width=2),
+        name='参数影响度'
+    ))
+
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 1]
+            ),
+            angularaxis=dict(
+                showline=False,
+                showticklabels=True,
+            )
+        ),
+        height=350,
+        margin=dict(l=40, r=40, t=30, b=40),
+        showlegend=False,
+        **BASE_LAYOUT
+    )
+
+    return fig
+
+
+# 雷达图各轴对应的输入参数（岩石种类为类别变量，不在雷达图上显示）
+IMPACT_KEYS = ['sigma_theta', 'sigma_c', 'sigma_t', 'sigma_theta_c_ratio', 'sigma_c_t_ratio', 'wet']
+
+# SHAP贡献推高、降低预测概率时的标记颜色
+SHAP_COLORS = {True: "#DC2626", False: "#10B981"}
+
+
+# 创建参数影响雷达图
+@metrics.timed("figure.create_parameter_impact_radar")
+def create_parameter_impact_radar(input_data=None, contributions=None):
+    """contributions 为各参数对预测等级概率的SHAP贡献 {参数: 数值}，给出时半径为贡献的绝对值，
+    红色标记表示推高、绿色表示降低该等级的概率；未给出时使用按经验公式估计的影响度"""
+    spec = _radar_template()
+    if not contributions:
+        return _from_template(spec, [{"r": parameter_impact(input_data)}])
+
+    values = [contributions[key] for key in IMPACT_KEYS]
+    top = max(max(abs(value) for value in values), 0.01) * 1.15
+    patch = {
+        "r": [abs(value) for value in values],
+        "customdata": values,
+        "name": "SHAP贡献",
+        "mode": "lines+markers",
+        "marker": {"color": [SHAP_COLORS[value > 0] for value in values], "size": 9},
+        "hovertemplate": "%{theta}: %{customdata:+.1%}<extra></extra>",
+    }
+    polar = spec["layout"]["polar"]
+    polar = dict(polar, radialaxis=dict(polar["radialaxis"], range=[0, top], tickformat=".0%"))
+    return _from_template(spec, [patch], {"polar": polar})
+
+
+# ---------------------------------------------------------------- 等级分布饼图
+
+# 根据输入参数估计各岩爆等级所占的百分比
+def grade_distribution(input_data=None):
+    if not input_data:
+        return list(DEFAULT_DISTRIBUTION)
+
+    # 提取输入参数
+    sigma_theta = input_data.get('sigma_theta', 100)  # 围岩应力
+    sigma_c = input_data.get('sigma_c', 150)          # 单轴抗压强度
+    sigma_theta_c_ratio = input_data.get('sigma_theta_c_ratio', 0.6)  # 围岩应力/单轴抗压强度比
+    wet = input_data.get('wet', 0.5)                  # 含水率
+
+    # 归一化含水率用于计算（允许大于1的值）
+    wet_norm = min(wet / 100, 1.0)  # 假设最大参考值为100
+
+    # 围岩应力高，抗压强度低，比值大，岩爆风险更高
+    no_burst = max(0, min(60, 60 - (sigma_theta / 4) + (sigma_c / 10)))
+    weak_burst = max(0, min(50, 30 + (sigma_theta / 10) - (sigma_c / 15)))
+    medium_burst = max(0, min(40, 10 + (sigma_theta / 8) - (sigma_c / 20) + (sigma_theta_c_ratio * 10)))
+    strong_burst = max(0, min(30, (sigma_theta / 10) - (sigma_c / 30) + (sigma_theta_c_ratio * 20) + (wet_norm * 5)))
+
+    # 归一化使总和为100
+    total = no_burst + weak_burst + medium_burst + strong_burst
+    factor = 100 / total if total > 0 else 1
+    return [round(value * factor) for value in (no_burst, weak_burst, medium_burst, strong_burst)]
+
+
+@template
+def _pie_template():
+    import pandas as pd
+    import plotly.express as px
+
+    pie_data = pd.DataFrame({
+        "岩爆等级": GRADE_NAMES,
+        "样本数量": DEFAULT_DISTRIBUTION
+    })
+
+    pie_fig = px.pie(
+        pie_data,
+        names="岩爆等级",
+        values="样本数量",
+        color="岩爆等级",
+        color_discrete_map=dict(zip(GRADE_NAMES, GRADE_COLORS))
+    )
+
+    pie_fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=20, b=30),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.15,
+            xanchor="center",
+            x=0.5
+        ),
+        **BASE_LAYOUT
+    )
+
+    pie_fig.update_traces(
+        textinfo="percent+label",
+        hole=0.4,
+        marker=dict(line=dict(color='#ffffff', width=2))
+    )
+
+    return pie_fig
+
+
+# 创建岩爆等级分布饼图
+@metrics.timed("figure.create_grade_distribution_pie")
+def create_grade_distribution_pie(input_data=None):
+    return _from_template(_pie_template(), [{"values": grade_distribution(input_data)}])
+
+
+# ---------------------------------------------------------------- 参数相关性热图
+
+# 根据输入参数生成示意性的相关系数矩阵
+def correlation_matrix(input_data=None):
+    import numpy as np
+
+    if not input_data:
+        return np.array(DEFAULT_CORRELATION)
+
+    # 提取输入参数
+    sigma_theta = input_data.get('sigma_theta', 100)      # 围岩应力
+    sigma_t = input_data.get('sigma_t', 20)               # 抗拉强度
+    sigma_theta_c_ratio = input_data.get('sigma_theta_c_ratio', 0.6)  # 围岩应力/单轴抗压强度比
+    sigma_c_t_ratio = input_data.get('sigma_c_t_ratio', 7.5)          # 单轴抗压强度/抗拉强度比
+    wet = input_data.get('wet', 0.5)                      # 含水率
+
+    # 归一化含水率用于计算相关性（允许大于1的值）
+    wet_norm = min(wet / 100, 1.0)  # 假设最大参考值为100
+
+    # 上三角各元素：(行, 列, 相关系数)
+    pairs = [
+        (0, 1, -0.2 - (sigma_theta / 1000)),         # 围岩应力与抗压强度：轻微负相关
+        (0, 2, -0.15 - (sigma_theta / 1000)),        # 围岩应力与抗拉强度：轻微负相关
+        (0, 3, 0.8 + (sigma_theta_c_ratio / 10)),    # 围岩应力与应力比：强正相关
+        (0, 4, -0.3 + wet_norm),                     # 围岩应力与强度比：中等负相关
+        (0, 5, 0.1 + wet_norm / 2),                  # 围岩应力与含水率：弱正相关
+        (1, 2, 0.6 + (sigma_t / 100)),               # 抗压强度与抗拉强度：强正相关
+        (1, 3, -0.2 - sigma_theta_c_ratio),          # 抗压强度与应力比：负相关
+        (1, 4, 0.7 + (sigma_c_t_ratio / 20)),        # 抗压强度与强度比：强正相关
+        (1, 5, -0.1 - wet_norm / 2),                 # 抗压强度与含水率：弱负相关
+        (2, 3, -0.1 - sigma_theta_c_ratio / 2),      # 抗拉强度与应力比：弱负相关
+        (2, 4, 0.5 + (sigma_c_t_ratio / 30)),        # 抗拉强度与强度比：中等正相关
+        (2, 5, 0.1 - wet_norm),                      # 抗拉强度与含水率
+        (3, 4, -0.1 - sigma_theta_c_ratio / 10),     # 应力比与强度比：弱负相关
+        (3, 5, 0.2 + wet_norm / 5),                  # 应力比与含水率：弱正相关
+        (4, 5, -0.05 - wet_norm / 10),               # 强度比与含水率：很弱负相关
+    ]
+
+    # 截断相关系数在 -1 到 1 之间
+    corr_data = np.eye(len(CORRELATION_NAMES))
+    for i, j, value in pairs:
+        corr_data[i, j] = corr_data[j, i] = max(-1, min(1, value))
+    return corr_data
+
+
+@template
+def _heatmap_template():
+    import numpy as np
+    import plotly.express as px
+
+    corr_data = np.array(DEFAULT_CORRELATION)
+
+    heatmap_fig = px.imshow(
+        corr_data,
+        x=CORRELATION_NAMES,
+        y=CORRELATION_NAMES,
+        color_continuous_scale="RdBu_r",
+        zmin=-1,
+        zmax=1
+    )
+
+    heatmap_fig.update_layout(
+        height=300,
+        margin=dict(l=0, r=0, t=20, b=0),
+        coloraxis_colorbar=dict(
+            title="相关系数",
+            thicknessmode="pixels",
+            thickness=15,
+            lenmode="pixels",
+            len=250,
+            yanchor="top",
+            y=1,
+            ticks="outside"
+        ),
+        **BASE_LAYOUT
+    )
+
+    # 添加相关系数文本标注
+    heatmap_fig.update_traces(
+        text=np.around(corr_data, decimals=2),
+        texttemplate="%{text}",
+        textfont={"size": 10}
+    )
+
+    return heatmap_fig
+
+
+# 创建参数相关性热图
+@metrics.timed("figure.create_correlation_heatmap")
+def create_correlation_heatmap(input_data=None, corr_data=None):
+    """corr_data 为由案例数据统计得到的相关系数矩阵（无法计算的元素为NaN），未给出时按输入参数生成示意矩阵"""
+    import numpy as np
+
+    if corr_data is None:
+        corr_data = correlation_matrix(input_data)
+    text = np.where(np.isnan(corr_data), "–", np.char.mod("%.2f", np.nan_to_num(corr_data)))
+    return _from_template(_heatmap_template(), [{"z": corr_data, "text": text}])
+
+
+# ---------------------------------------------------------------- 关键因素风险评分
+
+@template
+def _risk_factor_template():
+    import plotly.graph_objects as go
+
+    factor_fig = go.Figure()
+
+    # 添加条形
+    factor_fig.add_trace(go.Bar(
+        x=[0.0],
+        y=[""],
+        orientation='h',
+        marker=dict(
+            color=['rgba(0, 0, 0, 0)'],
+            line=dict(color='rgba(0, 0, 0, 0)', width=1)
+        ),
+        text=[""],
+        textposition='auto',
+        hoverinfo='text',
+        hovertext=[""]
+    ))
+
+    # 更新布局
+    factor_fig.update_layout(
+        title={
+            'text': '岩爆关键因素风险评分',
+            'y':0.9,
+            'x':0.5,
+            'xanchor': 'center',
+            'yanchor': 'top'
+        },
+        height=300,
+        margin=dict(l=20, r=20, t=50, b=20),
+        xaxis=dict(
+            title='风险程度',
+            showgrid=True,
+            gridcolor='#E2E8F0',
+            range=[0, 1],
+            tickformat='.0%'
+        ),
+        yaxis=dict(
+            title=None,
+            showgrid=False
+        ),
+        **BASE_LAYOUT
+    )
+
+    return factor_fig
+
+
+# 创建关键因素风险评分横向条形图；risk_factors 为含 name、score、description 的字典列表
+@metrics.timed("figure.create_risk_factor_chart")
+def create_risk_factor_chart(risk_factors):
+    spec = _risk_factor_template()
+    trace = spec["data"][0]
+    patch = {
+        "x": [f["score"] for f in risk_factors],
+        "y": [f["name"] for f in risk_factors],
+        # 颜色随得分由绿渐变到红
+        "marker": dict(trace["marker"], color=[
+            f'rgba({int(255*f["score"])}, {int(255*(1-f["score"]))}, 0, 0.7)' for f in risk_factors
+        ]),
+        "text": [f"{f['score']*100:.0f}%" for f in risk_factors],
+        "hovertext": [f["description"] for f in risk_factors],
+    }
+    return _from_template(spec, [patch])
+
+
+# ---------------------------------------------------------------- 参数敏感性图
+
+# 每个参数一份模板（横轴名称和悬停提示随参数不同）
+@template
+def _sensitivity_template(param, axis_title):
+    import pandas as pd
+    import plotly.express as px
+
+    curve = pd.DataFrame({param: [0.0, 1.0], **{name: [0.0, 0.0] for name in GRADE_NAMES}})
+
+    # 绘制堆叠面积图
+    fig = px.area(
+        curve,
+        x=param,
+        y=GRADE_NAMES,
+        color_discrete_map=dict(zip(GRADE_NAMES, GRADE_COLORS))
+    )
+
+    # 当前参数值的垂直线，位置和标注在每次请求时替换
+    fig.add_vline(
+        x=0.0,
+        line_dash="dash",
+        line_color="#3B82F6",
+        annotation_text="",
+        annotation_position="top"
+    )
+
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=20, b=30),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5
+        ),
+        xaxis=dict(title=axis_title),
+        yaxis=dict(
+            title="概率分布",
+            tickformat='.0%',
+            range=[0, 1]
+        ),
+        **BASE_LAYOUT
+    )
+
+    return fig
+
+
+# 创建参数敏感性堆叠面积图
+@metrics.timed("figure.create_sensitivity_chart")
+def create_sensitivity_chart(curve, param, current_value, axis_title):
+    spec = _sensitivity_template(param, axis_title)
+    x = curve[param].to_numpy()
+    patches = [{"x": x, "y": curve[f"Class {i}"].to_numpy()} for i in range(len(GRADE_NAMES))]
+    shape, annotation = spec["layout"]["shapes"][0], spec["layout"]["annotations"][0]
+    layout = {
+        "shapes": [dict(shape, x0=current_value, x1=current_value)],
+        "annotations": [dict(annotation, x=current_value, text=f"当前值: {current_value:.2f}")],
+    }
+    return _from_template(spec, patches, layout)
+
+
+# 命令行：python charts.py [--repeat N] —— 比较模板化图表与逐次完整构建的耗时
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="图表模板缓存的耗时对比")
+    parser.add_argument("--repeat", type=int, default=20, help="每个图表的重复次数")
+    args = parser.parse_args()
+
+    from sensitivity import SENSITIVITY_PARAMETERS, sensitivity_curves
+
+    sample = {"rock_type": 1.0, "sigma_theta": 80.0, "sigma_c": 120.0, "sigma_t": 8.0,
+              "sigma_theta_c_ratio": 80.0 / 120.0, "sigma_c_t_ratio": 15.0, "wet": 3.0}
+    probabilities = {"Class 0": 0.05, "Class 1": 0.1, "Class 2": 0.25, "Class 3": 0.6}
+    curve = sensitivity_curves(sample)["sigma_theta"]
+    cases = [
+        ("create_risk_gauge", lambda: create_risk_gauge(3, GRADE_NAMES[3])),
+        ("create_probability_chart", lambda: create_probability_chart(probabilities)),
+        ("create_parameter_impact_radar", lambda: create_parameter_impact_radar(sample)),
+        ("create_grade_distribution_pie", lambda: create_grade_distribution_pie(sample)),
+        ("create_correlation_heatmap", lambda: create_correlation_heatmap(sample)),
+        ("create_sensitivity_chart", lambda: create_sensitivity_chart(
+            curve, "sigma_theta", sample["sigma_theta"], SENSITIVITY_PARAMETERS["sigma_theta"][1])),
+    ]
+    for name, build in cases:
+        start_time = time.perf_counter()
+        build()
+        first = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        for _ in range(args.repeat):
+            build()
+        print(f"{name:<32} 首次 {first * 1000:7.1f} ms, 之后每次 {(time.perf_counter() - start_time) / args.repeat * 1000:6.2f} ms")
@@ -0,0 +1,167 @@
+import argparse
+import time
+
+import numpy as np
+
+from features import BASE_COLUMNS, COLUMN_MAPPING
+
+# 解释结果中参数的顺序（与输入字段一致）
+PARAMETER_KEYS = list(COLUMN_MAPPING)
+
+
+# Shapley权重表：weights[m, k] = k!(m-1-k)!/m!，即m个参与者时大小为k的子集的权重（k ≥ m 时为0）
+def shapley_weights(max_players):
+    weights = np.zeros((max_players + 1, max(max_players, 1)), dtype=np.float64)
+    for m in range(1, max_players + 1):
+        weight = 1.0 / m  # k=0: (m-1)!/m!
+        for k in range(m):
+            weights[m, k] = weight
+            weight *= (k + 1) / (m - 1 - k) if k + 1 < m else 0.0
+    return weights
+
+
+class TreeExplainer:
+    """树集成的精确TreeSHAP解释（路径依赖形式，与shap库的TreeExplainer默认算法结果相同）
+
+    对每个叶子，根到叶子路径上的分裂按特征合并：z 为训练样本在该特征各次分裂中沿路径前进的比例之积，
+    o 表示样本是否满足该特征在路径上的全部分裂条件。叶子对模型输出的贡献在特征子集上是 Π(o 或 z)
+    形式的乘积博弈，其Shapley值由多项式 Π(o·t + z) 去掉一个因子后的系数按Shapley权重求和得到。
+    编译时把所有叶子的路径展开为 (叶子数, 路径特征数) 的数组，解释一个样本只需 O(树深度) 次整列运算，
+    总计算量为 O(叶子数·深度²)，与模型特征数无关。
+    """
+
+    def __init__(self, engine):
+        if engine.cover is None:
+            raise ValueError("树引擎缺少节点覆盖样本数（cover），请运行 python model_registry.py 重新导出原生模型文件")
+        self.engine = engine
+        self.n_features = len(engine.feature_names)
+        self.dependencies = engine.plan.base_dependencies()
+        self._compile_paths()
+
+    # 遍历每棵树，把每个叶子的路径按特征合并为 (下界, 上界, 覆盖比例)
+    def _compile_paths(self):
+        engine = self.engine
+        feature = np.asarray(engine.feature)
+        threshold = np.asarray(engine.threshold, dtype=np.float64)
+        left, right = np.asarray(engine.left), np.asarray(engine.right)
+        cover = np.asarray(engine.cover, dtype=np.float64)
+
+        leaves, paths = [], []
+        for root in engine.roots:
+            stack = [(int(root), {})]
+            while stack:
+                node, path = stack.pop()
+                if left[node] == node:
+                    leaves.append(node)
+                    paths.append(path)
+                    continue
+                split, value = int(feature[node]), threshold[node]
+                lower, upper, fraction = path.get(split, (-np.inf, np.inf, 1.0))
+                # 与引擎一致：x <= 阈值时走左子节点
+                for child, bounds in ((int(left[node]), (lower, min(upper, value))),
+                                      (int(right[node]), (max(lower, value), upper))):
+                    child_path = dict(path)
+                    child_path[split] = bounds + (fraction * cover[child] / cover[node],)
+                    stack.append((child, child_path))
+
+        n_leaves, depth = len(leaves), max(1, max(len(path) for path in paths))
+        self.path_features = np.zeros((n_leaves, depth), dtype=np.intp)
+        self.lower = np.full((n_leaves, depth), -np.inf)
+        self.upper = np.full((n_leaves, depth), np.inf)
+        self.zero_fraction = np.ones((n_leaves, depth))  # 填充位置 o=0、z=1，对应因子恒为1
+        self.valid = np.zeros((n_leaves, depth), dtype=bool)
+        self.path_length = np.array([len(path) for path in paths], dtype=np.intp)
+        for i, path in enumerate(paths):
+            for j, (split, (lower, upper, fraction)) in enumerate(path.items()):
+                self.path_features[i, j] = split
+                self.lower[i, j], self.upper[i, j], self.zero_fraction[i, j] = lower, upper, fraction
+                self.valid[i, j] = True
+
+        self.leaf_values = np.asarray(engine.leaf_proba)[leaves] / engine.n_estimators
+        self.weights = shapley_weights(depth)[self.path_length]
+        # 期望输出：各叶子按训练样本落入的比例加权
+        self.expected_value = (self.leaf_values * self.zero_fraction.prod(axis=1)[:, np.newaxis]).sum(axis=0)
+
+    @property
+    def depth(self):
+        return self.path_features.shape[1]
+
+    def _shap_row(self, x):
+        values = x[self.path_features]
+        one = (self.valid & (values > self.lower) & (values <= self.upper)).astype(np.float64)
+        zero = self.zero_fraction
+        n_leaves, depth = one.shape
+
+        # 多项式 Π(o·t + z) 的系数，poly[:, k] 为 t^k 的系数
+        poly = np.zeros((n_leaves, depth + 1))
+        poly[:, 0] = 1.0
+        for d in range(depth):
+            o, z = one[:, d:d + 1], zero[:, d:d + 1]
+            poly[:, 1:] = poly[:, 1:] * z + poly[:, :-1] * o
+            poly[:, :1] *= z
+
+        # 去掉第i个因子：o_i=1 时除以 (t + z_i)，自高次向低次递推（z ≤ 1，误差不会放大）；o_i=0 时除以 z_i
+        quotient = np.zeros((n_leaves, depth))
+        weighted_one = np.zeros((n_leaves, depth))
+        for k in range(depth, 0, -1):
+            quotient = poly[:, k:k + 1] - zero * quotient
+            weighted_one += self.weights[:, k - 1:k] * quotient
+        weighted_zero = (poly[:, :depth] * self.weights).sum(axis=1, keepdims=True) / zero
+        contribution = (one - zero) * np.where(one > 0, weighted_one, weighted_zero) * self.valid
+
+        features = self.path_features.ravel()
+        return np.stack([
+            np.bincount(features, weights=(contribution * self.leaf_values[:, c:c + 1]).ravel(),
+                        minlength=self.n_features)
+            for c in range(self.leaf_values.shape[1])
+        ], axis=1)
+
+    def shap_values(self, X):
+        """按模型特征计算SHAP值 (N, 特征数, 类别数)；各行满足 expected_value + 合计 = predict_proba"""
+        X = np.asarray(np.asarray(X, dtype=np.float32), dtype=np.float64)  # 与引擎一致按float32比较
+        return np.stack([self._shap_row(x) for x in X])
+
+    def explain_base(self, base_values):
+        """由基础列 (N, len(BASE_COLUMNS)) 计算SHAP值，工程特征的贡献按依赖关系平均分回基础列
+
+        返回 (N, len(BASE_COLUMNS), 类别数)，合计仍与模型特征上的SHAP值相同。
+        """
+        features = self.engine.plan.transform(np.asarray(base_values, dtype=np.float64))
+        return np.einsum("nfc,fb->nbc", self.shap_values(features), self.dependencies)
+
+
+# 检查局部准确性：期望输出加上各参数贡献应等于模型给出的概率
+def check_local_accuracy(explainer, base_values):
+    attributions = explainer.explain_base(base_values)
+    probabilities = explainer.engine.predict_base(base_values)
+    return float(np.abs(explainer.expected_value + attributions.sum(axis=1) - probabilities).max())
+
+
+# 命令行：python explain.py [--rows N] —— 校验局部准确性并测量单样本解释耗时
+if __name__ == "__main__":
+    import warnings
+
+    from model_registry import load_bundle
+    from tree_engine import random_corpus
+
+    warnings.filterwarnings("ignore")
+    parser = argparse.ArgumentParser(description="TreeSHAP解释的校验与计时")
+    parser.add_argument("--rows", type=int, default=200, help="校验局部准确性的随机样本数")
+    parser.add_argument("--repeat", type=int, default=50, help="单样本解释的计时次数")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    explainer = TreeExplainer(load_bundle().engine)
+    print(f"编译路径: {explainer.path_features.shape[0]} 个叶子, 路径最多 {explainer.depth} 个特征, "
+          f"{(time.perf_counter() - start_time) * 1000:.1f} ms")
+
+    corpus = random_corpus(args.rows, seed=0)
+    print(f"局部准确性最大误差: {check_local_accuracy(explainer, corpus):.3e} ({args.rows} 行)")
+
+    samples = []
+    for i in range(args.repeat):
+        start_time = time.perf_counter()
+        explainer.explain_base(corpus[i % len(corpus)][np.newaxis])
+        samples.append(time.perf_counter() - start_time)
+    print(f"单样本解释耗时: 中位数 {np.median(samples) * 1000:.2f} ms, 最大 {max(samples) * 1000:.2f} ms")
+    print("基础列: " + ", ".join(BASE_COLUMNS))
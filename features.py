@@ -0,0 +1,223 @@
+import numpy as np
+
+# 输入字段与模型列名的映射
+COLUMN_MAPPING = {
+    'rock_type': '岩石种类',
+    'sigma_theta': 'σθ / Mpa',
+    'sigma_c': 'σc / Mpa',
+    'sigma_t': 'σt / MPa',
+    'sigma_theta_c_ratio': 'σθ/σc',
+    'sigma_c_t_ratio': 'σc/σt',
+    'wet': 'Wet'
+}
+
+# 模型输入的基础列（顺序即数组输入的列顺序）
+BASE_COLUMNS = list(COLUMN_MAPPING.values())
+
+# 输入字段 -> 在基础列数组中的位置
+COLUMN_INDEX = {key: i for i, key in enumerate(COLUMN_MAPPING)}
+
+# 岩石种类及其编码（与界面下拉框一致）
+ROCK_TYPES = {
+    "花岗岩": 1.0,
+    "大理岩": 2.0,
+    "石灰岩": 3.0,
+    "砂岩": 4.0,
+    "页岩": 5.0,
+    "白云岩": 6.0,
+    "闪长岩": 7.0,
+    "流纹岩": 8.0,
+    "凝灰岩": 9.0,
+    "片麻岩": 10.0,
+    "片麻花岗岩": 11.0,
+    "矽卡岩": 12.0,
+    "花岗闪长岩": 13.0,
+    "正长岩": 14.0,
+    "黑云母花岗岩": 15.0,
+    "辉绿岩": 16.0,
+    "混合岩": 17.0,
+    "橄榄岩": 18.0,
+    "斜长角闪岩": 19.0,
+    "金伯利岩": 20.0,
+    "其他": 21.0
+}
+
+# 岩石种类编码 -> 名称
+ROCK_NAMES = {code: name for name, code in ROCK_TYPES.items()}
+
+# 输入参数的取值范围（与界面输入控件的min/max一致）
+INPUT_RANGES = {
+    'sigma_theta': (10.0, 200.0),
+    'sigma_c': (20.0, 300.0),
+    'sigma_t': (1.0, 50.0),
+    'wet': (0.0, 100.0),
+}
+
+# 批量输入中需要提供的原始参数列（比值列由原始参数推导）
+RAW_COLUMNS = [COLUMN_MAPPING[key] for key in ['rock_type', 'sigma_theta', 'sigma_c', 'sigma_t', 'wet']]
+
+
+def validate_ranges(frame):
+    """按输入控件的范围逐列向量化校验批量输入
+
+    frame 需包含 RAW_COLUMNS，岩石种类可以是编码或名称。
+    返回 (数值化后的原始参数DataFrame, 各行的错误说明Series)，错误说明为空字符串的行有效。
+    """
+    import pandas as pd
+
+    values = pd.DataFrame(index=frame.index)
+    errors = pd.Series("", index=frame.index, dtype=object)
+
+    rock = frame[COLUMN_MAPPING['rock_type']]
+    codes = pd.to_numeric(rock, errors="coerce").fillna(rock.map(ROCK_TYPES))
+    values[COLUMN_MAPPING['rock_type']] = codes
+    bad = ~codes.isin(list(ROCK_TYPES.values()))
+    errors[bad] += "岩石种类无效; "
+
+    for key, (low, high) in INPUT_RANGES.items():
+        column = COLUMN_MAPPING[key]
+        values[column] = pd.to_numeric(frame[column], errors="coerce")
+        bad = ~values[column].between(low, high)
+        errors[bad] += f"{column}不在[{low:g}, {high:g}]内; "
+
+    return values[RAW_COLUMNS], errors.str.rstrip("; ")
+
+# 单目变换：特征名后缀 -> 计算方式
+UNARY_OPS = {
+    'squared': lambda x: x ** 2,
+    'cubed': lambda x: x ** 3,
+    'sqrt': lambda x: np.sqrt(np.abs(x)),
+    'log': lambda x: np.log1p(np.abs(x)),
+}
+
+# 双目交互：特征名后缀 -> 计算方式（与训练时的特征工程保持一致）
+BINARY_OPS = {
+    'ratio': lambda a, b: a / (b + 1e-8),
+    'product': lambda a, b: a * b,
+    'sum': lambda a, b: a + b,
+}
+
+
+class FeaturePlan:
+    """由模型的 feature_names_in_ 编译得到的特征构建计划
+
+    每个特征名称在加载模型时解析一次，例如 "σθ / Mpa_Wet_ratio_log" 会被解析为
+    log1p(|σθ / (Wet + 1e-8)|)。预测时按依赖层级分组，每组只做一次NumPy整列运算，
+    直接写入预先分配的浮点矩阵，只计算模型真正需要的特征。
+    """
+
+    def __init__(self, feature_names, base_columns):
+        self.feature_names = list(feature_names)
+        self.base_columns = list(base_columns)
+
+        # 节点表：前 len(feature_names) 个节点与模型特征一一对应，中间结果追加在后面
+        self._index = {name: i for i, name in enumerate(self.feature_names)}
+        self._nodes = [None] * len(self.feature_names)
+        self._parsed = {}
+
+        self.unresolved = [name for name in self.feature_names if self._parse(name) is None]
+        self._unresolved_idx = np.array([self._index[name] for name in self.unresolved], dtype=np.intp)
+        self._stages = self._compile_stages()
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+    @property
+    def stages(self):
+        """编译后的计算阶段 [(运算, 目标节点, [源节点, ...])]，供导出到其他推理运行时"""
+        return list(self._stages)
+
+    # 递归解析特征名称，返回节点编号；无法解析时返回None
+    def _parse(self, name):
+        if name in self._parsed:
+            return self._parsed[name]
+        self._parsed[name] = None  # 防止异常名称导致无限递归
+
+        node = None
+        if name in self.base_columns:
+            node = ('base', 0, self.base_columns.index(name))
+        elif '_' in name:
+            prefix, op = name.rsplit('_', 1)
+            if op in UNARY_OPS:
+                child = self._parse(prefix)
+                if child is not None:
+                    node = (op, self._nodes[child][1] + 1, child)
+            elif op in BINARY_OPS:
+                # 两个操作数本身可能含有下划线，依次尝试每个切分位置
+                tokens = prefix.split('_')
+                for k in range(1, len(tokens)):
+                    left = self._parse('_'.join(tokens[:k]))
+                    right = self._parse('_'.join(tokens[k:])) if left is not None else None
+                    if right is not None:
+                        depth = max(self._nodes[left][1], self._nodes[right][1]) + 1
+                        node = (op, depth, left, right)
+                        break
+
+        if node is None:
+            return None
+
+        if name in self._index:
+            idx = self._index[name]
+            self._nodes[idx] = node
+        else:
+            idx = len(self._nodes)
+            self._nodes.append(node)
+        self._parsed[name] = idx
+        return idx
+
+    # 按(层级, 运算)分组，得到每组的目标列和源列索引
+    def _compile_stages(self):
+        groups = {}
+        for dst, node in enumerate(self._nodes):
+            if node is None:
+                continue
+            op, depth = node[0], node[1]
+            groups.setdefault((depth, op), []).append((dst,) + tuple(node[2:]))
+
+        stages = []
+        for (depth, op), items in sorted(groups.items(), key=lambda item: item[0][0]):
+            columns = np.array(items, dtype=np.intp)
+            stages.append((op, columns[:, 0], [columns[:, k] for k in range(1, columns.shape[1])]))
+        return stages
+
+    def base_dependencies(self):
+        """各模型特征依赖的基础列 (n_features, len(base_columns))
+
+        每行在该特征用到的基础列上平均分配、合计为1，无法构造的特征全为0。
+        用于把按模型特征计算的贡献（如TreeSHAP值）汇总回基础列。
+        """
+        columns = [None] * len(self._nodes)
+
+        # 递归收集节点用到的基础列，中间结果按节点缓存
+        def collect(idx):
+            if columns[idx] is None:
+                node = self._nodes[idx]
+                if node[0] == 'base':
+                    columns[idx] = frozenset([node[2]])
+                else:
+                    columns[idx] = frozenset().union(*(collect(child) for child in node[2:]))
+            return columns[idx]
+
+        weights = np.zeros((self.n_features, len(self.base_columns)), dtype=np.float64)
+        for idx in range(self.n_features):
+            if self._nodes[idx] is not None:
+                used = sorted(collect(idx))
+                weights[idx, used] = 1.0 / len(used)
+        return weights
+
+    def transform(self, base_values):
+        """根据基础列数组 (N, len(base_columns)) 计算模型特征矩阵 (N, n_features)"""
+        base_values = np.asarray(base_values, dtype=np.float64)
+        buffer = np.empty((base_values.shape[0], len(self._nodes)), dtype=np.float64)
+        buffer[:, self._unresolved_idx] = 0.0  # 无法构造的特征保持为0
+
+        for op, dst, sources in self._stages:
+            if op == 'base':
+                buffer[:, dst] = base_values[:, sources[0]]
+            elif op in UNARY_OPS:
+                buffer[:, dst] = UNARY_OPS[op](buffer[:, sources[0]])
+            else:
+                buffer[:, dst] = BINARY_OPS[op](buffer[:, sources[0]], buffer[:, sources[1]])
+
+        return buffer[:, :self.n_features]
@@ -0,0 +1,131 @@
+import os
+import time
+
+import numpy as np
+
+from charts import GRADE_NAMES
+from features import COLUMN_MAPPING, ROCK_NAMES
+from inference import CLASS_UNCERTAINTY_STATS, PROBA_COLUMNS
+
+# 每个会话保留的历史记录条数，超出后覆盖最早的记录
+HISTORY_SIZE = int(os.environ.get("ROCKBURST_HISTORY_SIZE", "50"))
+
+# 历史记录中输入参数的列顺序
+INPUT_KEYS = list(COLUMN_MAPPING)
+
+
+class PredictionHistory:
+    """定长环形缓冲区形式的预测历史，按列存放在预先分配的NumPy数组中
+
+    每条记录包含输入参数、各类别概率、不确定性统计（后端提供时）、预测等级、是否降级、模型版本和时间。
+    模型版本按字典编码保存为小整数。写满后覆盖最早的记录，内存占用与提交次数无关。
+    每条记录有递增的编号，被覆盖的编号不再可用。
+    """
+
+    def __init__(self, capacity=HISTORY_SIZE):
+        self.capacity = int(capacity)
+        self.inputs = np.zeros((self.capacity, len(INPUT_KEYS)), dtype=np.float64)
+        self.probabilities = np.zeros((self.capacity, len(PROBA_COLUMNS)), dtype=np.float64)
+        self.class_stats = np.zeros((self.capacity, len(CLASS_UNCERTAINTY_STATS), len(PROBA_COLUMNS)), dtype=np.float64)
+        self.entropy_stats = np.zeros((self.capacity, 4), dtype=np.float64)  # 熵、置信区间下限、上限、树平均熵
+        self.has_uncertainty = np.zeros(self.capacity, dtype=bool)
+        self.predictions = np.zeros(self.capacity, dtype=np.int8)
+        self.degraded = np.zeros(self.capacity, dtype=bool)
+        self.version_codes = np.zeros(self.capacity, dtype=np.int16)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.ids = np.full(self.capacity, -1, dtype=np.int64)
+        self.versions = []
+        self._next_id = 0
+
+    def __len__(self):
+        return min(self._next_id, self.capacity)
+
+    def __contains__(self, run_id):
+        return self._slot(run_id) is not None
+
+    @property
+    def nbytes(self):
+        arrays = (self.inputs, self.probabilities, self.class_stats, self.entropy_stats, self.has_uncertainty,
+                  self.predictions, self.degraded, self.version_codes,
+                  self.timestamps, self.ids)
+        return sum(array.nbytes for array in arrays)
+
+    # 编号对应的槽位；已被覆盖或不存在时返回None
+    def _slot(self, run_id):
+        if not isinstance(run_id, (int, np.integer)) or run_id < 0:
+            return None
+        slot = int(run_id) % self.capacity
+        return slot if self.ids[slot] == run_id else None
+
+    def _version_code(self, version):
+        if version not in self.versions:
+            self.versions.append(version)
+        return self.versions.index(version)
+
+    def append(self, input_data, result):
+        """记录一次预测，返回该记录的编号"""
+        run_id = self._next_id
+        slot = run_id % self.capacity
+        self.inputs[slot] = [input_data[key] for key in INPUT_KEYS]
+        self.probabilities[slot] = [result["probabilities"][key] for key in PROBA_COLUMNS]
+        uncertainty = result.get("uncertainty")
+        self.has_uncertainty[slot] = uncertainty is not None
+        if uncertainty is not None:
+            self.class_stats[slot] = [[uncertainty[stat][key] for key in PROBA_COLUMNS] for stat in CLASS_UNCERTAINTY_STATS]
+            self.entropy_stats[slot] = [uncertainty["entropy"], *uncertainty["entropy_ci"],
+                                        uncertainty["tree_entropy"]]
+        self.predictions[slot] = result["prediction"]
+        self.degraded[slot] = bool(result.get("degraded", False))
+        self.version_codes[slot] = self._version_code(result.get("model_version"))
+        self.timestamps[slot] = time.time()
+        self.ids[slot] = run_id
+        self._next_id += 1
+        return run_id
+
+    def run_ids(self):
+        """现存记录的编号，最新的在前"""
+        return list(range(self._next_id - 1, self._next_id - 1 - len(self), -1))
+
+    def get(self, run_id):
+        """取回一条记录，返回 (输入参数, 预测结果)，格式与predict_cached的输入和返回值相同"""
+        slot = self._slot(run_id)
+        if slot is None:
+            raise KeyError(f"历史记录不存在或已被覆盖: {run_id}")
+        input_data = dict(zip(INPUT_KEYS, self.inputs[slot].tolist()))
+        prediction = int(self.predictions[slot])
+        result = {
+            "prediction": prediction,
+            "prediction_text": GRADE_NAMES[prediction],
+            "probabilities": dict(zip(PROBA_COLUMNS, self.probabilities[slot].tolist())),
+            "uncertainty": self._uncertainty(slot),
+            "degraded": bool(self.degraded[slot]),
+            "model_version": self.versions[self.version_codes[slot]],
+        }
+        return input_data, result
+
+    def _uncertainty(self, slot):
+        if not self.has_uncertainty[slot]:
+            return None
+        entropy, entropy_low, entropy_high, tree_entropy = self.entropy_stats[slot].tolist()
+        uncertainty = {stat: dict(zip(PROBA_COLUMNS, values))
+                       for stat, values in zip(CLASS_UNCERTAINTY_STATS, self.class_stats[slot].tolist())}
+        uncertainty.update(entropy=entropy, entropy_ci=[entropy_low, entropy_high], tree_entropy=tree_entropy)
+        return uncertainty
+
+    def probabilities_of(self, run_ids):
+        """多条记录的类别概率矩阵 (len(run_ids), 类别数)，用于叠加对比"""
+        slots = [self._slot(run_id) for run_id in run_ids]
+        if any(slot is None for slot in slots):
+            raise KeyError(f"历史记录不存在或已被覆盖: {run_ids}")
+        return self.probabilities[slots]
+
+    def label(self, run_id):
+        """下拉框中显示的简短说明"""
+        slot = self._slot(run_id)
+        if slot is None:
+            return f"#{run_id + 1}"
+        values = dict(zip(INPUT_KEYS, self.inputs[slot]))
+        rock = ROCK_NAMES.get(values["rock_type"], "其他")
+        stamp = time.strftime("%H:%M:%S", time.localtime(self.timestamps[slot]))
+        return (f"#{run_id + 1} {stamp} {rock} σθ={values['sigma_theta']:.1f} σc={values['sigma_c']:.1f} "
+                f"σt={values['sigma_t']:.1f} Wet={values['wet']:.2f} → {GRADE_NAMES[self.predictions[slot]]}")
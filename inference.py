@@ -0,0 +1,361 @@
+import copy
+import functools
+import logging
+import threading
+import time
+
+import numpy as np
+
+import metrics
+from batching import MicroBatcher
+from explain import PARAMETER_KEYS, TreeExplainer
+from features import COLUMN_MAPPING, BASE_COLUMNS
+from model_registry import BACKEND, load_bundle, load_native_engine
+from prediction_cache import EXPLANATION_CACHE, PREDICTION_CACHE, make_key, quantize_input
+from tree_engine import TreeEngine
+
+# 推理核心：不依赖Streamlit，可被应用、命令行工具和服务共同使用。
+# pandas、joblib、sklearn等较重的依赖在首次使用时才导入。
+
+
+# 进程内只成功执行一次的资源加载（作用同st.cache_resource），失败时不缓存、下次重试
+def load_once(func):
+    lock = threading.Lock()
+    loaded = []
+
+    @functools.wraps(func)
+    def wrapper():
+        if not loaded:
+            with lock:
+                if not loaded:
+                    loaded.append(func())
+        return loaded[0]
+
+    return wrapper
+
+# 缓存加载模型 - 按清单解析模型文件，校验后加载并预热
+@load_once
+def load_model_bundle():
+    with metrics.span("model_load"):
+        bundle = load_bundle()
+    metrics.log_event("model_loaded", sample_rate=1.0, model_version=bundle.version, backend=bundle.backend)
+    return bundle
+
+# 获取主模型
+def load_model():
+    return load_model_bundle().model
+
+# 获取特征构建计划 - 加载模型时已解析一次feature_names_in_
+def load_feature_plan():
+    return load_model_bundle().plan
+
+# 缓存构建TreeSHAP解释器 - 使用树引擎的扁平数组；sklearn后端时由模型临时导出引擎，
+# onnx后端时读取清单中同一模型版本的原生模型文件
+@load_once
+def load_explainer():
+    bundle = load_model_bundle()
+    with metrics.span("explainer_load"):
+        engine = bundle.engine
+        if engine is None and hasattr(bundle.model, "estimators_"):
+            engine = TreeEngine.from_sklearn(bundle.model)
+        if engine is None and bundle.manifest.get("engine"):
+            engine = load_native_engine(bundle.manifest)
+        if engine is None:
+            raise ValueError(f"{bundle.backend} 后端不支持TreeSHAP解释")
+        return TreeExplainer(engine)
+
+# 获取当前使用的模型版本，主模型不可用时返回备用模型版本
+def get_model_version():
+    try:
+        return load_model_bundle().version
+    except Exception:
+        return FALLBACK_VERSION
+
+# 获取岩爆等级文本描述
+def get_rock_burst_grade_text(grade):
+    grades = {
+        0: "无岩爆倾向",
+        1: "弱岩爆倾向",
+        2: "中等岩爆倾向",
+        3: "强岩爆倾向"
+    }
+    return grades.get(grade, "未知等级")
+
+# 批量预测结果中的概率列
+PROBA_COLUMNS = [f"Class {i}" for i in range(4)]
+
+# 批量预测结果中的不确定性列（树引擎后端才有）：各类别的树间标准差、投票比例和95%置信区间，以及预测熵
+CLASS_UNCERTAINTY_STATS = ["std", "vote", "ci_low", "ci_high"]
+ENTROPY_COLUMNS = ["entropy", "entropy_ci_low", "entropy_ci_high", "tree_entropy"]
+UNCERTAINTY_COLUMNS = [f"{column} {stat}" for stat in CLASS_UNCERTAINTY_STATS
+                       for column in PROBA_COLUMNS] + ENTROPY_COLUMNS
+
+# 将DataFrame或数组统一转换为以模型列名为列的输入表
+def _to_input_frame(df_or_array):
+    import pandas as pd
+
+    if isinstance(df_or_array, pd.DataFrame):
+        input_df = df_or_array.rename(columns=COLUMN_MAPPING)
+    else:
+        values = np.asarray(df_or_array, dtype=float)
+        if values.ndim == 1:
+            values = values.reshape(1, -1)
+        if values.shape[1] != len(BASE_COLUMNS):
+            raise ValueError(f"输入数组应有{len(BASE_COLUMNS)}列，实际为{values.shape[1]}列")
+        input_df = pd.DataFrame(values, columns=BASE_COLUMNS)
+
+    input_df = input_df.reset_index(drop=True)
+
+    # 比值列缺失时根据原始参数自动计算
+    if 'σθ/σc' not in input_df.columns:
+        input_df['σθ/σc'] = input_df['σθ / Mpa'] / input_df['σc / Mpa']
+    if 'σc/σt' not in input_df.columns:
+        input_df['σc/σt'] = input_df['σc / Mpa'] / input_df['σt / MPa']
+
+    missing = [col for col in BASE_COLUMNS if col not in input_df.columns]
+    if missing:
+        raise ValueError(f"输入数据缺少必要的列: {missing}")
+
+    return input_df[BASE_COLUMNS].astype(float)
+
+# 组装列式预测结果：等级、等级文本和各类别概率，有不确定性统计时追加 UNCERTAINTY_COLUMNS
+def _build_batch_result(probabilities, classes, uncertainty=None):
+    import pandas as pd
+
+    grades = np.asarray(classes)[np.argmax(probabilities, axis=1)].astype(int)
+    columns = {
+        "prediction": grades,
+        "prediction_text": [get_rock_burst_grade_text(grade) for grade in grades],
+    }
+    for i, column in enumerate(PROBA_COLUMNS):
+        columns[column] = probabilities[:, i] if i < probabilities.shape[1] else 0.0
+    if uncertainty is not None:
+        for stat in CLASS_UNCERTAINTY_STATS:
+            for i, column in enumerate(PROBA_COLUMNS):
+                columns[f"{column} {stat}"] = uncertainty[stat][:, i] if i < probabilities.shape[1] else 0.0
+        for column in ENTROPY_COLUMNS:
+            columns[column] = uncertainty[column]
+    return pd.DataFrame(columns)
+
+# 将批量结果中的不确定性列转换为每行一个字典；结果不含这些列（备用模型、ONNX后端）时返回None
+def uncertainty_records(result):
+    if "entropy" not in result.columns:
+        return None
+    values = {column: result[column].to_numpy().tolist() for column in UNCERTAINTY_COLUMNS}
+    return [
+        {
+            **{stat: {column: values[f"{column} {stat}"][i] for column in PROBA_COLUMNS}
+               for stat in CLASS_UNCERTAINTY_STATS},
+            "entropy": values["entropy"][i],
+            "entropy_ci": [values["entropy_ci_low"][i], values["entropy_ci_high"][i]],
+            "tree_entropy": values["tree_entropy"][i],
+        }
+        for i in range(len(result))
+    ]
+
+# 备用模型的随机种子，保证同一输入得到相同结果
+FALLBACK_SEED = 42
+
+# 备用模型的版本标识
+FALLBACK_VERSION = f"fallback-rf-seed{FALLBACK_SEED}"
+
+# 训练备用模型（主模型不可用时使用）- 每个进程只训练一次并缓存
+@load_once
+@metrics.timed("fallback_model_load")
+def load_fallback_model():
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(FALLBACK_SEED)
+
+    # 训练一个简单模型来预测岩爆等级
+    temp_model = RandomForestClassifier(n_estimators=100, random_state=FALLBACK_SEED)
+
+    # 创建一些模拟训练数据
+    X_train = []
+    y_train = []
+
+    # 为每个岩爆等级创建一些样本
+    for rock_grade in range(4):  # 0, 1, 2, 3
+        for _ in range(25):  # 每个等级25个样本
+            # 随机生成参数，范围与输入控件范围一致
+            rock_type = rng.choice([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 
+                                    11.0, 12.0, 13.0, 14.0, 15.0, 16.0, 17.0, 18.0, 19.0, 20.0, 21.0])
+            sigma_theta = rng.uniform(10.0, 200.0)
+            sigma_c = rng.uniform(20.0, 300.0)
+            sigma_t = rng.uniform(1.0, 50.0)
+            wet = rng.uniform(0.0, 100.0)  # 调整含水率范围，允许0-100的值
+
+            # 为不同岩爆等级设置不同的典型参数范围
+            if rock_grade == 0:  # 无岩爆倾向
+                sigma_theta = rng.uniform(10.0, 50.0)
+                sigma_c = rng.uniform(150.0, 300.0)
+            elif rock_grade == 3:  # 强岩爆倾向
+                sigma_theta = rng.uniform(150.0, 200.0)
+                sigma_c = rng.uniform(20.0, 100.0)
+
+            sigma_theta_c_ratio = sigma_theta / sigma_c
+            sigma_c_t_ratio = sigma_c / sigma_t
+
+            # 创建特征向量
+            X_train.append([rock_type, sigma_theta, sigma_c, sigma_t, 
+                            sigma_theta_c_ratio, sigma_c_t_ratio, wet])
+            y_train.append(rock_grade)
+
+    # 训练模型，列名与输入数据一致
+    X_train_df = pd.DataFrame(np.array(X_train), columns=BASE_COLUMNS)
+    temp_model.fit(X_train_df, np.array(y_train))
+
+    return temp_model
+
+# 批量预测 - 一次predict_proba调用完成N行样本的评分
+def predict_batch(df_or_array, timings=None, return_uncertainty=True):
+    """批量预测岩爆等级，返回包含等级、等级文本和四类概率的DataFrame
+
+    树引擎后端在同一次遍历中附带 UNCERTAINTY_COLUMNS（树间标准差、投票比例、置信区间和预测熵）；
+    return_uncertainty 为False时跳过这些统计，用于不输出不确定性的批量评分。
+
+    result.attrs["degraded"] 为True时表示主模型不可用，结果来自备用模型；
+    result.attrs["model_version"] 记录产生该结果的模型版本。
+    传入 timings 字典时记录特征构建和模型推理各阶段的耗时（秒）。
+    """
+    input_df = _to_input_frame(df_or_array)
+    stage_timings = {}
+
+    try:
+        # 加载模型（已按清单校验并预热）
+        bundle = load_model_bundle()
+
+        # 按编译好的特征计划分块计算，每块只调用一次predict_proba
+        scored = bundle.predict_proba(input_df.to_numpy(), stage_timings, return_uncertainty=return_uncertainty)
+        probabilities, uncertainty = scored if return_uncertainty else (scored, None)
+
+        # 等级由概率的argmax得到
+        result = _build_batch_result(probabilities, bundle.model.classes_, uncertainty)
+        result.attrs["degraded"] = False
+        result.attrs["model_version"] = bundle.version
+        backend = bundle.backend
+
+    except Exception as e:
+        metrics.ERRORS.inc(stage="predict")
+        metrics.log_event("predict_failed", sample_rate=1.0, level=logging.WARNING, error=str(e),
+                          rows=len(input_df))
+
+        # 使用备用预测逻辑 - 为保证应用正常运行，结果标记为降级
+        fallback_model = load_fallback_model()
+        start_time = time.perf_counter()
+        probabilities = fallback_model.predict_proba(input_df)
+        stage_timings["inference"] = time.perf_counter() - start_time
+        result = _build_batch_result(probabilities, fallback_model.classes_)
+        result.attrs["degraded"] = True
+        result.attrs["model_version"] = FALLBACK_VERSION
+        backend = "fallback"
+
+    _record_prediction(len(input_df), backend, result.attrs["degraded"], stage_timings)
+    if timings is not None:
+        for stage, seconds in stage_timings.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+    return result
+
+# 记录一次批量预测的指标，并按采样比例输出结构化日志
+def _record_prediction(rows, backend, degraded, stage_timings):
+    for stage, seconds in stage_timings.items():
+        metrics.observe(stage, seconds)
+    metrics.PREDICTIONS.inc(backend=backend, degraded=str(degraded).lower())
+    metrics.PREDICTED_ROWS.inc(rows, backend=backend)
+    metrics.log_event("predict_batch", rows=rows, backend=backend, degraded=degraded,
+                      **{f"{stage}_ms": round(seconds * 1000, 3) for stage, seconds in stage_timings.items()})
+
+# 跨会话共享的合批器：几毫秒内到达的单样本请求合并为一次predict_batch调用
+PREDICTION_BATCHER = MicroBatcher(predict_batch)
+
+
+# 导出指标时附带预测缓存和合批器的即时统计
+def _collect_runtime_stats():
+    cache = PREDICTION_CACHE.stats()
+    batcher = PREDICTION_BATCHER.stats()
+    explanations = EXPLANATION_CACHE.stats()
+    return [
+        ("rockburst_cache_events", "预测缓存的累计命中、未命中等次数",
+         [({"event": event}, cache[event]) for event in ("hits", "misses", "coalesced", "evictions", "expirations")]),
+        ("rockburst_cache_entries", "预测缓存当前条目数", [({}, cache["size"])]),
+        ("rockburst_explanation_cache_events", "解释缓存的累计命中、未命中次数",
+         [({"event": event}, explanations[event]) for event in ("hits", "misses")]),
+        ("rockburst_batcher_batches", "合批器执行的批次数", [({}, batcher["batches"])]),
+        ("rockburst_batcher_requests", "合批器处理的请求数", [({}, batcher["requests"])]),
+        ("rockburst_batcher_batch_rows", "合批器各批行数的分布",
+         [({"bucket": bucket}, count) for bucket, count in batcher["batch_rows_histogram"].items()]),
+    ]
+
+
+metrics.REGISTRY.register_collector(_collect_runtime_stats)
+
+# 单样本预测 - 经合批器调用predict_batch
+def predict_locally(input_data, timings=None):
+    """使用本地模型进行预测，确保特征名称完全匹配"""
+    import pandas as pd
+
+    rows = _to_input_frame(pd.DataFrame([input_data])).to_numpy()
+    batch_result = PREDICTION_BATCHER.submit(rows, timings)
+    row = batch_result.iloc[0]
+    uncertainty = uncertainty_records(batch_result)
+
+    # 构建结果，degraded表示使用的是备用模型；uncertainty为树间分歧统计，后端不提供时为None
+    result = {
+        "prediction": int(row["prediction"]),
+        "prediction_text": row["prediction_text"],
+        "probabilities": {column: float(row[column]) for column in PROBA_COLUMNS},
+        "uncertainty": uncertainty[0] if uncertainty else None,
+        "degraded": batch_result.attrs.get("degraded", False),
+        "model_version": batch_result.attrs.get("model_version")
+    }
+
+    return result
+
+# 带缓存的单样本预测 - 输入量化到控件精度后按模型版本共享结果
+def predict_cached(input_data, timings=None):
+    """与predict_locally相同，但相同参数的重复请求直接复用进程内缓存（命中时timings不记录推理阶段）
+
+    备用模型给出的降级结果不写入缓存，主模型恢复后同一参数不会继续返回旧的降级结果。
+    """
+    quantized = quantize_input(input_data)
+    key = make_key(quantized, get_model_version())
+    result = PREDICTION_CACHE.get_or_compute(key, lambda: predict_locally(quantized, timings),
+                                             cacheable=lambda value: not value.get("degraded", False))
+    return copy.deepcopy(result)  # 缓存结果在会话间共享，返回副本防止被修改
+
+# 单样本解释 - 各输入参数对每个等级概率的TreeSHAP贡献
+def explain_locally(input_data):
+    """返回 expected_value（各等级的平均概率）和 contributions（参数 -> 各等级概率的贡献），
+    满足 expected_value + 各参数贡献之和 = predict_locally 给出的概率；工程特征的贡献已平均分回所依赖的参数
+    """
+    import pandas as pd
+
+    explainer = load_explainer()
+    rows = _to_input_frame(pd.DataFrame([input_data])).to_numpy()
+    with metrics.span("explain"):
+        attributions = explainer.explain_base(rows)[0]
+    return {
+        "expected_value": dict(zip(PROBA_COLUMNS, explainer.expected_value.tolist())),
+        "contributions": {key: dict(zip(PROBA_COLUMNS, attributions[i].tolist()))
+                          for i, key in enumerate(PARAMETER_KEYS)},
+        "model_version": load_model_bundle().version,
+    }
+
+_explain_unavailable_logged = threading.Event()
+
+# 带缓存的单样本解释 - 与predict_cached相同的量化和缓存键；主模型或解释器不可用时返回None，
+# 页面改为显示经验公式估计的影响度，原因只在第一次失败时记录一条日志
+def explain_cached(input_data):
+    try:
+        load_explainer()
+    except Exception as e:
+        if not _explain_unavailable_logged.is_set():
+            _explain_unavailable_logged.set()
+            metrics.log_event("explain_unavailable", sample_rate=1.0, level=logging.WARNING,
+                              backend=BACKEND, error=str(e))
+        return None
+    quantized = quantize_input(input_data)
+    key = make_key(quantized, get_model_version())
+    result = EXPLANATION_CACHE.get_or_compute(key, lambda: explain_locally(quantized))
+    return copy.deepcopy(result)
@@ -0,0 +1,228 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+# 耗时直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+
+# 结构化日志的采样比例（0~1），可通过环境变量调整；错误日志不采样
+LOG_SAMPLE_RATE = float(os.environ.get("ROCKBURST_LOG_SAMPLE_RATE", "0.01"))
+
+# 设置后每次页面运行结束时把指标写入该文件（Prometheus文本格式），供node_exporter等采集
+METRICS_FILE = os.environ.get("ROCKBURST_METRICS_FILE")
+
+# 结构化日志：每行一个JSON对象，默认输出到标准错误
+logger = logging.getLogger("rockburst")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+# 将标签字典转换为可哈希的键
+def _label_key(labels):
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+# 按Prometheus文本格式转义标签值
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    """只增不减的计数器，按标签分别计数"""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """固定桶的直方图，记录累计分布、总和与次数"""
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # 标签 -> [各桶计数, 总和, 次数]
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, **labels):
+        """返回 (总和, 次数)"""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return (series[1], series[2]) if series else (0.0, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', f'{bound:g}')])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {total:.9g}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    """进程内的指标注册表；collectors 为导出时调用的回调，用于输出其他模块维护的即时数值（gauge）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def counter(self, name, help_text):
+        return self._get_or_create(name, lambda: Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self._get_or_create(name, lambda: Histogram(name, help_text, buckets))
+
+    def _get_or_create(self, name, factory):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def register_collector(self, collector):
+        """collector() 返回 [(名称, 说明, [(标签字典, 数值), ...])]，导出时以gauge形式输出"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render_prometheus(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            for name, help_text, values in collector():
+                lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge"])
+                lines.extend(f"{name}{_format_labels(_label_key(labels))} {value:g}" for labels, value in values)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """原子地写入指标文件（先写同目录下的唯一临时文件再替换，多个会话同时导出时互不干扰）"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                        prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render_prometheus())
+            os.chmod(tmp_path, 0o644)  # mkstemp默认仅属主可读，采集程序可能以其他用户运行
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+
+# 进程级共享的注册表和常用指标
+REGISTRY = Registry()
+SPAN_SECONDS = REGISTRY.histogram("rockburst_span_seconds", "各处理阶段的耗时（秒）")
+PREDICTIONS = REGISTRY.counter("rockburst_predictions_total", "预测调用次数")
+PREDICTED_ROWS = REGISTRY.counter("rockburst_predicted_rows_total", "预测的样本行数")
+ERRORS = REGISTRY.counter("rockburst_errors_total", "各阶段发生的错误次数")
+
+
+# 记录一段已测得的耗时
+def observe(span_name, seconds):
+    SPAN_SECONDS.observe(seconds, span=span_name)
+
+
+@contextlib.contextmanager
+def span(span_name):
+    """计时代码块并记入 rockburst_span_seconds{span=...}；块内抛出异常时同时计入错误次数"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        ERRORS.inc(stage=span_name)
+        raise
+    finally:
+        observe(span_name, time.perf_counter() - start_time)
+
+
+def timed(span_name):
+    """装饰器形式的span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def log_event(event, sample_rate=None, level=logging.INFO, **fields):
+    """按采样比例输出一行JSON结构化日志；sample_rate 为1时总是输出"""
+    rate = LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate < 1.0 and random.random() >= rate:
+        return
+    if not logger.isEnabledFor(level):
+        return
+    record = {"ts": round(time.time(), 3), "event": event}
+    record.update(fields)
+    logger.log(level, json.dumps(record, ensure_ascii=False, default=str))
+
+
+# 设置了 ROCKBURST_METRICS_FILE 时写出指标文件；写入失败只记录日志，不影响页面运行
+def export_to_file(path=None):
+    path = path or METRICS_FILE
+    if not path:
+        return
+    try:
+        REGISTRY.write_prometheus(path)
+    except OSError as e:
+        ERRORS.inc(stage="metrics_export")
+        log_event("metrics_export_failed", sample_rate=1.0, level=logging.WARNING, path=path, error=str(e))
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import sys
+import time
+import warnings
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from features import BASE_COLUMNS, FeaturePlan
+from tree_engine import ARTIFACT_FORMAT, TreeEngine, check_parity
+
+# 模型清单默认位置（与本文件同目录），可通过环境变量覆盖
+MANIFEST_PATH = os.environ.get(
+    "ROCKBURST_MODEL_MANIFEST",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_manifest.json")
+)
+
+# 预热用的典型样本（与界面默认参数一致）
+WARMUP_ROW = [1.0, 50.0, 100.0, 10.0, 0.5, 10.0, 0.5]
+
+# 每次构建特征矩阵的最大行数，避免大批量时一次性占用过多内存
+FEATURE_CHUNK_ROWS = 1024
+
+# 加载时用于校验树引擎与sklearn逐位一致的随机样本数
+ENGINE_PARITY_ROWS = 256
+
+# 推理后端：engine（扁平数组树引擎，默认）、sklearn，或 onnx（需安装onnxruntime并先导出ONNX模型）
+BACKENDS = ("engine", "sklearn", "onnx")
+BACKEND = os.environ.get("ROCKBURST_BACKEND", "engine")
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """已加载并预热的模型及其元数据
+
+    engine 为扁平数组树引擎，不可用时为None；从原生模型文件加载时 model 即为该引擎。
+    backend 为 onnx 时 model 是ONNX Runtime会话，特征计划在图中完成。
+    """
+    model: object
+    plan: FeaturePlan
+    version: str
+    manifest: dict
+    engine: TreeEngine = None
+    backend: str = "sklearn"
+
+    def predict_proba(self, base_values, timings=None, return_uncertainty=False):
+        """对基础列数组 (N, len(BASE_COLUMNS)) 分块构建特征并预测各类别概率
+
+        有树引擎时只构建树中用到的特征并由引擎推理，否则交给sklearn模型。
+        传入 timings 字典时，累加记录特征构建('features')和模型推理('inference')的耗时（秒）。
+        return_uncertainty 为True时返回 (概率, 不确定性)：树引擎在同一次遍历中给出树间分歧统计
+        （见 tree_engine.tree_uncertainty），其他后端没有逐棵树的输出，不确定性为None。
+        """
+        import pandas as pd
+
+        timings = {} if timings is None else timings
+        base_values = np.asarray(base_values, dtype=np.float64)
+        uncertainty = None
+        if self.backend == "onnx":
+            start_time = time.perf_counter()
+            probabilities = self.model.predict_base(base_values)
+            timings["inference"] = timings.get("inference", 0.0) + time.perf_counter() - start_time
+
+        elif self.engine is not None:
+            chunks, stats = [], []
+            for start in range(0, len(base_values), FEATURE_CHUNK_ROWS):
+                start_time = time.perf_counter()
+                features = self.engine.plan.transform(base_values[start:start + FEATURE_CHUNK_ROWS])
+                built_time = time.perf_counter()
+                if return_uncertainty:
+                    chunk, chunk_stats = self.engine.predict_proba_with_uncertainty(features)
+                    stats.append(chunk_stats)
+                else:
+                    chunk = self.engine.predict_proba(features)
+                chunks.append(chunk)
+                timings["features"] = timings.get("features", 0.0) + built_time - start_time
+                timings["inference"] = timings.get("inference", 0.0) + time.perf_counter() - built_time
+            probabilities = np.vstack(chunks)
+            if stats:
+                uncertainty = {key: np.concatenate([chunk[key] for chunk in stats]) for key in stats[0]}
+
+        elif not hasattr(self.model, "feature_names_in_"):
+            # 模型没有feature_names_in_属性时直接使用基础列预测
+            start_time = time.perf_counter()
+            probabilities = self.model.predict_proba(pd.DataFrame(base_values, columns=BASE_COLUMNS))
+            timings["inference"] = timings.get("inference", 0.0) + time.perf_counter() - start_time
+
+        else:
+            chunks = []
+            for start in range(0, len(base_values), FEATURE_CHUNK_ROWS):
+                start_time = time.perf_counter()
+                features = pd.DataFrame(self.plan.transform(base_values[start:start + FEATURE_CHUNK_ROWS]),
+                                        columns=self.plan.feature_names, copy=False)
+                built_time = time.perf_counter()
+                chunks.append(self.model.predict_proba(features))
+                timings["features"] = timings.get("features", 0.0) + built_time - start_time
+                timings["inference"] = timings.get("inference", 0.0) + time.perf_counter() - built_time
+            probabilities = np.vstack(chunks)
+
+        return (probabilities, uncertainty) if return_uncertainty else probabilities
+
+
+# 计算模型文件的SHA-256摘要
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# 根据模型名称和内容摘要生成版本号，内容不变则版本不变
+def make_version(name, sha256):
+    return f"{name}@{sha256[:12]}"
+
+
+# 原生模型文件的扩展名（与pickle同名、同目录）
+ENGINE_SUFFIX = ".rbtree"
+
+
+# 根据模型文件生成清单：路径、摘要、特征列表和类别标签；树集成模型同时导出原生模型文件
+def build_manifest(artifact_path, name=None):
+    import joblib
+
+    model = joblib.load(artifact_path)
+    sha256 = file_sha256(artifact_path)
+    name = name or os.path.splitext(os.path.basename(artifact_path))[0]
+    features = [str(f) for f in getattr(model, "feature_names_in_", BASE_COLUMNS)]
+    manifest = {
+        "name": name,
+        "version": make_version(name, sha256),
+        "artifact": os.path.basename(artifact_path),
+        "sha256": sha256,
+        "estimator": type(model).__name__,
+        "classes": [int(c) for c in model.classes_],
+        "features": features,
+    }
+
+    bundle = ModelBundle(model=model, plan=FeaturePlan(features, BASE_COLUMNS), version=manifest["version"],
+                         manifest=manifest)
+    engine = build_engine(bundle)
+    if engine is not None:
+        engine_path = os.path.splitext(artifact_path)[0] + ENGINE_SUFFIX
+        engine.save(engine_path)
+        manifest["engine"] = {
+            "artifact": os.path.basename(engine_path),
+            "sha256": file_sha256(engine_path),
+            "format": ARTIFACT_FORMAT,
+        }
+    return manifest
+
+
+# 读取模型清单
+def load_manifest(manifest_path=MANIFEST_PATH):
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"找不到模型清单: {manifest_path}")
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 解析清单中的模型文件路径（相对路径以清单所在目录为基准）
+def resolve_artifact(manifest, manifest_path=MANIFEST_PATH):
+    artifact = manifest["artifact"]
+    if not os.path.isabs(artifact):
+        artifact = os.path.join(os.path.dirname(os.path.abspath(manifest_path)), artifact)
+    if not os.path.exists(artifact):
+        raise FileNotFoundError(f"找不到模型文件: {artifact}")
+    return artifact
+
+
+# 预热：完整执行一次特征构建和预测，触发首次调用的惰性初始化
+def warm_up(bundle):
+    bundle.predict_proba(np.array([WARMUP_ROW]))
+
+
+def load_bundle(manifest_path=MANIFEST_PATH, backend=BACKEND):
+    """按清单加载模型：校验摘要、特征和类别，编译特征计划并预热
+
+    backend 为 engine 时优先以内存映射方式加载清单中登记的原生模型文件，不反序列化pickle；
+    没有原生模型文件时加载pickle并构建树引擎。sklearn 直接使用pickle中的模型，onnx 使用导出的ONNX图。
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"未知的推理后端: {backend}（可选: {', '.join(BACKENDS)}）")
+    manifest = load_manifest(manifest_path)
+    if backend == "onnx":
+        return _load_onnx_bundle(manifest, manifest_path)
+    if backend == "engine" and manifest.get("engine"):
+        return _load_native_bundle(manifest, manifest_path)
+
+    artifact = resolve_artifact(manifest, manifest_path)
+    sha256 = file_sha256(artifact)
+    if sha256 != manifest["sha256"]:
+        raise ValueError(f"模型文件摘要与清单不一致: {artifact}")
+
+    import joblib
+
+    model = joblib.load(artifact)
+    features = [str(f) for f in getattr(model, "feature_names_in_", BASE_COLUMNS)]
+    if features != manifest["features"]:
+        raise ValueError("模型特征列表与清单不一致")
+    if [int(c) for c in model.classes_] != manifest["classes"]:
+        raise ValueError("模型类别标签与清单不一致")
+
+    version = manifest.get("version") or make_version(manifest["name"], sha256)
+    bundle = ModelBundle(model=model, plan=FeaturePlan(features, BASE_COLUMNS), version=version, manifest=manifest)
+    if backend == "engine":
+        engine = build_engine(bundle)
+        bundle = replace(bundle, engine=engine, backend="engine" if engine is not None else "sklearn")
+    warm_up(bundle)
+    return bundle
+
+
+# 读取清单中登记的原生模型文件并校验摘要、类别和特征
+def load_native_engine(manifest, manifest_path=MANIFEST_PATH):
+    entry = manifest["engine"]
+    path = resolve_artifact(entry, manifest_path)
+    if file_sha256(path) != entry["sha256"]:
+        raise ValueError(f"原生模型文件摘要与清单不一致: {path}")
+
+    engine = TreeEngine.load(path)
+    if [int(c) for c in engine.classes_] != manifest["classes"]:
+        raise ValueError("原生模型类别标签与清单不一致")
+    if not set(engine.feature_names) <= set(manifest["features"]):
+        raise ValueError("原生模型包含清单之外的特征")
+    return engine
+
+
+# 从原生模型文件加载：树引擎同时充当模型，特征计划只包含树中用到的特征
+def _load_native_bundle(manifest, manifest_path):
+    engine = load_native_engine(manifest, manifest_path)
+    version = manifest.get("version") or make_version(manifest["name"], manifest["sha256"])
+    bundle = ModelBundle(model=engine, plan=engine.plan, version=version, manifest=manifest, engine=engine,
+                         backend="engine")
+    warm_up(bundle)
+    return bundle
+
+
+# 加载ONNX模型（由 onnx_backend.py 导出，与pickle同名），并确认它由清单中的同一模型版本导出
+def _load_onnx_bundle(manifest, manifest_path):
+    from onnx_backend import OnnxModel, onnx_path_for
+
+    path = resolve_artifact({"artifact": onnx_path_for(manifest["artifact"])}, manifest_path)
+    model = OnnxModel(path)
+    version = manifest.get("version") or make_version(manifest["name"], manifest["sha256"])
+    if model.model_version != version:
+        raise ValueError(f"ONNX模型版本 {model.model_version} 与清单 {version} 不一致，请重新导出")
+    if [int(c) for c in model.classes_] != manifest["classes"]:
+        raise ValueError("ONNX模型类别标签与清单不一致")
+
+    bundle = ModelBundle(model=model, plan=FeaturePlan(manifest["features"], BASE_COLUMNS), version=version,
+                         manifest=manifest, backend="onnx")
+    warm_up(bundle)
+    return bundle
+
+
+# 为树集成模型构建扁平数组引擎；非树模型或与sklearn结果不一致时返回None，继续使用sklearn推理
+def build_engine(bundle):
+    if not hasattr(bundle.model, "estimators_") or not hasattr(bundle.model.estimators_[0], "tree_"):
+        return None
+    engine = TreeEngine.from_sklearn(bundle.model)
+    mismatches = check_parity(bundle, engine, ENGINE_PARITY_ROWS)
+    if mismatches:
+        warnings.warn(f"树引擎有 {mismatches} / {ENGINE_PARITY_ROWS} 行结果与sklearn不一致，改用sklearn推理")
+        return None
+    return engine
+
+
+# 命令行：python model_registry.py [模型文件] —— 重新生成模型清单和原生模型文件
+if __name__ == "__main__":
+    artifact_path = sys.argv[1] if len(sys.argv) > 1 else "best_model_final.pkl"
+    manifest = build_manifest(artifact_path)
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"已写入模型清单: {MANIFEST_PATH} ({manifest['version']})")
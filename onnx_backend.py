@@ -0,0 +1,197 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from tree_engine import TreeEngine, float32_floor, random_corpus, sklearn_predict_base
+
+# ONNX 默认算子集与 ai.onnx.ml 算子集版本
+ONNX_OPSET = 15
+ONNX_ML_OPSET = 3
+
+# 模型文件的IR版本（与上面的算子集版本对应）；不固定时新版onnx会写出旧版ONNX Runtime无法加载的IR版本
+ONNX_IR_VERSION = 8
+
+# 与sklearn比较时允许的最大概率偏差（ONNX Runtime以float32累加各树概率）
+PARITY_ATOL = 1e-5
+
+# 每次送入ONNX Runtime的最大行数；图中的特征计划以double计算，分块以限制中间结果占用的内存
+RUN_CHUNK_ROWS = 1024
+
+
+# 由原生/pickle模型路径推导ONNX文件路径（同名、同目录）
+def onnx_path_for(artifact_path):
+    return os.path.splitext(artifact_path)[0] + ".onnx"
+
+
+def export_onnx(engine, path, model_version=""):
+    """将树引擎（含特征计划）导出为ONNX图
+
+    输入 base 为 (N, len(BASE_COLUMNS)) 的double矩阵；特征计划以double计算，转换为float32后送入
+    TreeEnsembleClassifier（阈值已按不大于原值的最大float32存储）。输出 label 和 probabilities。
+    """
+    from onnx import TensorProto, checker, helper, numpy_helper
+
+    plan = engine.plan
+    if plan.unresolved:
+        raise ValueError(f"特征计划中有无法解析的特征，不能导出: {plan.unresolved[:5]}")
+
+    nodes, initializers = [], []
+    counter = iter(range(1 << 30))
+
+    def name(prefix):
+        return f"{prefix}_{next(counter)}"
+
+    def const(values, dtype=np.int64):
+        tensor_name = name("const")
+        initializers.append(numpy_helper.from_array(np.asarray(values, dtype=dtype), tensor_name))
+        return tensor_name
+
+    def op(op_type, inputs, **attrs):
+        output = name(op_type.lower())
+        nodes.append(helper.make_node(op_type, inputs, [output], **attrs))
+        return output
+
+    # 特征计划：每个阶段从已计算的列中取源列、整列运算后追加到 computed
+    epsilon = const(1e-8, np.float64)
+    one = const(1.0, np.float64)
+    three = const(3.0, np.float64)
+    computed = None
+    position = {}  # 节点编号 -> computed 中的列号
+    for stage_op, dst, sources in plan.stages:
+        if stage_op == 'base':
+            block = op("Gather", ["base", const(sources[0])], axis=1)
+        else:
+            args = [op("Gather", [computed, const([position[s] for s in src])], axis=1) for src in sources]
+            if stage_op == 'squared':
+                block = op("Mul", [args[0], args[0]])
+            elif stage_op == 'cubed':
+                block = op("Pow", [args[0], three])
+            elif stage_op == 'sqrt':
+                block = op("Sqrt", [op("Abs", args)])
+            elif stage_op == 'log':
+                block = op("Log", [op("Add", [op("Abs", args), one])])
+            elif stage_op == 'ratio':
+                block = op("Div", [args[0], op("Add", [args[1], epsilon])])
+            elif stage_op == 'product':
+                block = op("Mul", args)
+            elif stage_op == 'sum':
+                block = op("Add", args)
+            else:
+                raise ValueError(f"不支持导出的特征运算: {stage_op}")
+        offset = 0 if computed is None else len(position)
+        position.update({int(node): offset + i for i, node in enumerate(dst)})
+        computed = block if computed is None else op("Concat", [computed, block], axis=1)
+
+    features = op("Gather", [computed, const([position[i] for i in range(plan.n_features)])], axis=1)
+    features32 = op("Cast", [features], to=TensorProto.FLOAT)
+
+    # 树集成：节点编号按每棵树内部重新编号，叶子的类别权重为该树概率除以树数
+    roots = np.append(np.asarray(engine.roots), len(engine.feature))
+    thresholds = float32_floor(np.asarray(engine.threshold, dtype=np.float64))
+    tree_ids, node_ids, feature_ids, values, modes, true_ids, false_ids = [], [], [], [], [], [], []
+    class_tree, class_node, class_id, class_weight = [], [], [], []
+    n_classes = len(engine.classes_)
+    for t in range(engine.n_estimators):
+        start, end = int(roots[t]), int(roots[t + 1])
+        for node in range(start, end):
+            leaf = engine.left[node] == node
+            tree_ids.append(t)
+            node_ids.append(node - start)
+            feature_ids.append(0 if leaf else int(engine.feature[node]))
+            values.append(0.0 if leaf else float(thresholds[node]))
+            modes.append("LEAF" if leaf else "BRANCH_LEQ")
+            true_ids.append(0 if leaf else int(engine.left[node]) - start)
+            false_ids.append(0 if leaf else int(engine.right[node]) - start)
+            if leaf:
+                for c in range(n_classes):
+                    class_tree.append(t)
+                    class_node.append(node - start)
+                    class_id.append(c)
+                    class_weight.append(float(engine.leaf_proba[node, c]) / engine.n_estimators)
+
+    nodes.append(helper.make_node(
+        "TreeEnsembleClassifier", [features32], ["label", "probabilities"], domain="ai.onnx.ml",
+        nodes_treeids=tree_ids, nodes_nodeids=node_ids, nodes_featureids=feature_ids,
+        nodes_values=values, nodes_modes=modes, nodes_truenodeids=true_ids, nodes_falsenodeids=false_ids,
+        nodes_missing_value_tracks_true=[0] * len(tree_ids),
+        class_treeids=class_tree, class_nodeids=class_node, class_ids=class_id, class_weights=class_weight,
+        classlabels_int64s=[int(c) for c in engine.classes_], post_transform="NONE",
+    ))
+
+    graph = helper.make_graph(
+        nodes, "rockburst",
+        [helper.make_tensor_value_info("base", TensorProto.DOUBLE, [None, len(plan.base_columns)])],
+        [helper.make_tensor_value_info("label", TensorProto.INT64, [None]),
+         helper.make_tensor_value_info("probabilities", TensorProto.FLOAT, [None, n_classes])],
+        initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[
+        helper.make_opsetid("", ONNX_OPSET), helper.make_opsetid("ai.onnx.ml", ONNX_ML_OPSET)],
+        ir_version=ONNX_IR_VERSION)
+    helper.set_model_props(model, {"model_version": model_version,
+                                   "classes": "|".join(str(int(c)) for c in engine.classes_),
+                                   "base_columns": "|".join(plan.base_columns)})
+    checker.check_model(model)
+    with open(path, "wb") as f:
+        f.write(model.SerializeToString())
+    return path
+
+
+class OnnxModel:
+    """基于ONNX Runtime（CPU）的推理后端：输入基础列，特征计划和树集成都在图中完成"""
+
+    def __init__(self, path, threads=0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads  # 0 表示由ONNX Runtime按CPU核数决定
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.model_version = meta.get("model_version", "")
+        self.classes_ = np.array([int(c) for c in meta.get("classes", "").split("|") if c])
+        self.base_columns = meta.get("base_columns", "").split("|")
+        self.path = path
+
+    def predict_base(self, base_values):
+        """由基础列 (N, len(BASE_COLUMNS)) 预测各类别概率 (float64)"""
+        base_values = np.ascontiguousarray(base_values, dtype=np.float64)
+        chunks = [
+            self.session.run(["probabilities"], {"base": base_values[start:start + RUN_CHUNK_ROWS]})[0]
+            for start in range(0, len(base_values), RUN_CHUNK_ROWS)
+        ]
+        return np.vstack(chunks).astype(np.float64)
+
+
+def check_parity(onnx_model, bundle, n_rows=5000, seed=0):
+    """与sklearn模型比较：返回 (最大概率偏差, 预测等级一致的比例)"""
+    corpus = random_corpus(n_rows, seed)
+    expected = sklearn_predict_base(bundle, corpus)
+    actual = onnx_model.predict_base(corpus)
+    max_diff = float(np.abs(expected - actual).max())
+    agreement = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+    return max_diff, agreement
+
+
+# 命令行：python onnx_backend.py [--check N] —— 导出当前模型的ONNX图并与sklearn结果比较
+if __name__ == "__main__":
+    from model_registry import MANIFEST_PATH, load_bundle, load_manifest, resolve_artifact
+
+    parser = argparse.ArgumentParser(description="导出ONNX模型（含特征计划）并校验与sklearn的一致性")
+    parser.add_argument("--output", help="ONNX文件路径（默认与pickle同名）")
+    parser.add_argument("--check", type=int, default=5000, metavar="N", help="一致性校验的随机样本数，0表示不校验")
+    args = parser.parse_args()
+
+    bundle = load_bundle(backend="sklearn")
+    manifest = load_manifest(MANIFEST_PATH)
+    output = args.output or onnx_path_for(resolve_artifact(manifest, MANIFEST_PATH))
+    export_onnx(TreeEngine.from_sklearn(bundle.model), output, bundle.version)
+    print(f"已导出ONNX模型: {output} ({os.path.getsize(output) / 1024:.0f} KB)")
+
+    if args.check:
+        max_diff, agreement = check_parity(OnnxModel(output), bundle, args.check)
+        print(f"与sklearn比较 ({args.check} 行): 最大概率偏差 {max_diff:.2e}, 等级一致 {agreement:.2%}")
+        if max_diff > PARITY_ATOL or agreement < 1.0:
+            print(f"一致性校验失败（允许偏差 {PARITY_ATOL:g}）", file=sys.stderr)
+            sys.exit(1)
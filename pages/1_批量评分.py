@@ -0,0 +1,145 @@
+import functools
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import streamlit as st
+
+from batch_score import init_worker
+from features import RAW_COLUMNS, validate_ranges
+from inference import PROBA_COLUMNS, get_model_version, predict_batch
+from utils import load_model_bundle
+
+# 每次送入模型的行数，决定进度条的刷新粒度和各评分进程之间的负载均衡
+SCORE_CHUNK_ROWS = 5000
+
+# 评分进程数（默认CPU核数），可通过环境变量调整，1表示在页面进程内评分
+SCORE_WORKERS = int(os.environ.get("ROCKBURST_SCORE_WORKERS", "0")) or os.cpu_count() or 1
+
+# 页面上预览的最大行数，完整结果通过下载获取
+PREVIEW_ROWS = 1000
+
+st.set_page_config(
+    page_title="批量评分 · 中南大学智能岩爆风险评估系统",
+    page_icon="🪨",
+    layout="wide",
+)
+
+try:
+    load_model_bundle()
+except Exception:
+    pass  # 加载失败时预测会自动切换到备用模型
+
+
+# 读取上传的CSV或Excel（.xlsx）文件；按文件内容缓存，重复渲染时不再解析
+@st.cache_data(max_entries=8, show_spinner=False)
+def read_upload(file_name, data):
+    import pandas as pd
+
+    if file_name.lower().endswith(".xlsx"):
+        return pd.read_excel(io.BytesIO(data))
+    return pd.read_csv(io.BytesIO(data), encoding="utf-8-sig")
+
+
+# 与命令行批量评分共用的进程池：每个进程只加载一次模型，跨会话共享；
+# 使用spawn启动，避免复制Streamlit服务进程中的线程状态
+@st.cache_resource(show_spinner=False)
+def scoring_pool():
+    if SCORE_WORKERS == 1:
+        return None
+    return ProcessPoolExecutor(max_workers=SCORE_WORKERS, initializer=init_worker,
+                               mp_context=multiprocessing.get_context("spawn"))
+
+
+# 分块批量评分有效行，每块一次predict_batch调用，按块的顺序收集结果并刷新进度
+def score_rows(values, progress_bar):
+    import pandas as pd
+
+    score = functools.partial(predict_batch, return_uncertainty=False)
+    chunks = [values.iloc[start:start + SCORE_CHUNK_ROWS] for start in range(0, len(values), SCORE_CHUNK_ROWS)]
+    pool = scoring_pool()
+    pending = [pool.submit(score, chunk) for chunk in chunks] if pool is not None else chunks
+
+    parts = []
+    done = 0
+    for item in pending:
+        parts.append(item.result() if pool is not None else score(item))
+        done += len(parts[-1])
+        progress_bar.progress(done / len(values), text=f"已评分 {done} / {len(values)} 行")
+    result = pd.concat(parts, ignore_index=True)
+    result.index = values.index
+    result.attrs["degraded"] = any(part.attrs.get("degraded", False) for part in parts)
+    return result
+
+
+st.markdown("## 批量评分")
+st.markdown(
+    f"上传包含列 {'、'.join(f'`{column}`' for column in RAW_COLUMNS)} 的 CSV 或 Excel 文件，"
+    "比值列 σθ/σc、σc/σt 自动推导。各参数按单点预测表单的输入范围校验，只有有效行会被评分。"
+)
+
+uploaded = st.file_uploader("选择文件", type=["csv", "xlsx"])
+if uploaded is not None:
+    try:
+        frame = read_upload(uploaded.name, uploaded.getvalue())
+    except ImportError:
+        st.error("读取Excel文件需要安装 openpyxl，请改为上传CSV或安装该依赖。")
+        st.stop()
+    except Exception as e:
+        st.error(f"无法读取文件: {e}")
+        st.stop()
+
+    missing = [column for column in RAW_COLUMNS if column not in frame.columns]
+    if missing:
+        st.error(f"文件缺少必要的列: {missing}")
+        st.stop()
+
+    values, errors = validate_ranges(frame)
+    valid = errors == ""
+
+    metric_cols = st.columns(3)
+    metric_cols[0].metric("总行数", len(frame))
+    metric_cols[1].metric("有效行", int(valid.sum()))
+    metric_cols[2].metric("无效行", int((~valid).sum()))
+    if (~valid).any():
+        with st.expander("无效行明细"):
+            st.dataframe(frame[~valid].assign(校验结果=errors[~valid]).head(PREVIEW_ROWS), use_container_width=True)
+
+    result_key = (uploaded.name, uploaded.size, get_model_version())
+    if st.button("开始批量评分", disabled=not valid.any()):
+        progress_bar = st.progress(0.0, text=f"已评分 0 / {int(valid.sum())} 行")
+        start_time = time.perf_counter()
+        scored = score_rows(values[valid], progress_bar)
+        elapsed = time.perf_counter() - start_time
+
+        output = frame.assign(校验结果=errors.where(~valid, "有效"))
+        output = output.join(scored[["prediction", "prediction_text"] + PROBA_COLUMNS])
+        output["prediction"] = output["prediction"].astype("Int64")
+        # 结果保存在会话中，点击下载按钮引起的重新运行不会丢失
+        st.session_state["batch_result"] = {
+            "key": result_key,
+            "output": output,
+            "elapsed": elapsed,
+            "degraded": scored.attrs["degraded"],
+        }
+
+    batch_result = st.session_state.get("batch_result")
+    if batch_result is not None and batch_result["key"] == result_key:
+        output = batch_result["output"]
+        n_scored = int(output["prediction"].notna().sum())
+        st.success(f"已完成 {n_scored} 行评分，用时 {batch_result['elapsed']:.1f} 秒"
+                   f"（{n_scored / max(batch_result['elapsed'], 1e-9):,.0f} 行/秒）")
+        if batch_result["degraded"]:
+            st.warning("主模型不可用，本次结果来自备用模型，仅供参考。")
+
+        st.dataframe(output.head(PREVIEW_ROWS), use_container_width=True)
+        if len(output) > PREVIEW_ROWS:
+            st.caption(f"仅预览前 {PREVIEW_ROWS} 行，完整结果请下载。")
+        st.download_button(
+            "下载评分结果 (CSV)",
+            data=output.to_csv(index=False).encode("utf-8-sig"),
+            file_name=f"{uploaded.name.rsplit('.', 1)[0]}_评分结果.csv",
+            mime="text/csv",
+        )
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+
+# 输入量化精度（与界面输入控件的step一致）
+QUANT_STEP = 0.1
+
+# 参与量化的原始参数；比值由量化后的参数重新计算，不单独进入缓存键
+QUANTIZED_FIELDS = ['sigma_theta', 'sigma_c', 'sigma_t', 'wet']
+
+
+# 将输入参数量化到控件精度，并据此重新计算比值
+def quantize_input(input_data, step=QUANT_STEP):
+    quantized = dict(input_data)
+    for field in QUANTIZED_FIELDS:
+        quantized[field] = round(round(float(input_data[field]) / step) * step, 10)
+    quantized['rock_type'] = float(input_data['rock_type'])
+    quantized['sigma_theta_c_ratio'] = quantized['sigma_theta'] / quantized['sigma_c']
+    quantized['sigma_c_t_ratio'] = quantized['sigma_c'] / quantized['sigma_t']
+    return quantized
+
+
+# 缓存键：模型版本 + 岩石种类 + 量化后的原始参数
+def make_key(quantized_input, model_version):
+    return (model_version, quantized_input['rock_type']) + tuple(quantized_input[f] for f in QUANTIZED_FIELDS)
+
+
+class _Flight:
+    """正在进行中的一次计算，供并发的相同请求等待结果"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class PredictionCache:
+    """进程内共享的预测缓存：按条目数LRU淘汰、TTL过期，并合并并发的相同请求"""
+
+    def __init__(self, max_entries=4096, ttl=3600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (过期时间, 结果)
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_or_compute(self, key, compute, cacheable=None):
+        """命中时直接返回缓存结果；未命中时只由一个调用方执行compute，其余调用方等待同一结果
+
+        cacheable(结果) 为假时结果只返回给本次及并发等待的调用方，不写入缓存。
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            if cacheable is not None and not cacheable(flight.value):
+                return flight.value
+            with self._lock:
+                self._entries[key] = (self._clock() + self.ttl, flight.value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return flight.value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# 进程级共享实例
+PREDICTION_CACHE = PredictionCache()
+EXPLANATION_CACHE = PredictionCache(max_entries=1024)
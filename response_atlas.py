@@ -0,0 +1,178 @@
+import argparse
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+from features import COLUMN_INDEX, COLUMN_MAPPING, INPUT_RANGES, ROCK_TYPES
+from model_registry import load_bundle
+
+# 响应面图谱的默认存放目录，每个模型版本一个子目录
+ATLAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "atlas")
+
+# 网格维度（顺序即概率数组的轴顺序）及默认的网格点数
+ATLAS_AXES = ['sigma_theta', 'sigma_c', 'sigma_t', 'wet']
+DEFAULT_POINTS = {'sigma_theta': 20, 'sigma_c': 29, 'sigma_t': 25, 'wet': 11}
+
+# 概率量化为uint8存储，体积为float32的四分之一
+QUANT_SCALE = 255.0
+
+# 每次送入模型的网格样本数
+BUILD_CHUNK_ROWS = 20000
+
+# 模型版本号中包含'@'，转换为可用作目录名的形式
+def atlas_path(version, atlas_dir=ATLAS_DIR):
+    return os.path.join(atlas_dir, version.replace("@", "-"))
+
+
+# 由四个原始参数构造模型输入行，比值列按定义推导
+def _grid_rows(rock_code, sigma_theta, sigma_c, sigma_t, wet):
+    values = {
+        'rock_type': np.full(len(sigma_theta), rock_code),
+        'sigma_theta': sigma_theta,
+        'sigma_c': sigma_c,
+        'sigma_t': sigma_t,
+        'sigma_theta_c_ratio': sigma_theta / sigma_c,
+        'sigma_c_t_ratio': sigma_c / sigma_t,
+        'wet': wet,
+    }
+    return np.column_stack([values[key] for key in COLUMN_MAPPING])
+
+
+def build_atlas(points=None, atlas_dir=ATLAS_DIR, bundle=None, verbose=True):
+    """离线任务：在每种岩石的 σθ × σc × σt × Wet 网格上评估模型，写入量化后的概率数组"""
+    bundle = bundle or load_bundle()
+    points = dict(DEFAULT_POINTS, **(points or {}))
+    axes = [np.linspace(*INPUT_RANGES[name], points[name]) for name in ATLAS_AXES]
+    rock_codes = sorted(ROCK_TYPES.values())
+
+    out_dir = atlas_path(bundle.version, atlas_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    shape = (len(rock_codes),) + tuple(len(axis) for axis in axes) + (len(bundle.model.classes_),)
+    probabilities = np.lib.format.open_memmap(
+        os.path.join(out_dir, "probabilities.npy"), mode="w+", dtype=np.uint8, shape=shape)
+
+    mesh = [m.ravel() for m in np.meshgrid(*axes, indexing="ij")]
+    for r, rock_code in enumerate(rock_codes):
+        start_time = time.perf_counter()
+        rows = _grid_rows(rock_code, *mesh)
+        flat = np.vstack([
+            bundle.predict_proba(rows[start:start + BUILD_CHUNK_ROWS])
+            for start in range(0, len(rows), BUILD_CHUNK_ROWS)
+        ])
+        probabilities[r] = np.rint(flat * QUANT_SCALE).astype(np.uint8).reshape(shape[1:])
+        if verbose:
+            print(f"岩石种类 {rock_code:g}: {len(rows)} 个网格点, 用时 {time.perf_counter() - start_time:.1f}s")
+    probabilities.flush()
+
+    meta = {
+        "model_version": bundle.version,
+        "axes": {name: axis.tolist() for name, axis in zip(ATLAS_AXES, axes)},
+        "rock_codes": rock_codes,
+        "classes": [int(c) for c in bundle.model.classes_],
+        "quant_scale": QUANT_SCALE,
+    }
+    with open(os.path.join(out_dir, "atlas.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return out_dir
+
+
+class ResponseAtlas:
+    """按模型版本存储的概率响应面，支持多线性插值查询"""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, "atlas.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.version = self.meta["model_version"]
+        self.axes = [np.asarray(self.meta["axes"][name]) for name in ATLAS_AXES]
+        self.rock_codes = np.asarray(self.meta["rock_codes"])
+        self.scale = self.meta["quant_scale"]
+        # 以只读内存映射方式打开，多个进程共享同一份页面
+        self.probabilities = np.load(os.path.join(directory, "probabilities.npy"), mmap_mode="r")
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(ATLAS_AXES))))
+
+    @classmethod
+    def load(cls, version, atlas_dir=ATLAS_DIR):
+        directory = atlas_path(version, atlas_dir)
+        if not os.path.exists(os.path.join(directory, "atlas.json")):
+            raise FileNotFoundError(f"找不到模型 {version} 的响应面图谱: {directory}")
+        return cls(directory)
+
+    # 判断各行是否落在图谱覆盖范围内（岩石种类已收录且四个参数都在网格范围内）
+    def covers(self, rows):
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        inside = np.isin(rows[:, COLUMN_INDEX['rock_type']], self.rock_codes)
+        for name, axis in zip(ATLAS_AXES, self.axes):
+            values = rows[:, COLUMN_INDEX[name]]
+            inside &= (values >= axis[0]) & (values <= axis[-1])
+        return inside
+
+    def query(self, rows, exact=False, predict_proba=None):
+        """查询 (N, 7) 输入行的各类别概率
+
+        默认在16个网格顶点间做多线性插值；exact=True 时全部改用精确模型（必须提供 predict_proba），
+        超出图谱范围的行在提供 predict_proba 时回退到精确模型，否则报错。
+        """
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        if exact:
+            if predict_proba is None:
+                raise ValueError("exact=True 时需要提供精确模型 predict_proba")
+            return predict_proba(rows)
+
+        inside = self.covers(rows)
+        if not inside.all() and predict_proba is None:
+            raise ValueError("输入超出响应面图谱范围，请提供精确模型进行回退")
+
+        result = np.empty((len(rows), self.probabilities.shape[-1]))
+        if (~inside).any():
+            result[~inside] = predict_proba(rows[~inside])
+        if inside.any():
+            result[inside] = self._interpolate(rows[inside])
+        return result
+
+    # 四维多线性插值：定位所在网格单元，按各维相对位置对16个顶点加权
+    def _interpolate(self, rows):
+        rock_index = np.searchsorted(self.rock_codes, rows[:, COLUMN_INDEX['rock_type']])
+        index = [rock_index[:, None]]
+        weight = np.ones((len(rows), len(self._corners)))
+        for d, (name, axis) in enumerate(zip(ATLAS_AXES, self.axes)):
+            values = rows[:, COLUMN_INDEX[name]]
+            lower = np.clip(np.searchsorted(axis, values, side="right") - 1, 0, len(axis) - 2)
+            frac = ((values - axis[lower]) / (axis[lower + 1] - axis[lower]))[:, None]
+            offset = self._corners[:, d][None, :]
+            index.append(lower[:, None] + offset)
+            weight *= np.where(offset == 1, frac, 1.0 - frac)
+
+        # 一次取出所有顶点的概率 (N, 16, 类别数)，再按权重求和
+        result = np.einsum("nk,nkc->nc", weight, self.probabilities[tuple(index)])
+        return result / self.scale
+
+    def grade_map(self, rock_code, fixed, x_param='sigma_theta', y_param='sigma_c', resolution=100):
+        """在两个参数构成的平面上计算插值后的等级分布，用于绘制等级边界等值线
+
+        fixed 为其余参数的取值（键与 COLUMN_MAPPING 一致），返回 (x, y, 等级矩阵)。
+        """
+        x = np.linspace(*INPUT_RANGES[x_param], resolution)
+        y = np.linspace(*INPUT_RANGES[y_param], resolution)
+        grid_x, grid_y = np.meshgrid(x, y)
+        params = {name: np.full(grid_x.size, float(fixed.get(name, 0.0))) for name in ATLAS_AXES}
+        params[x_param] = grid_x.ravel()
+        params[y_param] = grid_y.ravel()
+        rows = _grid_rows(rock_code, *(params[name] for name in ATLAS_AXES))
+        probabilities = self._interpolate(rows)
+        grades = np.asarray(self.meta["classes"])[np.argmax(probabilities, axis=1)]
+        return x, y, grades.reshape(grid_x.shape)
+
+
+# 命令行：python response_atlas.py [--points σθ σc σt Wet] —— 为当前模型版本生成响应面图谱
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="为当前模型生成各岩石种类的概率响应面图谱")
+    parser.add_argument("--points", nargs=4, type=int, metavar=("SIGMA_THETA", "SIGMA_C", "SIGMA_T", "WET"),
+                        help="各维度的网格点数")
+    parser.add_argument("--atlas-dir", default=ATLAS_DIR, help="图谱输出目录")
+    args = parser.parse_args()
+
+    points = dict(zip(ATLAS_AXES, args.points)) if args.points else None
+    print(f"已写入响应面图谱: {build_atlas(points, args.atlas_dir)}")
@@ -0,0 +1,263 @@
+import functools
+import os
+import re
+
+from charts import create_correlation_heatmap, create_grade_distribution_pie, create_risk_factor_chart
+
+# 页面样式表
+STYLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "styles.css")
+
+# 每个动态区块按输入缓存的结果数（进程内、跨会话共享）
+SECTION_CACHE_SIZE = 256
+
+# 岩爆等级说明卡片
+GRADE_INFO = [
+    {
+        "grade": "无岩爆倾向 (0级)",
+        "description": "岩石在开挖过程中稳定性较好，不易发生岩爆现象。",
+        "color": "grade-0",
+        "icon": "✅"
+    },
+    {
+        "grade": "弱岩爆倾向 (1级)",
+        "description": "岩石可能会发生轻微的岩体破坏，但规模小，危害有限。",
+        "color": "grade-1",
+        "icon": "⚠️"
+    },
+    {
+        "grade": "中等岩爆倾向 (2级)",
+        "description": "岩石有较明显的岩爆倾向，可能会发生中等规模的岩爆事件，需要采取预防措施。",
+        "color": "grade-2",
+        "icon": "🔥"
+    },
+    {
+        "grade": "强岩爆倾向 (3级)",
+        "description": "岩石具有强烈的岩爆倾向，极易发生大规模岩爆事件，需要严格的监测和防护措施。",
+        "color": "grade-3",
+        "icon": "⛔"
+    }
+]
+
+# 分级防治建议
+RECOMMENDATIONS = [
+    {
+        "title": "评估与监测",
+        "content": "在进行隧道或地下工程开挖前，建议进行详细的岩体稳定性评估，并部署实时监测系统。",
+        "icon": "📊"
+    },
+    {
+        "title": "开挖技术选择",
+        "content": "对于中高岩爆倾向区域，应采用控制爆破技术，分段开挖，减小扰动。",
+        "icon": "⛏️"
+    },
+    {
+        "title": "应力释放措施",
+        "content": "考虑使用预裂爆破、光面爆破等方法减小爆破震动，对于强岩爆倾向区域，可采用预应力释放钻孔等措施。",
+        "icon": "💥"
+    },
+    {
+        "title": "支护加固方案",
+        "content": "根据岩爆等级选择合适的支护方案，如柔性支护、高强锚杆、压力释放支护等。",
+        "icon": "🛡️"
+    },
+    {
+        "title": "应急响应",
+        "content": "建立完善的应急预案，配备必要的救援设备，加强人员安全培训。",
+        "icon": "🚨"
+    }
+]
+
+
+# ---------------------------------------------------------------- 静态区块（进程内只生成一次）
+
+@functools.lru_cache(maxsize=None)
+def page_css(path=STYLE_PATH):
+    """读取样式表，去掉注释和多余空白后包装为<style>标签"""
+    with open(path, encoding="utf-8") as f:
+        css = f.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    return f"<style>{css.strip()}</style>"
+
+
+@functools.lru_cache(maxsize=None)
+def grade_cards_html():
+    return "".join(f'''
+        <div style="margin-bottom: 15px; padding: 15px; background-color: #F8FAFC; border-radius: 8px; border-left: 4px solid #3B82F6;">
+            <div style="display: flex; align-items: center;">
+                <div style="font-size: 1.5rem; margin-right: 10px;">{grade["icon"]}</div>
+                <span class="grade-label {grade["color"]}">{grade["grade"]}</span>
+            </div>
+            <p style="margin-top: 10px; color: #334155;">{grade["description"]}</p>
+        </div>
+        ''' for grade in GRADE_INFO)
+
+
+@functools.lru_cache(maxsize=None)
+def recommendation_cards_html():
+    return "".join(f'''
+        <div style="margin-bottom: 15px; display: flex; align-items: flex-start;">
+            <div style="font-size: 1.8rem; margin-right: 15px; color: #3B82F6;">{rec["icon"]}</div>
+            <div>
+                <div style="font-weight: 600; color: #1E293B; margin-bottom: 5px;">{rec["title"]}</div>
+                <p style="margin: 0; color: #64748b;">{rec["content"]}</p>
+            </div>
+        </div>
+        ''' for rec in RECOMMENDATIONS)
+
+
+# ---------------------------------------------------------------- 数据洞察（按各自的输入缓存）
+
+# 将输入参数字典转换为可作为缓存键的元组
+def freeze(input_data):
+    return tuple(sorted(input_data.items())) if input_data else ()
+
+
+# 评估当前参数的岩爆风险
+def evaluate_risk_factor(factor_name, value, optimal_range, critical_threshold):
+    """计算每个因素的风险得分"""
+    if factor_name == "σθ/σc比值":
+        # 应力比例越高，风险越高
+        if value < optimal_range[0]:
+            return 0.3  # 低风险
+        elif value < critical_threshold:
+            return 0.6  # 中等风险
+        else:
+            return 0.9  # 高风险
+    elif factor_name == "σc/σt比值":
+        # 抗压抗拉比例越高，岩石越脆性，风险越高
+        if value < optimal_range[0]:
+            return 0.3  # 低风险
+        elif value < critical_threshold:
+            return 0.7  # 中等风险
+        else:
+            return 0.95  # 高风险
+    elif factor_name == "围岩应力":
+        # 围岩应力越高，风险越高
+        if value < optimal_range[1]:
+            return 0.2  # 低风险
+        elif value < critical_threshold:
+            return 0.6  # 中等风险
+        else:
+            return 0.9  # 高风险
+    elif factor_name == "抗压强度":
+        # 抗压强度越低，风险越高（反向关系）
+        if value > optimal_range[0]:
+            return 0.2  # 低风险
+        elif value > critical_threshold:
+            return 0.5  # 中等风险
+        else:
+            return 0.9  # 高风险
+    else:
+        return 0.5  # 默认中等风险
+
+
+@functools.lru_cache(maxsize=SECTION_CACHE_SIZE)
+def risk_factor_section(sigma_theta_c_ratio, sigma_c_t_ratio, sigma_theta, sigma_c):
+    """岩爆因素分析：返回 (条形图, 综合风险评分HTML)；结果在会话间共享，调用方只能读取"""
+    # 定义各因素的风险评估标准
+    risk_factors = [
+        {
+            "name": "σθ/σc比值",
+            "value": sigma_theta_c_ratio,
+            "optimal_range": [0.1, 0.3],
+            "critical_threshold": 0.5,
+            "description": "应力比值是岩爆的重要指标，比值越高，岩爆风险越大"
+        },
+        {
+            "name": "σc/σt比值",
+            "value": sigma_c_t_ratio,
+            "optimal_range": [5, 15],
+            "critical_threshold": 25,
+            "description": "抗压抗拉比值反映岩石脆性，比值越高，岩爆风险越大"
+        },
+        {
+            "name": "围岩应力",
+            "value": sigma_theta,
+            "optimal_range": [10, 50],
+            "critical_threshold": 120,
+            "description": "高围岩应力是岩爆发生的主要诱因"
+        },
+        {
+            "name": "抗压强度",
+            "value": sigma_c,
+            "optimal_range": [80, 300],
+            "critical_threshold": 50,
+            "description": "低抗压强度的岩石更容易发生岩爆"
+        }
+    ]
+
+    # 计算各因素风险得分
+    for factor in risk_factors:
+        factor["score"] = evaluate_risk_factor(
+            factor["name"],
+            factor["value"],
+            factor["optimal_range"],
+            factor["critical_threshold"]
+        )
+
+    # 计算综合风险得分
+    weighted_scores = [0.3*risk_factors[0]["score"], 0.25*risk_factors[1]["score"],
+                       0.3*risk_factors[2]["score"], 0.15*risk_factors[3]["score"]]
+    total_risk = sum(weighted_scores)
+
+    # 风险评级
+    risk_level = "低" if total_risk < 0.3 else "中" if total_risk < 0.7 else "高"
+    risk_color = "#10B981" if risk_level == "低" else "#F59E0B" if risk_level == "中" else "#DC2626"
+
+    summary_html = f'''
+    <div style="background-color: #F8FAFC; padding: 12px; border-radius: 8px; text-align: center;">
+        <p style="margin: 0; font-weight: bold; font-size: 1.1rem;">
+            综合风险评分: <span style="color: {risk_color};">{total_risk:.1%} ({risk_level})</span>
+        </p>
+        <p style="margin-top: 8px; color: #64748b; font-size: 0.85rem;">
+            基于多因素加权分析的岩爆综合风险评估
+        </p>
+    </div>
+    '''
+    return create_risk_factor_chart(risk_factors), summary_html
+
+
+@functools.lru_cache(maxsize=SECTION_CACHE_SIZE)
+def grade_distribution_section(frozen_input):
+    """岩爆等级分布饼图，frozen_input 为 freeze(input_data)"""
+    return create_grade_distribution_pie(dict(frozen_input))
+
+
+@functools.lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _illustrative_correlation(frozen_input):
+    return create_correlation_heatmap(dict(frozen_input))
+
+
+# 按统计版本缓存：数据集有新增案例后版本号变化，旧的图表不再命中
+@functools.lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _case_correlation(stats, version, rock_type):
+    return create_correlation_heatmap(corr_data=stats.correlation(rock_type))
+
+
+def correlation_section(frozen_input):
+    """参数相关性热图，返回 (图表, 说明文字)；frozen_input 为 freeze(input_data)
+
+    有案例数据集时使用当前岩石种类案例的相关系数（该种类案例不足时用全部案例），
+    统计由 case_stats 增量维护，这里只取预先计算好的矩阵；没有数据集或案例不足时显示按输入参数生成的示意矩阵。
+    """
+    from case_stats import CASES_PATH, MIN_CASES, load_case_statistics
+    from features import ROCK_NAMES
+
+    stats = load_case_statistics()
+    if stats is None:
+        return (_illustrative_correlation(frozen_input),
+                f"未找到案例数据集 {os.path.basename(CASES_PATH)}，图中为示意的相关系数")
+    if stats.count() < MIN_CASES:
+        return (_illustrative_correlation(frozen_input),
+                f"案例数据集 {os.path.basename(CASES_PATH)} 中有效案例不足 {MIN_CASES} 个，图中为示意的相关系数")
+
+    rock_type = dict(frozen_input).get("rock_type")
+    rock_name = ROCK_NAMES.get(rock_type, "")
+    if stats.count(rock_type) >= MIN_CASES:
+        caption = f"基于 {stats.count(rock_type)} 个{rock_name}案例的相关系数"
+    else:
+        caption = f"{rock_name}案例不足 {MIN_CASES} 个，显示全部 {stats.count()} 个案例的相关系数"
+        rock_type = None
+    return _case_correlation(stats, stats.version, rock_type), caption
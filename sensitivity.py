@@ -0,0 +1,101 @@
+import numpy as np
+
+from features import COLUMN_INDEX, COLUMN_MAPPING, INPUT_RANGES
+from inference import PROBA_COLUMNS, predict_batch
+
+# 可做敏感性分析的参数：键 -> (显示名称, 坐标轴标题)
+SENSITIVITY_PARAMETERS = {
+    'sigma_theta': ("围岩应力", "围岩应力 (MPa)"),
+    'sigma_c': ("抗压强度", "抗压强度 (MPa)"),
+    'sigma_t': ("抗拉强度", "抗拉强度 (MPa)"),
+    'wet': ("含水率", "含水率 (Wet)"),
+    'sigma_theta_c_ratio': ("σθ/σc比值", "σθ/σc"),
+    'sigma_c_t_ratio': ("σc/σt比值", "σc/σt"),
+}
+
+
+# 参数的扫描范围；比值参数由分母固定、分子在输入范围内变化推得
+def parameter_range(input_data, param):
+    if param == 'sigma_theta_c_ratio':
+        low, high = INPUT_RANGES['sigma_theta']
+        return low / input_data['sigma_c'], high / input_data['sigma_c']
+    if param == 'sigma_c_t_ratio':
+        low, high = INPUT_RANGES['sigma_c']
+        return low / input_data['sigma_t'], high / input_data['sigma_t']
+    return INPUT_RANGES[param]
+
+
+# 构造扫描样本矩阵：只改变指定参数，并逐点重新计算依赖的比值
+def _sweep_rows(input_data, param, values):
+    rows = np.tile([float(input_data[key]) for key in COLUMN_MAPPING], (len(values), 1))
+    col = COLUMN_INDEX
+
+    if param == 'sigma_theta_c_ratio':
+        # 固定σc，由比值反推σθ
+        rows[:, col['sigma_theta']] = values * rows[:, col['sigma_c']]
+    elif param == 'sigma_c_t_ratio':
+        # 固定σt，由比值反推σc
+        rows[:, col['sigma_c']] = values * rows[:, col['sigma_t']]
+    else:
+        rows[:, col[param]] = values
+
+    rows[:, col['sigma_theta_c_ratio']] = rows[:, col['sigma_theta']] / rows[:, col['sigma_c']]
+    rows[:, col['sigma_c_t_ratio']] = rows[:, col['sigma_c']] / rows[:, col['sigma_t']]
+    return rows
+
+
+# 在等级发生变化的区间内均匀插入加密点
+def _refine_points(values, grades, budget):
+    changes = np.flatnonzero(grades[1:] != grades[:-1])
+    if budget <= 0:
+        return np.empty(0)
+    if len(changes) == 0:
+        # 没有等级变化时在整个区间上均匀加密
+        changes = np.arange(len(values) - 1)
+
+    per_interval = max(1, budget // len(changes))
+    points = [np.linspace(values[i], values[i + 1], per_interval + 2)[1:-1] for i in changes]
+    return np.concatenate(points)[:budget]
+
+
+# 拆分批量预测结果为各参数的曲线
+def _split_curves(params, values_list, scored):
+    curves = {}
+    offset = 0
+    for param, values in zip(params, values_list):
+        part = scored.iloc[offset:offset + len(values)].reset_index(drop=True)
+        part.insert(0, param, values)
+        curves[param] = part
+        offset += len(values)
+    return curves
+
+
+def sensitivity_curves(input_data, params=None, n_points=200):
+    """计算多个参数的敏感性曲线
+
+    先对所有参数的粗网格做一次批量预测，再在岩爆等级发生变化的区间内加密并做第二次批量预测，
+    每个参数最终得到约 n_points 个点。返回 {参数: DataFrame}，列为参数值、prediction 和 Class 0..3。
+    """
+    import pandas as pd
+
+    params = list(params or SENSITIVITY_PARAMETERS)
+    n_coarse = max(2, n_points // 2)
+
+    # 第一轮：所有参数的粗网格合并为一次批量预测
+    coarse_values = [np.linspace(*parameter_range(input_data, param), n_coarse) for param in params]
+    coarse_rows = np.vstack([_sweep_rows(input_data, p, v) for p, v in zip(params, coarse_values)])
+    coarse = _split_curves(params, coarse_values, predict_batch(coarse_rows))
+
+    # 第二轮：在等级变化处加密，同样合并为一次批量预测
+    refine_values = [
+        _refine_points(values, coarse[param]["prediction"].to_numpy(), n_points - n_coarse)
+        for param, values in zip(params, coarse_values)
+    ]
+    refine_rows = np.vstack([_sweep_rows(input_data, p, v) for p, v in zip(params, refine_values)])
+    refined = _split_curves(params, refine_values, predict_batch(refine_rows)) if len(refine_rows) else {}
+
+    curves = {}
+    for param in params:
+        curve = pd.concat([coarse[param], refined.get(param)], ignore_index=True)
+        curves[param] = curve.sort_values(param, ignore_index=True)[[param, "prediction"] + PROBA_COLUMNS]
+    return curves
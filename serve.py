@@ -0,0 +1,245 @@
+import argparse
+import json
+import math
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metrics
+from features import COLUMN_MAPPING, RAW_COLUMNS, ROCK_TYPES, validate_ranges
+from inference import (PROBA_COLUMNS, explain_cached, get_model_version, load_model_bundle, predict_batch,
+                       predict_cached, uncertainty_records)
+
+# 服务默认监听地址，可通过环境变量或命令行参数覆盖
+DEFAULT_HOST = os.environ.get("ROCKBURST_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("ROCKBURST_PORT", "8000"))
+
+# /predict_batch 单次请求允许的最大行数
+MAX_BATCH_ROWS = int(os.environ.get("ROCKBURST_MAX_BATCH_ROWS", "5000"))
+
+# 请求体大小上限（字节）
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+# 请求中必须提供的原始参数；比值参数总是由原始参数推导，调用方提供时必须与推导值一致
+REQUIRED_FIELDS = ['rock_type', 'sigma_theta', 'sigma_c', 'sigma_t', 'wet']
+RATIO_FIELDS = ['sigma_theta_c_ratio', 'sigma_c_t_ratio']
+
+# 调用方提供的比值与推导值之间允许的相对偏差
+RATIO_RTOL = 1e-6
+
+
+class RequestError(Exception):
+    """请求内容不合法，以400返回给调用方"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# 校验单个样本的字段类型并转换为浮点数字典，比值由原始参数推导
+def parse_sample(sample, index=None):
+    where = "" if index is None else f"第{index}行: "
+    if not isinstance(sample, dict):
+        raise RequestError(f"{where}样本应为JSON对象")
+
+    missing = [field for field in REQUIRED_FIELDS if field not in sample]
+    if missing:
+        raise RequestError(f"{where}缺少必要的字段: {missing}")
+
+    values = {}
+    for field in REQUIRED_FIELDS + [f for f in RATIO_FIELDS if f in sample]:
+        value = sample[field]
+        if field == 'rock_type' and isinstance(value, str):
+            # 岩石种类可以是编码或名称，与批量评分的 validate_ranges 一致
+            if value not in ROCK_TYPES:
+                raise RequestError(f"{where}岩石种类无效: {value}")
+            value = ROCK_TYPES[value]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise RequestError(f"{where}字段 {field} 应为有限数值")
+        values[field] = float(value)
+
+    if values['sigma_c'] <= 0 or values['sigma_t'] <= 0:
+        raise RequestError(f"{where}sigma_c 和 sigma_t 必须大于0")
+    derived = {
+        'sigma_theta_c_ratio': values['sigma_theta'] / values['sigma_c'],
+        'sigma_c_t_ratio': values['sigma_c'] / values['sigma_t'],
+    }
+    for field, expected in derived.items():
+        if field in values and not math.isclose(values[field], expected, rel_tol=RATIO_RTOL):
+            raise RequestError(f"{where}字段 {field}={values[field]:g} 与原始参数推导的 {expected:g} 不一致")
+    values.update(derived)
+    return {key: values[key] for key in COLUMN_MAPPING}
+
+
+# 按输入控件的范围校验样本（与批量评分相同的 validate_ranges），有无效行时整个请求以400返回
+def check_ranges(samples, batch=False):
+    import pandas as pd
+
+    frame = pd.DataFrame([[sample[key] for key in COLUMN_MAPPING] for sample in samples],
+                         columns=list(COLUMN_MAPPING.values()))
+    _, errors = validate_ranges(frame[RAW_COLUMNS])
+    invalid = errors[errors != ""]
+    if len(invalid):
+        messages = [f"第{i}行: {error}" if batch else error for i, error in invalid.head(10).items()]
+        raise RequestError("; ".join(messages))
+    return samples
+
+
+# 解析并校验单个样本
+def parse_valid_sample(sample):
+    return check_ranges([parse_sample(sample)])[0]
+
+
+# 单样本预测：复用进程内预测缓存
+def handle_predict(payload):
+    return predict_cached(parse_valid_sample(payload))
+
+
+# 单样本解释：各参数对每个等级概率的TreeSHAP贡献，复用进程内解释缓存
+def handle_explain(payload):
+    explanation = explain_cached(parse_valid_sample(payload))
+    if explanation is None:
+        raise RequestError("当前模型不支持解释或主模型不可用", status=503)
+    return explanation
+
+
+# 批量预测：一次predict_batch调用完成所有行的评分
+def handle_predict_batch(payload):
+    rows = payload.get("rows") if isinstance(payload, dict) else payload
+    if not isinstance(rows, list) or not rows:
+        raise RequestError("请求体应为非空数组，或包含非空 rows 数组的对象")
+    if len(rows) > MAX_BATCH_ROWS:
+        raise RequestError(f"单次请求最多 {MAX_BATCH_ROWS} 行，实际为 {len(rows)} 行", status=413)
+
+    samples = check_ranges([parse_sample(row, i) for i, row in enumerate(rows)], batch=True)
+    result = predict_batch([[sample[key] for key in COLUMN_MAPPING] for sample in samples])
+    probabilities = result[PROBA_COLUMNS].to_numpy().tolist()
+    uncertainty = uncertainty_records(result) or [None] * len(result)
+    return {
+        "model_version": result.attrs.get("model_version"),
+        "degraded": result.attrs.get("degraded", False),
+        "predictions": [
+            {
+                "prediction": int(grade),
+                "prediction_text": text,
+                "probabilities": dict(zip(PROBA_COLUMNS, proba)),
+                "uncertainty": stats,
+            }
+            for grade, text, proba, stats in zip(result["prediction"], result["prediction_text"], probabilities,
+                                                 uncertainty)
+        ],
+    }
+
+
+# 健康检查：返回当前模型版本，主模型不可用时标记为降级
+def handle_health():
+    try:
+        version = load_model_bundle().version
+        return {"status": "ok", "model_version": version, "degraded": False}
+    except Exception as e:
+        return {"status": "degraded", "model_version": get_model_version(), "degraded": True, "error": str(e)}
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """JSON接口：POST /predict、POST /predict_batch、POST /explain、GET /health；GET /metrics 输出Prometheus文本格式的指标"""
+
+    # 使用HTTP/1.1长连接，高频调用方无需每次重新建立连接
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, handle_health())
+        elif self.path == "/metrics":
+            self._send_text(200, metrics.REGISTRY.render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._send_json(404, {"error": f"未知路径: {self.path}"})
+
+    def do_POST(self):
+        routes = {"/predict": handle_predict, "/predict_batch": handle_predict_batch, "/explain": handle_explain}
+        handler = routes.get(self.path)
+        self._body_consumed = False
+        try:
+            if handler is None:
+                self._discard_body()
+                raise RequestError(f"未知路径: {self.path}", status=404)
+            with metrics.span(f"http{self.path}"):
+                body = handler(self._read_json())
+            self._send_json(200, body)
+        except RequestError as e:
+            metrics.ERRORS.inc(stage="http_request")
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            metrics.ERRORS.inc(stage="http_server")
+            self._send_json(500, {"error": f"预测过程中出现错误: {e}"})
+
+    # 解析Content-Length，缺失时视为0；非数字或负数时返回400
+    def _content_length(self):
+        value = self.headers.get("Content-Length") or "0"
+        try:
+            length = int(value)
+        except ValueError:
+            raise RequestError(f"Content-Length 不合法: {value}")
+        if length < 0:
+            raise RequestError(f"Content-Length 不合法: {value}")
+        return length
+
+    # 读取并丢弃请求体，使长连接上的下一个请求能被正确解析；超过上限时不读取，响应后关闭连接
+    def _discard_body(self):
+        length = self._content_length()
+        if length <= MAX_BODY_BYTES:
+            self.rfile.read(length)
+            self._body_consumed = True
+
+    def _read_json(self):
+        length = self._content_length()
+        if length > MAX_BODY_BYTES:
+            raise RequestError(f"请求体超过 {MAX_BODY_BYTES} 字节", status=413)
+        data = self.rfile.read(length)
+        self._body_consumed = True
+        try:
+            return json.loads(data or b"null")
+        except ValueError:
+            raise RequestError("请求体不是合法的JSON")
+
+    def _send_json(self, status, body):
+        self._send_text(status, json.dumps(body, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def _send_text(self, status, text, content_type):
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if not getattr(self, "_body_consumed", True):
+            # 请求体未被读取，连接上剩余的字节无法作为下一个请求解析，只能关闭连接
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # 高频调用时不逐条输出访问日志
+        pass
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """创建多线程HTTP服务；模型在启动时加载并预热，首个请求无需等待"""
+    try:
+        load_model_bundle()
+    except Exception as e:
+        print(f"无法加载模型，将使用备用模型: {e}")
+    return ThreadingHTTPServer((host, port), PredictionHandler)
+
+
+# 命令行：python serve.py [--host HOST] [--port PORT] —— 启动无界面的HTTP推理服务
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="岩爆预测HTTP推理服务")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="监听端口")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port)
+    print(f"岩爆预测服务已启动: http://{args.host}:{args.port} (模型版本 {get_model_version()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -1,15 +1,23 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 import time
-from PIL import Image
-import base64
-import os
+
+# 本次页面运行的起始时间，结束时记入 rockburst_span_seconds{span="rerun"}
+RERUN_START = time.perf_counter()
 
 # 导入预测功能
-from utils import load_model, get_rock_burst_grade_text, predict_locally, create_grade_distribution_pie, create_correlation_heatmap
+from utils import load_model_bundle, get_model_version, predict_cached, explain_cached
+from sensitivity import SENSITIVITY_PARAMETERS, sensitivity_curves
+from features import INPUT_RANGES, ROCK_TYPES
+from assets import logo_data_uri, sidebar_image_bytes
+from prediction_cache import PREDICTION_CACHE
+from history import PredictionHistory
+from inference import PREDICTION_BATCHER
+from charts import create_risk_gauge, create_probability_chart, create_parameter_impact_radar, create_sensitivity_chart
+from sections import (
+    page_css, grade_cards_html, recommendation_cards_html, freeze, risk_factor_section, grade_distribution_section,
+    correlation_section
+)
+import metrics
 
 # 初始化默认input_data
 input_data = {
@@ -30,384 +38,24 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# 加载并编码图像为base64
-def get_image_base64(image_path):
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
+# 进程内首次运行时即加载并预热模型，后续请求和会话直接复用缓存
+try:
+    load_model_bundle()
+except Exception:
+    pass  # 加载失败时预测会自动切换到备用模型并给出提示
 
-# 获取中南大学Logo的base64编码
-logo_path = "WechatIMG250.jpg"  # 本地图片路径
-logo_base64 = get_image_base64(logo_path)
+model_version = get_model_version()
 
-# 自定义CSS样式 - 升级高级设计
-st.markdown("""
-<style>
-    /* 现代化设计CSS */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    html, body, [class*="css"] {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    }
-    
-    .main {
-        background-color: #f0f2f6;
-        background-image: linear-gradient(to bottom right, rgba(240, 242, 246, 0.9), rgba(240, 249, 255, 0.9));
-    }
-    
-    .stButton>button {
-        background: linear-gradient(90deg, #1e40af 0%, #3b82f6 100%);
-        color: white;
-        border-radius: 8px;
-        padding: 12px 24px;
-        font-weight: 600;
-        border: none;
-        box-shadow: 0 4px 14px rgba(27, 77, 165, 0.25);
-        transition: all 0.3s ease;
-    }
-    
-    .stButton>button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 20px rgba(27, 77, 165, 0.35);
-    }
-    
-    h1 {
-        font-weight: 700;
-        font-size: 2.5rem;
-        margin-bottom: 1rem;
-        color: #0F172A;
-        letter-spacing: -0.5px;
-    }
-    
-    h2 {
-        font-weight: 600;
-        font-size: 1.8rem;
-        color: #1E293B;
-        margin-top: 1.5rem;
-        letter-spacing: -0.3px;
-    }
-    
-    h3 {
-        font-weight: 600;
-        font-size: 1.3rem;
-        color: #334155;
-        margin-top: 1.2rem;
-    }
-    
-    .css-1kyxreq {  /* 侧边栏样式 */
-        background-image: linear-gradient(to bottom, #ffffff, #f8faff);
-        border-right: 1px solid #e2e8f0;
-    }
-    
-    .css-6qob1r {  /* 主内容区样式 */
-        background-image: linear-gradient(120deg, #f0f2f6, #f0f9ff);
-    }
-    
-    /* 卡片样式 */
-    .dashboard-card {
-        background-color: white;
-        border-radius: 12px;
-        padding: 24px;
-        box-shadow: 0 4px 16px rgba(0,0,0,0.04), 0 2px 6px rgba(0,0,0,0.02);
-        margin-bottom: 24px;
-        border: 1px solid #f1f5f9;
-        transition: transform 0.3s ease, box-shadow 0.3s ease;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .dashboard-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 14px 30px rgba(0,0,0,0.08), 0 4px 10px rgba(0,0,0,0.03);
-    }
-    
-    .dashboard-card::after {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 6px;
-        height: 100%;
-        background: linear-gradient(to bottom, #1e40af, #3b82f6);
-        border-top-left-radius: 12px;
-        border-bottom-left-radius: 12px;
-    }
-    
-    /* 结果卡片 */
-    .result-card {
-        background: linear-gradient(135deg, #ffffff 0%, #f5f7fa 100%);
-        border-radius: 16px;
-        padding: 30px;
-        box-shadow: 0 10px 25px rgba(0,0,0,0.05);
-        margin: 20px 0;
-        border: 1px solid #e5e9f0;
-    }
-    
-    /* 图表容器 */
-    .chart-container {
-        background-color: white;
-        border-radius: 12px;
-        padding: 20px;
-        box-shadow: 0 4px 16px rgba(0,0,0,0.04);
-        margin-bottom: 24px;
-        border: 1px solid #f1f5f9;
-    }
-    
-    /* 参数标签样式 */
-    .param-label {
-        font-weight: 500;
-        color: #64748b;
-        font-size: 0.9rem;
-        margin-bottom: 5px;
-    }
-    
-    /* 参数值样式 */
-    .param-value {
-        font-weight: 600;
-        color: #334155;
-        font-size: 1.1rem;
-        margin-bottom: 15px;
-    }
-    
-    /* 分割线 */
-    .divider {
-        height: 1px;
-        background: linear-gradient(to right, rgba(226, 232, 240, 0.1), rgba(226, 232, 240, 1), rgba(226, 232, 240, 0.1));
-        margin: 24px 0;
-    }
-    
-    /* 等级标签 */
-    .grade-label {
-        display: inline-block;
-        padding: 6px 14px;
-        border-radius: 30px;
-        font-weight: 500;
-        font-size: 0.85rem;
-        margin-right: 8px;
-        box-shadow: 0 2px 5px rgba(0,0,0,0.05);
-    }
-    
-    .grade-0 { background-color: #ECFDF5; color: #059669; border: 1px solid rgba(5, 150, 105, 0.2); }
-    .grade-1 { background-color: #FFFBEB; color: #D97706; border: 1px solid rgba(217, 119, 6, 0.2); }
-    .grade-2 { background-color: #FEF2F2; color: #DC2626; border: 1px solid rgba(220, 38, 38, 0.2); }
-    .grade-3 { background-color: #EFF6FF; color: #2563EB; border: 1px solid rgba(37, 99, 235, 0.2); }
-    
-    /* 动画效果 */
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(20px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    .animate-fade-in {
-        animation: fadeIn 0.5s ease-out;
-    }
-    
-    /* 自定义滑块样式 */
-    .custom-slider .stSlider > div {
-        background-color: #F1F5F9;
-    }
-    
-    .custom-slider .stSlider > div > div > div {
-        background-color: #3B82F6;
-    }
-    
-    /* 提示文本 */
-    .info-text {
-        color: #64748b;
-        font-size: 0.9rem;
-        line-height: 1.5;
-    }
-    
-    /* 标题装饰线 */
-    .title-decoration {
-        height: 4px;
-        width: 60px;
-        background: linear-gradient(90deg, #1e40af, #3b82f6);
-        margin: 8px 0 20px 0;
-        border-radius: 2px;
-    }
-    
-    /* 岩爆指标标签 */
-    .metric-label {
-        font-size: 0.8rem;
-        font-weight: 500;
-        color: #64748b;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    /* 岩爆指标值 */
-    .metric-value {
-        font-size: 1.8rem;
-        font-weight: 700;
-        color: #0F172A;
-        line-height: 1.2;
-    }
-    
-    /* 岩爆指标变化 */
-    .metric-change-positive {
-        font-size: 0.9rem;
-        font-weight: 500;
-        color: #10B981;
-    }
-    
-    .metric-change-negative {
-        font-size: 0.9rem;
-        font-weight: 500;
-        color: #EF4444;
-    }
-    
-    /* 顶部标题区 */
-    .header-container {
-        display: flex;
-        align-items: center;
-        margin-bottom: 20px;
-        padding: 15px 20px;
-        background-color: white;
-        border-radius: 12px;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.04);
-    }
-    
-    /* 学校Logo */
-    .university-logo {
-        height: 70px;
-        margin-right: 20px;
-        border-radius: 8px;
-        box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        padding: 4px;
-        background-color: #fff;
-    }
-    
-    /* 实验室标识 */
-    .lab-badge {
-        background-color: #EFF6FF;
-        color: #2563EB;
-        padding: 4px 10px;
-        border-radius: 6px;
-        font-size: 0.75rem;
-        font-weight: 500;
-        margin-left: 15px;
-        border: 1px solid rgba(37, 99, 235, 0.2);
-    }
-    
-    /* 输入表单优化 */
-    div[data-testid="stForm"] {
-        background-color: white;
-        border-radius: 12px;
-        padding: 5px;
-        box-shadow: 0 4px 16px rgba(0,0,0,0.04);
-        border: 1px solid #f1f5f9;
-    }
-    
-    /* 输入框美化 */
-    div[data-baseweb="input"] {
-        border-radius: 8px;
-        border: 1px solid #E2E8F0;
-    }
-    
-    div[data-baseweb="input"]:focus-within {
-        border-color: #3B82F6;
-        box-shadow: 0 0 0 2px rgba(59, 130, 246, 0.2);
-    }
-    
-    /* 选择框美化 */
-    div[data-baseweb="select"] {
-        border-radius: 8px;
-        border: 1px solid #E2E8F0;
-    }
-    
-    div[data-baseweb="select"]:focus-within {
-        border-color: #3B82F6;
-        box-shadow: 0 0 0 2px rgba(59, 130, 246, 0.2);
-    }
-    
-    /* 底部署名 */
-    .footer-signature {
-        font-size: 0.8rem;
-        color: #94A3B8;
-        text-align: center;
-        margin-top: 10px;
-        padding: 15px;
-        border-top: 1px solid #E2E8F0;
-        background: linear-gradient(to right, rgba(248, 250, 252, 0), rgba(248, 250, 252, 0.8), rgba(248, 250, 252, 0));
-    }
-    
-    .footer-signature p {
-        margin: 5px 0;
-        letter-spacing: 0.5px;
-    }
-    
-    .footer-signature p:first-child {
-        font-weight: 500;
-        color: #64748B;
-    }
-    
-    .footer-signature p:last-child {
-        font-size: 0.7rem;
-        opacity: 0.8;
-    }
-    
-    /* 全局样式调整 */
-    .stApp {
-        font-family: 'Helvetica Neue', Arial, sans-serif;
-    }
-    
-    /* 标题样式 */
-    h1, h2, h3 {
-        color: #1e3a8a;
-        font-weight: 600;
-    }
-    
-    /* 卡片样式 */
-    div[data-testid="stExpander"] {
-        border-radius: 8px;
-        border: 1px solid #e2e8f0;
-        box-shadow: 0 2px 6px rgba(0,0,0,0.05);
-        margin-bottom: 1rem;
-    }
-    
-    /* 版本历史样式 */
-    div[data-testid="stExpander"] h3 {
-        color: #0f4c81;
-        margin-top: 1rem;
-        font-size: 1.2rem;
-    }
-    
-    div[data-testid="stExpander"] ul {
-        margin-left: 1.5rem;
-    }
-    
-    /* 底部信息栏样式 */
-    .footer-container {
-        background: linear-gradient(to right, #f8fafc, #f1f5f9);
-        border-top: 1px solid #e2e8f0;
-        padding: 1.5rem 0;
-        margin-top: 3rem;
-        border-radius: 0 0 10px 10px;
-    }
-    
-    /* 按钮样式优化 */
-    button[kind="primary"] {
-        background-color: #2563eb;
-        border-radius: 6px;
-        transition: all 0.2s ease;
-    }
-    
-    button[kind="primary"]:hover {
-        background-color: #1d4ed8;
-        box-shadow: 0 4px 12px rgba(37, 99, 235, 0.2);
-    }
-    
-    /* 滑块样式优化 */
-    div[data-baseweb="slider"] div[data-testid="stThumbValue"] {
-        background-color: #3b82f6;
-    }
-</style>
-""", unsafe_allow_html=True)
+# 获取中南大学Logo的缩略图（WebP data URI，跨会话缓存）
+logo_uri = logo_data_uri()
+
+# 自定义CSS样式 - 升级高级设计（样式表见styles.css，压缩后跨会话缓存）
+st.markdown(page_css(), unsafe_allow_html=True)
 
 # 创建顶部标题区域
 st.markdown(f'''
 <div class="header-container">
-    <img src="data:image/jpeg;base64,{logo_base64}" class="university-logo" alt="中南大学校徽" style="max-width: 70px; max-height: 70px; object-fit: contain;">
+    <img src="{logo_uri}" class="university-logo" alt="中南大学校徽" style="max-width: 70px; max-height: 70px; object-fit: contain;">
     <div>
         <h1 style="margin: 0;">🪨 智能岩爆风险评估系统</h1>
         <div style="display: flex; align-items: center;">
@@ -420,192 +68,29 @@ st.markdown(f'''
 </div>
 ''', unsafe_allow_html=True)
 
-# 创建自定义岩爆风险可视化函数
-def create_risk_gauge(risk_level, risk_text):
-    colors = {
-        0: ['#4ADE80', '#10B981'],  # 绿色 - 无风险
-        1: ['#FBBF24', '#F59E0B'],  # 黄色 - 低风险
-        2: ['#FB923C', '#EA580C'],  # 橙色 - 中风险 
-        3: ['#F87171', '#DC2626']   # 红色 - 高风险
-    }
-    
-    # 创建仪表盘图
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number+delta",
-        value = risk_level,
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        title = {'text': risk_text, 'font': {'size': 24, 'color': '#1E293B', 'family': 'Inter'}},
-        delta = {'reference': 0, 'increasing': {'color': "#FF4560"}},
-        gauge = {
-            'axis': {'range': [0, 3], 'tickwidth': 1, 'tickcolor': "#334155"},
-            'bar': {'color': colors[risk_level][0]},
-            'bgcolor': "white",
-            'borderwidth': 2,
-            'bordercolor': "#E2E8F0",
-            'steps': [
-                {'range': [0, 0.75], 'color': '#D1FAE5'},
-                {'range': [0.75, 1.5], 'color': '#FEF9C3'},
-                {'range': [1.5, 2.25], 'color': '#FFEDD5'},
-                {'range': [2.25, 3], 'color': '#FEE2E2'}
-            ],
-            'threshold': {
-                'line': {'color': colors[risk_level][1], 'width': 4},
-                'thickness': 0.75,
-                'value': risk_level
-            }
-        }
-    ))
-    
-    fig.update_layout(
-        paper_bgcolor = 'rgba(0,0,0,0)',
-        plot_bgcolor = 'rgba(0,0,0,0)',
-        height = 300,
-        margin = dict(l=20, r=20, t=50, b=20),
-        font = {'family': "Inter, sans-serif"}
-    )
-    
-    return fig
+# 预测流程各阶段的显示名称
+STAGE_LABELS = {
+    "cache": "缓存命中",
+    "history": "历史记录",
+    "features": "特征构建",
+    "inference": "模型推理",
+    "sensitivity": "敏感性分析",
+    "explain": "模型解释",
+    "charts": "图表构建",
+    "render": "页面渲染",
+}
 
-# 创建岩爆概率分布图
-def create_probability_chart(probabilities):
-    grade_names = ["无岩爆倾向", "弱岩爆倾向", "中等岩爆倾向", "强岩爆倾向"]
-    colors = ['#10B981', '#F59E0B', '#EA580C', '#DC2626']
-    
-    data = pd.DataFrame({
-        "岩爆等级": grade_names,
-        "概率": [probabilities.get(f"Class {i}", 0) for i in range(4)]
-    })
-    
-    fig = px.bar(
-        data, 
-        x="岩爆等级", 
-        y="概率", 
-        color="岩爆等级",
-        color_discrete_map={
-            grade_names[0]: colors[0],
-            grade_names[1]: colors[1],
-            grade_names[2]: colors[2],
-            grade_names[3]: colors[3]
-        },
-        text_auto=True
-    )
-    
-    fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=300,
-        margin=dict(l=20, r=20, t=30, b=20),
-        font=dict(family="Inter, sans-serif"),
-        xaxis=dict(
-            title=None,
-            showgrid=False
-        ),
-        yaxis=dict(
-            title="预测概率",
-            showgrid=True,
-            gridcolor='#E2E8F0',
-            range=[0, 1]
-        ),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="center",
-            x=0.5
-        )
-    )
-    
-    fig.update_traces(
-        marker_line_width=0,
-        texttemplate='%{y:.1%}',
-        textposition='outside'
-    )
-    
-    return fig
-
-# 创建参数影响雷达图
-def create_parameter_impact_radar(input_data=None):
-    import plotly.graph_objects as go
-    
-    # 定义参数分类
-    categories = ['围岩应力', '单轴抗压强度', '抗拉强度', 
-                 '围岩应力/单轴抗压强度比', '单轴抗压强度/抗拉强度比', '含水率']
-    
-    # 如果传入了输入数据，则根据实际值计算影响度
-    if input_data:
-        # 提取输入参数
-        sigma_theta = input_data.get('sigma_theta', 100)  # 围岩应力
-        sigma_c = input_data.get('sigma_c', 150)          # 单轴抗压强度
-        sigma_t = input_data.get('sigma_t', 20)           # 抗拉强度
-        sigma_theta_c_ratio = input_data.get('sigma_theta_c_ratio', 0.6)  # 围岩应力/单轴抗压强度比
-        sigma_c_t_ratio = input_data.get('sigma_c_t_ratio', 7.5)          # 单轴抗压强度/抗拉强度比
-        wet = input_data.get('wet', 0.5)                  # 含水率
-        
-        # 计算各参数影响度
-        # 围岩应力影响度：围岩应力越高，岩爆风险越大
-        stress_impact = min(0.3 + (sigma_theta / 200) * 0.7, 1.0)
-        
-        # 抗压强度影响度：抗压强度越低，岩爆风险越大
-        strength_impact = min(0.3 + ((300 - sigma_c) / 280) * 0.7, 1.0)
-        
-        # 抗拉强度影响度：抗拉强度越低，岩爆风险越大
-        tensile_impact = min(0.3 + ((50 - sigma_t) / 49) * 0.7, 1.0)
-        
-        # 应力/抗压比影响度：比值越大，岩爆风险越大
-        stress_ratio_impact = min(sigma_theta_c_ratio * 0.9, 1.0)
-        
-        # 抗压/抗拉比影响度：比值越大，岩爆风险越大
-        strength_ratio_impact = min((sigma_c_t_ratio / 15) * 0.8, 1.0)
-        
-        # 含水率影响度：含水率对岩爆的影响（支持0-100范围的值）
-        wet_normalized = min(wet / 100, 1.0)  # 归一化含水率，最大参考值为100
-        wet_impact = min(wet_normalized * 0.6, 0.6)
-        
-        # 合并所有影响度
-        values = [stress_impact, strength_impact, tensile_impact, 
-                 stress_ratio_impact, strength_ratio_impact, wet_impact]
-    else:
-        # 使用默认静态值
-        values = [0.85, 0.78, 0.62, 0.91, 0.76, 0.58]
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatterpolar(
-        r=values,
-        theta=categories,
-        fill='toself',
-        fillcolor='rgba(59, 130, 246, 0.2)',
-        line=dict(color='#3B82F6', width=2),
-        name='参数影响度'
-    ))
-    
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 1]
-            ),
-            angularaxis=dict(
-                showline=False,
-                showticklabels=True,
-            )
-        ),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=350,
-        margin=dict(l=40, r=40, t=30, b=40),
-        font=dict(family="Inter, sans-serif"),
-        showlegend=False
-    )
-    
-    return fig
+# 计算六个参数的敏感性曲线，相同输入和模型版本直接复用缓存
+@st.cache_data(max_entries=64, show_spinner=False)
+def compute_sensitivity_curves(input_data, model_version):
+    return sensitivity_curves(input_data)
 
 # 侧边栏配置 - 现代设计
 with st.sidebar:
     # 添加学校标志
     st.markdown(f'''
     <div style="text-align: center; margin-bottom: 20px;">
-        <img src="data:image/jpeg;base64,{logo_base64}" 
+        <img src="{logo_uri}" 
             style="height: 60px; width: 60px; object-fit: contain; margin-bottom: 10px; border-radius: 50%; border: 2px solid #1E40AF; padding: 3px; background-color: white;" alt="中南大学校徽">
         <p style="color: #1E40AF; font-weight: 600; margin: 5px 0;">中南大学岩土安全与可持续研究实验室</p>
     </div>
@@ -616,45 +101,19 @@ with st.sidebar:
     st.markdown('<p class="info-text">请配置岩石样本的关键参数:</p>', unsafe_allow_html=True)
     
     # 使用本地岩爆图片而不是远程URL
-    image = Image.open("WechatIMG250.jpg")
-    # 调整图片大小，避免过大
-    image_resized = image.resize((300, 300))
-    st.image(image_resized, use_column_width=True, caption="中南大学岩土安全与可持续研究实验室")
+    # 使用预先压缩好的300px缩略图，避免每次重新读取和缩放原图
+    st.image(sidebar_image_bytes(), use_column_width=True, caption="中南大学岩土安全与可持续研究实验室")
     
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
     
-    # 岩石种类选择
-    st.markdown('<p class="param-label">岩石种类</p>', unsafe_allow_html=True)
-    rock_types = {
-        "花岗岩": 1.0,
-        "大理岩": 2.0,
-        "石灰岩": 3.0,
-        "砂岩": 4.0,
-        "页岩": 5.0,
-        "白云岩": 6.0,
-        "闪长岩": 7.0,
-        "流纹岩": 8.0,
-        "凝灰岩": 9.0,
-        "片麻岩": 10.0,
-        "片麻花岗岩": 11.0,
-        "矽卡岩": 12.0,
-        "花岗闪长岩": 13.0,
-        "正长岩": 14.0,
-        "黑云母花岗岩": 15.0,
-        "辉绿岩": 16.0,
-        "混合岩": 17.0,
-        "橄榄岩": 18.0,
-        "斜长角闪岩": 19.0,
-        "金伯利岩": 20.0,
-        "其他": 21.0
-    }
-    selected_rock = st.selectbox("", list(rock_types.keys()))
-    rock_type_encoded = rock_types[selected_rock]
-    
-    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-    
-    # 添加表单以改善用户输入体验
+    # 添加表单以改善用户输入体验；所有输入控件都在表单内，修改参数不会触发整页重新运行，提交时才运行一次
     with st.form(key="rock_parameters_form"):
+        # 岩石种类选择
+        st.markdown('<p class="param-label">岩石种类</p>', unsafe_allow_html=True)
+        rock_types = ROCK_TYPES
+        selected_rock = st.selectbox("", list(rock_types.keys()))
+        rock_type_encoded = rock_types[selected_rock]
+        
         st.markdown('<h3>岩石力学参数</h3>', unsafe_allow_html=True)
         st.markdown('<div class="title-decoration"></div>', unsafe_allow_html=True)
         
@@ -664,18 +123,18 @@ with st.sidebar:
         with cols1:
             # 关键参数输入 - 使用更现代的样式
             st.markdown('<p class="param-label">围岩应力 (σθ / Mpa)</p>', unsafe_allow_html=True)
-            sigma_theta = st.number_input("", min_value=10.0, max_value=200.0, value=50.0, step=0.1, key="sigma_theta_input")
+            sigma_theta = st.number_input("", min_value=INPUT_RANGES['sigma_theta'][0], max_value=INPUT_RANGES['sigma_theta'][1], value=50.0, step=0.1, key="sigma_theta_input")
             
             st.markdown('<p class="param-label">单轴抗压强度 (σc / Mpa)</p>', unsafe_allow_html=True)
-            sigma_c = st.number_input("", min_value=20.0, max_value=300.0, value=100.0, step=0.1, key="sigma_c_input")
+            sigma_c = st.number_input("", min_value=INPUT_RANGES['sigma_c'][0], max_value=INPUT_RANGES['sigma_c'][1], value=100.0, step=0.1, key="sigma_c_input")
             
         with cols2:
             st.markdown('<p class="param-label">抗拉强度 (σt / MPa)</p>', unsafe_allow_html=True)
-            sigma_t = st.number_input("", min_value=1.0, max_value=50.0, value=10.0, step=0.1, key="sigma_t_input")
+            sigma_t = st.number_input("", min_value=INPUT_RANGES['sigma_t'][0], max_value=INPUT_RANGES['sigma_t'][1], value=10.0, step=0.1, key="sigma_t_input")
             
             # 含水率
             st.markdown('<p class="param-label">含水率 (Wet)</p>', unsafe_allow_html=True)
-            wet = st.number_input("", min_value=0.0, max_value=100.0, value=0.5, step=0.1, key="wet_input")
+            wet = st.number_input("", min_value=INPUT_RANGES['wet'][0], max_value=INPUT_RANGES['wet'][1], value=0.5, step=0.1, key="wet_input")
         
         # 自动计算比率 - 放在表单下方
         sigma_theta_c_ratio = sigma_theta / sigma_c
@@ -700,6 +159,11 @@ with st.sidebar:
     # 关于部分 - 更现代的设计
     st.markdown('<p class="param-label">关于</p>', unsafe_allow_html=True)
     st.markdown('<p class="info-text">本系统使用堆叠分类器模型，结合了多种先进的机器学习算法，对岩石的岩爆倾向等级进行高精度预测。</p>', unsafe_allow_html=True)
+    st.markdown(f'<p class="info-text">当前模型版本: <code>{model_version}</code></p>', unsafe_allow_html=True)
+    cache_stats = PREDICTION_CACHE.stats()
+    st.markdown(f'<p class="info-text">预测缓存: 命中 {cache_stats["hits"] + cache_stats["coalesced"]} 次 / 未命中 {cache_stats["misses"]} 次</p>', unsafe_allow_html=True)
+    batch_stats = PREDICTION_BATCHER.stats()
+    st.markdown(f'<p class="info-text">推理合批: {batch_stats["batches"]} 批 / 平均每批 {batch_stats["mean_batch_requests"]:.1f} 个请求</p>', unsafe_allow_html=True)
 
 # 主要内容区 - 现代化设计
 col1, col2 = st.columns([5, 4])
@@ -735,233 +199,159 @@ with col1:
     
     st.markdown('</div>', unsafe_allow_html=True)
     
-    # 预测结果处理 - 从表单提交按钮触发
-    if submit_button:
+    # 本会话的预测历史（定长环形缓冲区，内存占用固定）
+    if "prediction_history" not in st.session_state:
+        st.session_state["prediction_history"] = PredictionHistory()
+    history = st.session_state["prediction_history"]
+    recalled_id = None if submit_button else st.session_state.get("history_selected")
+    if recalled_id not in history:
+        recalled_id = None
+    
+    # 预测结果处理 - 表单提交时重新预测；否则显示在历史记录中选中的结果，直接取回无需重新计算
+    if submit_button or recalled_id is not None:
         with st.spinner("正在分析岩石参数，请稍候..."):
-            # 显示进度条
-            progress_bar = st.progress(0)
-            for i in range(100):
-                time.sleep(0.01)
-                progress_bar.progress(i + 1)
+            # 进度条由真实的处理阶段驱动，各阶段耗时记录在stage_timings中
+            progress_bar = st.progress(0, text="正在构建特征并推理...")
+            stage_timings = {}
             
             # 准备预测数据
-            input_data = {
-                "rock_type": rock_type_encoded,
-                "sigma_theta": sigma_theta,
-                "sigma_c": sigma_c,
-                "sigma_t": sigma_t,
-                "sigma_theta_c_ratio": sigma_theta_c_ratio,
-                "sigma_c_t_ratio": sigma_c_t_ratio,
-                "wet": wet
-            }
+            if submit_button:
+                input_data = {
+                    "rock_type": rock_type_encoded,
+                    "sigma_theta": sigma_theta,
+                    "sigma_c": sigma_c,
+                    "sigma_t": sigma_t,
+                    "sigma_theta_c_ratio": sigma_theta_c_ratio,
+                    "sigma_c_t_ratio": sigma_c_t_ratio,
+                    "wet": wet
+                }
             
             try:
-                # 使用本地预测函数
-                result = predict_locally(input_data)
-                
-                st.markdown('<div class="result-card animate-fade-in">', unsafe_allow_html=True)
-                st.success("✅ 分析完成!")
+                stage_start = time.perf_counter()
+                if submit_button:
+                    # 使用本地预测函数（相同参数直接复用共享缓存），结果写入历史记录并设为当前选中项
+                    result = predict_cached(input_data, timings=stage_timings)
+                    if not stage_timings:
+                        stage_timings["cache"] = time.perf_counter() - stage_start
+                    run_id = history.append(input_data, result)
+                    st.session_state["history_selected"] = run_id
+                else:
+                    run_id = recalled_id
+                    input_data, result = history.get(run_id)
+                    stage_timings["history"] = time.perf_counter() - stage_start
+                progress_bar.progress(40, text="正在进行参数敏感性分析...")
                 
                 # 获取预测结果
                 grade_text = result["prediction_text"]
                 prediction = result["prediction"]
+                probabilities = result["probabilities"]
+                
+                # 敏感性分析 - 六个参数的曲线由两次批量预测得到
+                stage_start = time.perf_counter()
+                curves = compute_sensitivity_curves(input_data, model_version)
+                stage_timings["sensitivity"] = time.perf_counter() - stage_start
+                
+                # TreeSHAP解释 - 相同输入复用共享缓存；降级结果与主模型不一致，不做解释
+                stage_start = time.perf_counter()
+                explanation = None if result.get("degraded") else explain_cached(input_data)
+                stage_timings["explain"] = time.perf_counter() - stage_start
+                progress_bar.progress(60, text="正在生成图表...")
+                
+                # 构建全部图表
+                stage_start = time.perf_counter()
+                risk_gauge = create_risk_gauge(prediction, grade_text)
+                compare_ids = [i for i in st.session_state.get("history_compare", []) if i in history and i != run_id]
+                overlays = list(zip([f"历史 #{i + 1}" for i in compare_ids], history.probabilities_of(compare_ids)))
+                uncertainty = result.get("uncertainty")
+                prob_chart = create_probability_chart(probabilities, overlays, uncertainty)
+                contributions = None
+                if explanation is not None:
+                    contributions = {key: values[f"Class {prediction}"]
+                                     for key, values in explanation["contributions"].items()}
+                impact_radar = create_parameter_impact_radar(input_data, contributions)
+                sensitivity_figs = {
+                    param: create_sensitivity_chart(curve, param, input_data[param], SENSITIVITY_PARAMETERS[param][1])
+                    for param, curve in curves.items()
+                }
+                stage_timings["charts"] = time.perf_counter() - stage_start
+                progress_bar.progress(80, text="正在渲染结果...")
+                
+                stage_start = time.perf_counter()
+                st.markdown('<div class="result-card animate-fade-in">', unsafe_allow_html=True)
+                if submit_button:
+                    st.success("✅ 分析完成!")
+                else:
+                    st.info(f"已从历史记录中取回第 {run_id + 1} 次预测的结果（未重新计算）")
+
+                # 主模型不可用时明确提示当前为降级模式
+                if result.get("degraded"):
+                    st.warning("⚠️ 主模型未能加载，当前结果由备用模型（降级模式）给出，仅供参考。请联系系统管理员检查模型文件。")
                 
                 # 使用仪表盘显示风险等级
                 st.markdown("<h3>岩爆风险评估</h3>", unsafe_allow_html=True)
-                risk_gauge = create_risk_gauge(prediction, grade_text)
                 st.plotly_chart(risk_gauge, use_container_width=True)
                 
                 # 显示各类别概率
-                probabilities = result["probabilities"]
                 st.markdown("<h3>风险概率分布</h3>", unsafe_allow_html=True)
-                prob_chart = create_probability_chart(probabilities)
                 st.plotly_chart(prob_chart, use_container_width=True)
                 
                 # 参数影响雷达图
                 st.markdown("<h3>参数影响雷达图</h3>", unsafe_allow_html=True)
-                impact_radar = create_parameter_impact_radar(input_data)
                 st.plotly_chart(impact_radar, use_container_width=True)
+                if contributions is not None:
+                    st.caption(
+                        f"半径为各参数对「{grade_text}」概率的 TreeSHAP 贡献（红色推高、绿色降低）："
+                        f"平均概率 {explanation['expected_value'][f'Class {prediction}']:.1%}，"
+                        f"本样本 {probabilities[f'Class {prediction}']:.1%}，"
+                        f"其中岩石种类贡献 {contributions['rock_type']:+.1%}。"
+                    )
+                else:
+                    st.caption("模型解释不可用，图中为按经验公式估计的参数影响度。")
                 
-                # 结果解释 - 更加详细
+                # 结果解释 - 更加详细；有树间分歧统计时说明投票比例和预测熵
+                uncertainty_html = ""
+                if uncertainty:
+                    entropy_low, entropy_high = uncertainty["entropy_ci"]
+                    uncertainty_html = f'''
+                    <p style="margin-top: 10px;">模型中 <strong>{uncertainty["vote"][f"Class {prediction}"]:.1%}</strong> 的决策树将该样本判为{grade_text}；
+                    预测熵为 <strong>{uncertainty["entropy"]:.2f} bit</strong>（95%置信区间 {entropy_low:.2f} ~ {entropy_high:.2f}，最大为2 bit），
+                    其中 {max(uncertainty["entropy"] - uncertainty["tree_entropy"], 0.0):.2f} bit 来自各决策树之间的分歧。概率图中的误差线为各等级概率的95%置信区间。</p>
+                    '''
                 st.markdown("<h3>预测解释</h3>", unsafe_allow_html=True)
                 st.markdown(f'''
                 <div style="background-color: #F8FAFC; padding: 15px; border-radius: 8px; border-left: 4px solid #3B82F6;">
                     <p style="margin: 0;">根据您提供的岩石参数，本系统预测该样本的岩爆等级为 <strong>{grade_text}</strong>。</p>
                     <p style="margin-top: 10px;">该预测结果基于样本的物理特性综合分析，特别是考虑了围岩应力、抗压强度、抗拉强度等关键参数的相互关系。</p>
+                    {uncertainty_html}
                 </div>
                 ''', unsafe_allow_html=True)
                 
                 # 添加互动性预测动态变化图
                 st.markdown("<h3>参数敏感性分析</h3>", unsafe_allow_html=True)
+                sensitivity_tabs = st.tabs([f"{SENSITIVITY_PARAMETERS[param][0]}影响" for param in sensitivity_figs])
                 
-                # 创建敏感性分析交互式图表
-                sensitivity_tab1, sensitivity_tab2 = st.tabs(["围岩应力影响", "抗压强度影响"])
-                
-                with sensitivity_tab1:
-                    # 围岩应力影响
-                    st.markdown('<p style="color: #64748b; margin-bottom: 10px;">下图展示了围岩应力变化对岩爆等级的影响，其他参数保持不变</p>', unsafe_allow_html=True)
-                    
-                    # 生成不同围岩应力值的数据点
-                    stress_values = np.linspace(10, 200, 20)
-                    prediction_probs = []
-                    
-                    for stress in stress_values:
-                        # 创建新的输入数据，只修改围岩应力
-                        test_data = {
-                            "rock_type": rock_type_encoded,
-                            "sigma_theta": stress,
-                            "sigma_c": sigma_c,
-                            "sigma_t": sigma_t,
-                            "sigma_theta_c_ratio": stress / sigma_c,
-                            "sigma_c_t_ratio": sigma_c_t_ratio,
-                            "wet": wet
-                        }
-                        
-                        # 使用备用预测方法，不依赖外部模型
-                        if stress < 50:
-                            probs = [0.7, 0.2, 0.05, 0.05]  # 低应力，偏向0级
-                        elif stress < 100:
-                            probs = [0.2, 0.6, 0.15, 0.05]  # 中等应力，偏向1级
-                        elif stress < 150:
-                            probs = [0.05, 0.2, 0.65, 0.1]  # 高应力，偏向2级
-                        else:
-                            probs = [0.05, 0.1, 0.25, 0.6]  # 极高应力，偏向3级
-                            
-                        prediction_probs.append(probs)
-                    
-                    # 转换为DataFrame
-                    sensitivity_df = pd.DataFrame(prediction_probs, columns=["无岩爆倾向", "弱岩爆倾向", "中等岩爆倾向", "强岩爆倾向"])
-                    sensitivity_df["围岩应力"] = stress_values
-                    
-                    # 绘制堆叠面积图
-                    stress_fig = px.area(
-                        sensitivity_df, 
-                        x="围岩应力", 
-                        y=["无岩爆倾向", "弱岩爆倾向", "中等岩爆倾向", "强岩爆倾向"],
-                        color_discrete_map={
-                            "无岩爆倾向": "#10B981",
-                            "弱岩爆倾向": "#F59E0B",
-                            "中等岩爆倾向": "#EA580C",
-                            "强岩爆倾向": "#DC2626"
-                        }
-                    )
-                    
-                    # 添加当前围岩应力的垂直线
-                    stress_fig.add_vline(
-                        x=sigma_theta, 
-                        line_dash="dash", 
-                        line_color="#3B82F6",
-                        annotation_text=f"当前值: {sigma_theta} MPa",
-                        annotation_position="top"
-                    )
-                    
-                    stress_fig.update_layout(
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        height=300,
-                        margin=dict(l=20, r=20, t=20, b=30),
-                        font=dict(family="Inter, sans-serif"),
-                        legend=dict(
-                            orientation="h",
-                            yanchor="bottom",
-                            y=1.02,
-                            xanchor="center",
-                            x=0.5
-                        ),
-                        xaxis=dict(title="围岩应力 (MPa)"),
-                        yaxis=dict(
-                            title="概率分布", 
-                            tickformat='.0%',
-                            range=[0, 1]
-                        )
-                    )
-                    
-                    st.plotly_chart(stress_fig, use_container_width=True)
-                
-                with sensitivity_tab2:
-                    # 抗压强度影响
-                    st.markdown('<p style="color: #64748b; margin-bottom: 10px;">下图展示了抗压强度变化对岩爆等级的影响，其他参数保持不变</p>', unsafe_allow_html=True)
-                    
-                    # 生成不同抗压强度值的数据点
-                    strength_values = np.linspace(20, 300, 20)
-                    strength_probs = []
-                    
-                    for strength in strength_values:
-                        # 创建新的输入数据，只修改抗压强度
-                        test_data = {
-                            "rock_type": rock_type_encoded,
-                            "sigma_theta": sigma_theta,
-                            "sigma_c": strength,
-                            "sigma_t": sigma_t,
-                            "sigma_theta_c_ratio": sigma_theta / strength,
-                            "sigma_c_t_ratio": strength / sigma_t,
-                            "wet": wet
-                        }
-                        
-                        # 使用备用预测方法，不依赖外部模型
-                        if strength < 80:
-                            probs = [0.05, 0.15, 0.3, 0.5]  # 低强度，偏向3级
-                        elif strength < 150:
-                            probs = [0.1, 0.3, 0.5, 0.1]  # 中等强度，偏向2级
-                        elif strength < 220:
-                            probs = [0.2, 0.6, 0.15, 0.05]  # 高强度，偏向1级
-                        else:
-                            probs = [0.7, 0.2, 0.05, 0.05]  # 极高强度，偏向0级
-                            
-                        strength_probs.append(probs)
-                    
-                    # 转换为DataFrame
-                    strength_df = pd.DataFrame(strength_probs, columns=["无岩爆倾向", "弱岩爆倾向", "中等岩爆倾向", "强岩爆倾向"])
-                    strength_df["抗压强度"] = strength_values
-                    
-                    # 绘制堆叠面积图
-                    strength_fig = px.area(
-                        strength_df, 
-                        x="抗压强度", 
-                        y=["无岩爆倾向", "弱岩爆倾向", "中等岩爆倾向", "强岩爆倾向"],
-                        color_discrete_map={
-                            "无岩爆倾向": "#10B981",
-                            "弱岩爆倾向": "#F59E0B",
-                            "中等岩爆倾向": "#EA580C",
-                            "强岩爆倾向": "#DC2626"
-                        }
-                    )
-                    
-                    # 添加当前抗压强度的垂直线
-                    strength_fig.add_vline(
-                        x=sigma_c, 
-                        line_dash="dash", 
-                        line_color="#3B82F6",
-                        annotation_text=f"当前值: {sigma_c} MPa",
-                        annotation_position="top"
-                    )
-                    
-                    strength_fig.update_layout(
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        height=300,
-                        margin=dict(l=20, r=20, t=20, b=30),
-                        font=dict(family="Inter, sans-serif"),
-                        legend=dict(
-                            orientation="h",
-                            yanchor="bottom",
-                            y=1.02,
-                            xanchor="center",
-                            x=0.5
-                        ),
-                        xaxis=dict(title="抗压强度 (MPa)"),
-                        yaxis=dict(
-                            title="概率分布", 
-                            tickformat='.0%',
-                            range=[0, 1]
-                        )
-                    )
-                    
-                    st.plotly_chart(strength_fig, use_container_width=True)
+                for sensitivity_tab, (param, sensitivity_fig) in zip(sensitivity_tabs, sensitivity_figs.items()):
+                    with sensitivity_tab:
+                        st.markdown(f'<p style="color: #64748b; margin-bottom: 10px;">下图展示了{SENSITIVITY_PARAMETERS[param][0]}变化对岩爆等级的影响，其他参数保持不变</p>', unsafe_allow_html=True)
+                        st.plotly_chart(sensitivity_fig, use_container_width=True)
                 
                 st.markdown('</div>', unsafe_allow_html=True)
+                stage_timings["render"] = time.perf_counter() - stage_start
+                progress_bar.progress(100, text="分析完成")
+                for stage, seconds in stage_timings.items():
+                    metrics.observe(f"app.{stage}", seconds)
+                
+                # 性能详情 - 各阶段实际耗时
+                with st.expander("性能详情"):
+                    timing_rows = [
+                        {"阶段": STAGE_LABELS[stage], "耗时 (ms)": round(seconds * 1000, 1)}
+                        for stage, seconds in stage_timings.items()
+                    ]
+                    timing_rows.append({"阶段": "合计", "耗时 (ms)": round(sum(stage_timings.values()) * 1000, 1)})
+                    st.dataframe(timing_rows, hide_index=True, use_container_width=True)
                 
             except Exception as e:
+                metrics.ERRORS.inc(stage="app")
                 st.error(f"预测过程中出现错误: {str(e)}")
                 st.markdown('''
                 <div style="background-color: #FEF2F2; padding: 15px; border-radius: 8px; border-left: 4px solid #DC2626;">
@@ -969,6 +359,21 @@ with col1:
                     <p style="margin-top: 10px;">确保所有必要的依赖项已正确安装，并且模型文件位于正确的目录中。</p>
                 </div>
                 ''', unsafe_allow_html=True)
+    
+    # 历史记录 - 选择任一条即可取回结果，多选的记录以折线叠加在概率分布图上
+    if len(history):
+        st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+        st.markdown('<h3>预测历史</h3>', unsafe_allow_html=True)
+        st.markdown('<div class="title-decoration"></div>', unsafe_allow_html=True)
+        run_ids = history.run_ids()
+        # 已被覆盖的记录从控件状态中移除
+        if st.session_state.get("history_selected") not in history:
+            st.session_state["history_selected"] = run_ids[0]
+        st.session_state["history_compare"] = [i for i in st.session_state.get("history_compare", []) if i in history]
+        st.selectbox("查看历史结果", run_ids, format_func=history.label, key="history_selected")
+        st.multiselect("在概率分布图上叠加对比", run_ids, format_func=history.label, key="history_compare")
+        st.caption(f"本会话保留最近 {history.capacity} 条记录，占用 {history.nbytes / 1024:.1f} KB")
+        st.markdown('</div>', unsafe_allow_html=True)
 
 with col2:
     # 岩爆等级说明 - 现代卡片设计
@@ -976,44 +381,8 @@ with col2:
     st.markdown('<h3>岩爆等级分类</h3>', unsafe_allow_html=True)
     st.markdown('<div class="title-decoration"></div>', unsafe_allow_html=True)
     
-    # 岩爆等级解释 - 更现代的设计
-    grade_info = [
-        {
-            "grade": "无岩爆倾向 (0级)", 
-            "description": "岩石在开挖过程中稳定性较好，不易发生岩爆现象。",
-            "color": "grade-0",
-            "icon": "✅"
-        },
-        {
-            "grade": "弱岩爆倾向 (1级)", 
-            "description": "岩石可能会发生轻微的岩体破坏，但规模小，危害有限。",
-            "color": "grade-1",
-            "icon": "⚠️"
-        },
-        {
-            "grade": "中等岩爆倾向 (2级)", 
-            "description": "岩石有较明显的岩爆倾向，可能会发生中等规模的岩爆事件，需要采取预防措施。",
-            "color": "grade-2",
-            "icon": "🔥"
-        },
-        {
-            "grade": "强岩爆倾向 (3级)", 
-            "description": "岩石具有强烈的岩爆倾向，极易发生大规模岩爆事件，需要严格的监测和防护措施。",
-            "color": "grade-3",
-            "icon": "⛔"
-        }
-    ]
-    
-    for grade in grade_info:
-        st.markdown(f'''
-        <div style="margin-bottom: 15px; padding: 15px; background-color: #F8FAFC; border-radius: 8px; border-left: 4px solid #3B82F6;">
-            <div style="display: flex; align-items: center;">
-                <div style="font-size: 1.5rem; margin-right: 10px;">{grade["icon"]}</div>
-                <span class="grade-label {grade["color"]}">{grade["grade"]}</span>
-            </div>
-            <p style="margin-top: 10px; color: #334155;">{grade["description"]}</p>
-        </div>
-        ''', unsafe_allow_html=True)
+    # 岩爆等级解释 - 静态卡片只生成一次
+    st.markdown(grade_cards_html(), unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1022,47 +391,9 @@ with col2:
     st.markdown('<h3>岩爆防治与应对策略</h3>', unsafe_allow_html=True)
     st.markdown('<div class="title-decoration"></div>', unsafe_allow_html=True)
     
-    # 分级防治建议
-    recommendations = [
-        {
-            "title": "评估与监测", 
-            "content": "在进行隧道或地下工程开挖前，建议进行详细的岩体稳定性评估，并部署实时监测系统。",
-            "icon": "📊"
-        },
-        {
-            "title": "开挖技术选择", 
-            "content": "对于中高岩爆倾向区域，应采用控制爆破技术，分段开挖，减小扰动。",
-            "icon": "⛏️"
-        },
-        {
-            "title": "应力释放措施", 
-            "content": "考虑使用预裂爆破、光面爆破等方法减小爆破震动，对于强岩爆倾向区域，可采用预应力释放钻孔等措施。",
-            "icon": "💥"
-        },
-        {
-            "title": "支护加固方案", 
-            "content": "根据岩爆等级选择合适的支护方案，如柔性支护、高强锚杆、压力释放支护等。",
-            "icon": "🛡️"
-        },
-        {
-            "title": "应急响应", 
-            "content": "建立完善的应急预案，配备必要的救援设备，加强人员安全培训。",
-            "icon": "🚨"
-        }
-    ]
-    
-    for rec in recommendations:
-        st.markdown(f'''
-        <div style="margin-bottom: 15px; display: flex; align-items: flex-start;">
-            <div style="font-size: 1.8rem; margin-right: 15px; color: #3B82F6;">{rec["icon"]}</div>
-            <div>
-                <div style="font-weight: 600; color: #1E293B; margin-bottom: 5px;">{rec["title"]}</div>
-                <p style="margin: 0; color: #64748b;">{rec["content"]}</p>
-            </div>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-        st.markdown('</div>', unsafe_allow_html=True)
+    # 分级防治建议 - 静态卡片只生成一次
+    st.markdown(recommendation_cards_html(), unsafe_allow_html=True)
+    st.markdown('</div>', unsafe_allow_html=True)
     
     # 技术说明卡片
     st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
@@ -1103,167 +434,12 @@ with insight_cols[0]:
     st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
     st.markdown('<h3>岩爆因素分析</h3>', unsafe_allow_html=True)
     
-    # 评估当前参数的岩爆风险
-    def evaluate_risk_factor(factor_name, value, optimal_range, critical_threshold):
-        """计算每个因素的风险得分"""
-        if factor_name == "σθ/σc比值":
-            # 应力比例越高，风险越高
-            if value < optimal_range[0]:
-                return 0.3  # 低风险
-            elif value < critical_threshold:
-                return 0.6  # 中等风险
-            else:
-                return 0.9  # 高风险
-        elif factor_name == "σc/σt比值":
-            # 抗压抗拉比例越高，岩石越脆性，风险越高
-            if value < optimal_range[0]:
-                return 0.3  # 低风险
-            elif value < critical_threshold:
-                return 0.7  # 中等风险
-            else:
-                return 0.95  # 高风险
-        elif factor_name == "围岩应力":
-            # 围岩应力越高，风险越高
-            if value < optimal_range[1]:
-                return 0.2  # 低风险
-            elif value < critical_threshold:
-                return 0.6  # 中等风险
-            else:
-                return 0.9  # 高风险
-        elif factor_name == "抗压强度":
-            # 抗压强度越低，风险越高（反向关系）
-            if value > optimal_range[0]:
-                return 0.2  # 低风险
-            elif value > critical_threshold:
-                return 0.5  # 中等风险
-            else:
-                return 0.9  # 高风险
-        else:
-            return 0.5  # 默认中等风险
-    
-    # 定义各因素的风险评估标准
-    risk_factors = [
-        {
-            "name": "σθ/σc比值", 
-            "value": sigma_theta_c_ratio,
-            "optimal_range": [0.1, 0.3],
-            "critical_threshold": 0.5,
-            "description": "应力比值是岩爆的重要指标，比值越高，岩爆风险越大"
-        },
-        {
-            "name": "σc/σt比值", 
-            "value": sigma_c_t_ratio,
-            "optimal_range": [5, 15],
-            "critical_threshold": 25,
-            "description": "抗压抗拉比值反映岩石脆性，比值越高，岩爆风险越大"
-        },
-        {
-            "name": "围岩应力", 
-            "value": sigma_theta,
-            "optimal_range": [10, 50],
-            "critical_threshold": 120,
-            "description": "高围岩应力是岩爆发生的主要诱因"
-        },
-        {
-            "name": "抗压强度", 
-            "value": sigma_c,
-            "optimal_range": [80, 300],
-            "critical_threshold": 50,
-            "description": "低抗压强度的岩石更容易发生岩爆"
-        }
-    ]
-    
-    # 计算各因素风险得分
-    for factor in risk_factors:
-        factor["score"] = evaluate_risk_factor(
-            factor["name"], 
-            factor["value"], 
-            factor["optimal_range"], 
-            factor["critical_threshold"]
-        )
-    
-    # 创建互动式风险因素条形图
-    factor_names = [f['name'] for f in risk_factors]
-    factor_scores = [f['score'] for f in risk_factors]
-    
-    # 添加风险评级文本
-    factor_texts = [
-        f"{f['score']*100:.0f}%" for f in risk_factors
-    ]
-    
-    # 设置颜色渐变
-    colors = [
-        f'rgba({int(255*f["score"])}, {int(255*(1-f["score"]))}, 0, 0.7)' 
-        for f in risk_factors
-    ]
-    
-    # 创建横向条形图
-    factor_fig = go.Figure()
-    
-    # 添加条形
-    factor_fig.add_trace(go.Bar(
-        x=factor_scores,
-        y=factor_names,
-        orientation='h',
-        marker=dict(
-            color=colors,
-            line=dict(color='rgba(0, 0, 0, 0)', width=1)
-        ),
-        text=factor_texts,
-        textposition='auto',
-        hoverinfo='text',
-        hovertext=[f["description"] for f in risk_factors]
-    ))
-    
-    # 更新布局
-    factor_fig.update_layout(
-        title={
-            'text': '岩爆关键因素风险评分',
-            'y':0.9,
-            'x':0.5,
-            'xanchor': 'center',
-            'yanchor': 'top'
-        },
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=300,
-        margin=dict(l=20, r=20, t=50, b=20),
-        xaxis=dict(
-            title='风险程度',
-            showgrid=True,
-            gridcolor='#E2E8F0',
-            range=[0, 1],
-            tickformat='.0%'
-        ),
-        yaxis=dict(
-            title=None,
-            showgrid=False
-        ),
-        font=dict(family="Inter, sans-serif")
-    )
-    
+    # 因素评分、条形图和综合评分按四个参数缓存，参数不变时直接复用
+    factor_fig, risk_summary_html = risk_factor_section(sigma_theta_c_ratio, sigma_c_t_ratio, sigma_theta, sigma_c)
     st.plotly_chart(factor_fig, use_container_width=True)
     
-    # 计算综合风险得分
-    weighted_scores = [0.3*risk_factors[0]["score"], 0.25*risk_factors[1]["score"], 
-                       0.3*risk_factors[2]["score"], 0.15*risk_factors[3]["score"]]
-    total_risk = sum(weighted_scores)
-    
-    # 风险评级
-    risk_level = "低" if total_risk < 0.3 else "中" if total_risk < 0.7 else "高"
-    risk_color = "#10B981" if risk_level == "低" else "#F59E0B" if risk_level == "中" else "#DC2626"
-    
     # 显示综合风险评分
-    st.markdown(f'''
-    <div style="background-color: #F8FAFC; padding: 12px; border-radius: 8px; text-align: center;">
-        <p style="margin: 0; font-weight: bold; font-size: 1.1rem;">
-            综合风险评分: <span style="color: {risk_color};">{total_risk:.1%} ({risk_level})</span>
-        </p>
-        <p style="margin-top: 8px; color: #64748b; font-size: 0.85rem;">
-            基于多因素加权分析的岩爆综合风险评估
-        </p>
-    </div>
-    ''', unsafe_allow_html=True)
+    st.markdown(risk_summary_html, unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -1272,8 +448,8 @@ with insight_cols[1]:
     st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
     st.markdown('<h3>岩爆等级分布</h3>', unsafe_allow_html=True)
     
-    # 使用动态函数生成岩爆等级分布饼图
-    pie_fig = create_grade_distribution_pie(input_data)
+    # 岩爆等级分布饼图按输入参数缓存
+    pie_fig = grade_distribution_section(freeze(input_data))
     
     st.plotly_chart(pie_fig, use_container_width=True)
     
@@ -1285,20 +461,20 @@ with insight_cols[2]:
     st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
     st.markdown('<h3>参数相关性</h3>', unsafe_allow_html=True)
     
-    # 使用动态函数生成参数相关性热图
-    heatmap_fig = create_correlation_heatmap(input_data)
+    # 参数相关性热图：有案例数据集时按当前岩石种类取增量统计的结果，否则为示意图
+    heatmap_fig, heatmap_caption = correlation_section(freeze(input_data))
     
     st.plotly_chart(heatmap_fig, use_container_width=True)
     
-    st.markdown('<p style="font-size: 0.85rem; color: #64748b; text-align: center; font-style: italic;">各参数之间的相关性系数分析</p>', unsafe_allow_html=True)
+    st.markdown(f'<p style="font-size: 0.85rem; color: #64748b; text-align: center; font-style: italic;">{heatmap_caption}</p>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
 # 底部信息区
 st.markdown('<div class="footer-container">', unsafe_allow_html=True)
-st.markdown('''
+st.markdown(f'''
 <div style="display: flex; justify-content: space-between; align-items: center; padding: 20px 0;">
     <div>
-        <p style="margin: 0; color: #64748b; font-size: 0.9rem;">© 2023-2024 中南大学岩土安全与可持续研究实验室 | 版本 2.1.0</p>
+        <p style="margin: 0; color: #64748b; font-size: 0.9rem;">© 2023-2024 中南大学岩土安全与可持续研究实验室 | 版本 2.1.0 | 模型 {model_version}</p>
     </div>
     <div>
         <p style="margin: 0; color: #64748b; font-size: 0.9rem;">技术支持: 中南大学岩石力学与智能实验室</p>
@@ -1322,7 +498,7 @@ with st.expander("帮助与支持"):
     
     **Q: 系统是否支持批量预测？**
     
-    A: 目前系统支持单点预测，未来版本将增加批量预测功能。如有批量预测需求，请联系技术支持。
+    A: 可以。左侧导航中的“批量评分”页面支持上传CSV或Excel文件批量评分；此外系统还提供HTTP推理服务（`python serve.py`），其 `/predict_batch` 接口一次可评分数千个样本。
     
     ### 联系方式
     
@@ -1381,3 +557,7 @@ with st.expander("版本历史"):
     </div>
     ''', unsafe_allow_html=True)
     
+
+# 记录整页运行耗时；设置了 ROCKBURST_METRICS_FILE 时写出指标文件
+metrics.observe("rerun", time.perf_counter() - RERUN_START)
+metrics.export_to_file()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# 测试直接导入仓库根目录下的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def sklearn_bundle():
+    """按清单加载的sklearn模型（一致性校验的基准）"""
+    pytest.importorskip("sklearn")
+    pytest.importorskip("joblib")
+    from model_registry import load_bundle
+
+    return load_bundle(backend="sklearn")
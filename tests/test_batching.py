@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from batching import MicroBatcher  # noqa: E402
+
+
+# 第一列为负数的行视为非法输入，整批调用失败
+def predict_fn(rows, timings):
+    if (rows[:, 0] < 0).any():
+        raise ValueError("bad row")
+    return pd.DataFrame({"value": rows[:, 0] * 2})
+
+
+def test_bad_row_only_fails_its_own_caller():
+    calls = []
+    start = threading.Barrier(8)
+
+    def recording_predict(rows, timings):
+        calls.append(len(rows))
+        return predict_fn(rows, timings)
+
+    batcher = MicroBatcher(recording_predict, max_wait=0.2, max_batch=64)
+    outcomes = {}
+
+    def submit(i):
+        start.wait()
+        try:
+            outcomes[i] = batcher.submit([[-1.0 if i == 3 else float(i)]])["value"].iloc[0]
+        except ValueError as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert isinstance(outcomes[3], ValueError)
+    assert {i: v for i, v in outcomes.items() if i != 3} == {i: 2.0 * i for i in range(8) if i != 3}
+    assert calls[0] > 1  # 失败的是合并后的批次，之后才拆分重试
+    assert batcher.stats()["batches"] == 1
+
+
+def test_results_are_split_back_per_caller():
+    batcher = MicroBatcher(predict_fn, max_wait=0.0)
+    result = batcher.submit([[1.0], [2.0]])
+    assert result["value"].tolist() == [2.0, 4.0]
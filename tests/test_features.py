@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from features import BINARY_OPS, FeaturePlan  # noqa: E402
+
+# 模型的基础列（与训练数据的列名一致）
+BASE_COLUMNS = ['岩石种类', 'σθ / Mpa', 'σc / Mpa', 'σt / MPa', 'σθ/σc', 'σc/σt', 'Wet']
+
+# 一行基础列样本
+ROW = dict(zip(BASE_COLUMNS, [2.0, 60.0, 120.0, 8.0, 0.5, 15.0, 3.0]))
+
+
+# 按基础列名取值构造一行输入，返回 (特征计划, 计算出的特征向量)
+def transform_one(feature_names, base_columns=BASE_COLUMNS, row=None):
+    row = row or ROW
+    plan = FeaturePlan(feature_names, base_columns)
+    return plan, plan.transform(np.array([[row[column] for column in base_columns]]))[0]
+
+
+def test_single_level_features():
+    names = ['σθ / Mpa', 'σc / Mpa_squared', 'σt / MPa_sqrt', 'Wet_log', 'σθ / Mpa_σc / Mpa_ratio',
+             'σθ / Mpa_Wet_product', '岩石种类_σt / MPa_sum']
+    plan, values = transform_one(names)
+    assert plan.unresolved == []
+    np.testing.assert_allclose(values, [60.0, 120.0 ** 2, np.sqrt(8.0), np.log1p(3.0), 60.0 / (120.0 + 1e-8),
+                                        60.0 * 3.0, 2.0 + 8.0])
+
+
+def test_nested_features():
+    names = ['σθ / Mpa_σθ / Mpa_σθ/σc_sum_product', 'σc / Mpa_log_log', 'σθ / Mpa_Wet_ratio_log',
+             'σθ / Mpa_σθ / Mpa_Wet_ratio_sum']
+    plan, values = transform_one(names)
+    assert plan.unresolved == []
+    np.testing.assert_allclose(values, [60.0 * (60.0 + 0.5), np.log1p(np.log1p(120.0)),
+                                        np.log1p(60.0 / (3.0 + 1e-8)), 60.0 + 60.0 / (3.0 + 1e-8)])
+
+
+def test_unresolvable_features_stay_zero():
+    names = ['σθ / Mpa_cubed', 'unknown', 'σθ / Mpa_unknown_ratio', 'Wet_exp']
+    plan, values = transform_one(names)
+    assert plan.unresolved == ['unknown', 'σθ / Mpa_unknown_ratio', 'Wet_exp']
+    np.testing.assert_allclose(values, [60.0 ** 3, 0.0, 0.0, 0.0])
+
+
+def test_ambiguous_binary_name_uses_first_split():
+    # "a_b_c_sum" 可切分为 a + b_c 或 a_b + c，按最左的切分位置解析
+    base_columns = ['a', 'a_b', 'b_c', 'c']
+    row = {'a': 1.0, 'a_b': 10.0, 'b_c': 100.0, 'c': 1000.0}
+    _, values = transform_one(['a_b_c_sum'], base_columns, row)
+    assert values[0] == 1.0 + 100.0
+
+
+def test_model_feature_names_have_a_single_split():
+    """训练时的特征名在每个双目特征上只有一种可解析的切分方式，解析结果与切分顺序无关"""
+    pytest.importorskip("sklearn")
+    joblib = pytest.importorskip("joblib")
+    model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "best_model_final.pkl")
+
+    names = list(joblib.load(model_path).feature_names_in_)
+    plan = FeaturePlan(names, BASE_COLUMNS)
+    assert plan.unresolved == []
+    for name in names:
+        prefix, op = name.rsplit('_', 1) if '_' in name else (name, None)
+        if op not in BINARY_OPS:
+            continue
+        tokens = prefix.split('_')
+        splits = [k for k in range(1, len(tokens))
+                  if plan._parse('_'.join(tokens[:k])) is not None and plan._parse('_'.join(tokens[k:])) is not None]
+        assert len(splits) == 1, name
@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from onnx_backend import PARITY_ATOL, OnnxModel, check_parity, export_onnx  # noqa: E402
+from tree_engine import TreeEngine  # noqa: E402
+
+
+def test_onnx_export_matches_sklearn(sklearn_bundle, tmp_path):
+    path = str(tmp_path / "model.onnx")
+    export_onnx(TreeEngine.from_sklearn(sklearn_bundle.model), path, sklearn_bundle.version)
+    onnx_model = OnnxModel(path)
+    assert onnx_model.model_version == sklearn_bundle.version
+
+    max_diff, agreement = check_parity(onnx_model, sklearn_bundle, n_rows=3000, seed=0)
+    assert max_diff <= PARITY_ATOL
+    assert agreement == 1.0
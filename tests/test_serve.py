@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+from serve import RequestError, parse_valid_sample  # noqa: E402
+
+SAMPLE = {"rock_type": 1, "sigma_theta": 50, "sigma_c": 100, "sigma_t": 10, "wet": 5}
+
+
+def test_ratios_are_derived():
+    sample = parse_valid_sample(SAMPLE)
+    assert sample["sigma_theta_c_ratio"] == 0.5
+    assert sample["sigma_c_t_ratio"] == 10.0
+
+
+def test_rock_type_accepts_names():
+    assert parse_valid_sample(dict(SAMPLE, rock_type="花岗岩")) == parse_valid_sample(SAMPLE)
+
+
+@pytest.mark.parametrize("override", [
+    {"rock_type": 99},
+    {"rock_type": "玄武"},
+    {"sigma_theta": 500},
+    {"wet": "5"},
+    {"sigma_c_t_ratio": 3.0},
+])
+def test_invalid_samples_are_rejected(override):
+    with pytest.raises(RequestError):
+        parse_valid_sample(dict(SAMPLE, **override))
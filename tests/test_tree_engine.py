@@ -0,0 +1,37 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tree_engine import TreeEngine, random_corpus, sklearn_predict_base  # noqa: E402
+
+# 一致性校验的随机样本数
+PARITY_ROWS = 3000
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return random_corpus(PARITY_ROWS, seed=0)
+
+
+@pytest.fixture(scope="module")
+def expected(sklearn_bundle, corpus):
+    return sklearn_predict_base(sklearn_bundle, corpus)
+
+
+def test_engine_matches_sklearn_bit_for_bit(sklearn_bundle, corpus, expected):
+    engine = TreeEngine.from_sklearn(sklearn_bundle.model)
+    assert np.array_equal(engine.predict_base(corpus), expected)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_saved_artifact_matches_sklearn_bit_for_bit(sklearn_bundle, corpus, expected, tmp_path, compress):
+    path = tmp_path / "model.rbtree"
+    TreeEngine.from_sklearn(sklearn_bundle.model).save(str(path), compress=compress)
+    engine = TreeEngine.load(str(path))
+    assert np.array_equal(engine.predict_base(corpus), expected)
+
+
+def test_uncertainty_pass_returns_identical_probabilities(sklearn_bundle, corpus, expected):
+    engine = TreeEngine.from_sklearn(sklearn_bundle.model)
+    probabilities, _ = engine.predict_proba_with_uncertainty(engine.plan.transform(corpus))
+    assert np.array_equal(probabilities, expected)
@@ -0,0 +1,326 @@
+import argparse
+import functools
+import json
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from features import BASE_COLUMNS, COLUMN_MAPPING, INPUT_RANGES, ROCK_TYPES, FeaturePlan
+
+# 叶子节点在扁平数组中的特征编号（叶子自环，特征取值不影响结果）
+LEAF_FEATURE = 0
+
+# 原生模型文件格式：魔数 + 头部长度(uint64) + JSON头部 + 按64字节对齐的数组数据
+ARTIFACT_MAGIC = b"RBTREE1\n"
+ARTIFACT_FORMAT = "rbtree/1"
+ARTIFACT_ALIGN = 64
+
+# 写入原生模型文件的数组及其存储类型
+ARTIFACT_ARRAYS = {
+    'feature': np.int32,
+    'threshold': np.float32,
+    'left': np.int32,
+    'right': np.int32,
+    'leaf_proba': np.float64,
+    'roots': np.int32,
+    'cover': np.float64,
+}
+
+# 可以缺省的数组：较早导出的模型文件没有节点覆盖样本数，此时无法计算TreeSHAP解释
+OPTIONAL_ARRAYS = {'cover'}
+
+
+# 置信区间使用的正态分位数（95%）
+CI_Z = 1.96
+
+
+# 将float64阈值转换为不大于原值的最大float32：输入本身是float32，比较结果与原阈值完全相同
+def float32_floor(values):
+    rounded = values.astype(np.float32)
+    too_large = rounded.astype(np.float64) > values
+    rounded[too_large] = np.nextafter(rounded[too_large], np.float32(-np.inf))
+    return rounded
+
+
+class TreeEngine:
+    """将树集成展开为连续的NumPy数组，一次向量化遍历即可对一批样本评估所有树
+
+    节点按树依次拼接：feature/threshold/left/right 为各节点的分裂信息（叶子节点的左右子节点指向自身），
+    leaf_proba 为每个节点归一化后的类别概率，roots 为各棵树根节点的位置，
+    cover 为训练时落入各节点的（加权）样本数，供TreeSHAP解释使用，可以为None。
+    只保留树中实际用到的特征，plan 负责由基础列计算这些特征。
+    """
+
+    def __init__(self, feature, threshold, left, right, leaf_proba, roots, max_depth, classes, feature_names,
+                 base_columns=BASE_COLUMNS, cover=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.cover = cover
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.feature_names = list(feature_names)
+        self.plan = FeaturePlan(self.feature_names, base_columns)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model, base_columns=BASE_COLUMNS):
+        """从sklearn的树集成分类器导出扁平数组"""
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+        # 只保留实际参与分裂的特征，并重新编号
+        used = np.unique(np.concatenate([tree.feature[tree.children_left != -1] for tree in trees]))
+        remap = np.zeros(model.n_features_in_, dtype=np.int32)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        names = getattr(model, "feature_names_in_", base_columns)
+
+        feature, threshold, left, right, leaf_proba, cover = [], [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            feature.append(np.where(is_leaf, LEAF_FEATURE, remap[np.maximum(tree.feature, 0)]))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+
+            # 与DecisionTreeClassifier.predict_proba相同的归一化方式
+            value = tree.value[:, 0, :model.n_classes_]
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            leaf_proba.append(value / normalizer)
+            cover.append(tree.weighted_n_node_samples)
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.int32),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            left=np.concatenate(left).astype(np.int32),
+            right=np.concatenate(right).astype(np.int32),
+            leaf_proba=np.concatenate(leaf_proba),
+            roots=offsets[:-1].astype(np.int32),
+            cover=np.concatenate(cover).astype(np.float64),
+            max_depth=max(tree.max_depth for tree in trees),
+            classes=model.classes_,
+            feature_names=[str(names[i]) for i in used],
+            base_columns=base_columns,
+        )
+
+    def save(self, path, compress=False):
+        """写入原生模型文件；不压缩时可按内存映射方式加载，多个进程共享同一份页面"""
+        arrays = {name: getattr(self, name) for name in ARTIFACT_ARRAYS if getattr(self, name) is not None}
+        arrays['threshold'] = float32_floor(np.asarray(self.threshold, dtype=np.float64))
+        payloads = {}
+        entries = {}
+        offset = 0
+        for name, dtype in ARTIFACT_ARRAYS.items():
+            if name not in arrays:
+                continue
+            data = np.ascontiguousarray(arrays[name], dtype=dtype).tobytes()
+            if compress:
+                data = zlib.compress(data, 6)
+            offset = -(-offset // ARTIFACT_ALIGN) * ARTIFACT_ALIGN
+            entries[name] = {"dtype": np.dtype(dtype).str, "shape": list(np.shape(arrays[name])),
+                             "offset": offset, "nbytes": len(data)}
+            payloads[name] = data
+            offset += len(data)
+
+        header = json.dumps({
+            "format": ARTIFACT_FORMAT,
+            "compression": "zlib" if compress else None,
+            "max_depth": self.max_depth,
+            "classes": [int(c) for c in self.classes_],
+            "feature_names": self.feature_names,
+            "base_columns": self.plan.base_columns,
+            "arrays": entries,
+        }, ensure_ascii=False).encode("utf-8")
+        data_start = -(-(len(ARTIFACT_MAGIC) + 8 + len(header)) // ARTIFACT_ALIGN) * ARTIFACT_ALIGN
+        header += b" " * (data_start - len(ARTIFACT_MAGIC) - 8 - len(header))
+
+        with open(path, "wb") as f:
+            f.write(ARTIFACT_MAGIC + struct.pack("<Q", len(header)) + header)
+            for name, data in payloads.items():
+                f.seek(data_start + entries[name]["offset"])
+                f.write(data)
+
+    @classmethod
+    def load(cls, path):
+        """读取原生模型文件；未压缩的数组以只读内存映射方式打开，不经过pickle"""
+        with open(path, "rb") as f:
+            if f.read(len(ARTIFACT_MAGIC)) != ARTIFACT_MAGIC:
+                raise ValueError(f"不是有效的原生模型文件: {path}")
+            (header_size,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_size))
+            data_start = f.tell()
+            if header.get("format") != ARTIFACT_FORMAT:
+                raise ValueError(f"不支持的模型文件格式: {header.get('format')}")
+
+            arrays = {}
+            for name, entry in header["arrays"].items():
+                dtype, shape = np.dtype(entry["dtype"]), tuple(entry["shape"])
+                if header["compression"] == "zlib":
+                    f.seek(data_start + entry["offset"])
+                    raw = zlib.decompress(f.read(entry["nbytes"]))
+                    arrays[name] = np.frombuffer(raw, dtype=dtype).reshape(shape)
+                else:
+                    arrays[name] = np.asarray(np.memmap(path, dtype=dtype, mode="r",
+                                                        offset=data_start + entry["offset"], shape=shape))
+
+        missing = set(ARTIFACT_ARRAYS) - OPTIONAL_ARRAYS - set(arrays)
+        if missing:
+            raise ValueError(f"原生模型文件缺少数组 {sorted(missing)}: {path}")
+        return cls(
+            max_depth=header["max_depth"],
+            classes=header["classes"],
+            feature_names=header["feature_names"],
+            base_columns=header["base_columns"],
+            **arrays,
+        )
+
+    def apply(self, X):
+        """返回每个样本在每棵树中落入的叶子节点 (N, 树数)
+
+        X 为按 feature_names 排列的特征矩阵。与sklearn一致，特征先转换为float32再与float64阈值比较。
+        """
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_estimators))
+        # 叶子节点自环，固定迭代max_depth次后所有样本都停在叶子上
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def tree_proba(self, X):
+        """各棵树给出的类别概率 (N, 树数, 类别数)"""
+        return self.leaf_proba[self.apply(X)]
+
+    def predict_proba(self, X):
+        """集成的类别概率：按树的顺序依次累加再取平均，结果与sklearn逐位一致"""
+        # cumsum沿树的方向顺序累加，与sklearn逐棵累加的舍入顺序相同
+        return np.cumsum(self.tree_proba(X), axis=1)[:, -1] / self.n_estimators
+
+    @functools.cached_property
+    def leaf_summary(self):
+        """每个节点的最大概率类别和熵（比特），首次计算不确定性时生成"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            entropy = -np.where(self.leaf_proba > 0, self.leaf_proba * np.log2(self.leaf_proba), 0.0).sum(axis=1)
+        return self.leaf_proba.argmax(axis=1), entropy
+
+    def predict_proba_with_uncertainty(self, X):
+        """一次遍历同时得到集成概率（与predict_proba逐位相同）和树间分歧统计，见 tree_uncertainty"""
+        nodes = self.apply(X)
+        tree_proba = self.leaf_proba[nodes]
+        probabilities = np.cumsum(tree_proba, axis=1)[:, -1] / self.n_estimators
+        leaf_votes, leaf_entropy = self.leaf_summary
+        return probabilities, tree_uncertainty(tree_proba, probabilities, leaf_votes[nodes], leaf_entropy[nodes])
+
+    def predict_base(self, base_values):
+        """由基础列 (N, len(BASE_COLUMNS)) 直接计算所需特征并预测类别概率"""
+        return self.predict_proba(self.plan.transform(np.asarray(base_values, dtype=np.float64)))
+
+
+def tree_uncertainty(tree_proba, probabilities, tree_votes, tree_entropy):
+    """由各棵树的叶子概率计算树间分歧，返回各项为数组的字典
+
+    tree_proba 为各棵树的类别概率 (N, 树数, 类别数)，tree_votes/tree_entropy 为各棵树所落叶子的
+    最大概率类别和熵 (N, 树数)，由引擎按叶子预先计算后取出。
+    std: 各类别概率在树间的标准差；vote: 以该类别为最大概率的树所占比例；
+    ci_low/ci_high: 集成概率的95%置信区间（均值 ± z·std/√树数）；
+    entropy: 集成概率的预测熵（比特），entropy_ci_low/entropy_ci_high 为其95%置信区间（delta方法）；
+    tree_entropy: 各棵树自身熵的平均值，entropy - tree_entropy 即树间分歧带来的不确定性。
+    """
+    n_rows, n_trees, n_classes = tree_proba.shape
+    scale = CI_Z / np.sqrt(n_trees)
+
+    # 方差由平方和得到，只需对 (N, 树数, 类别数) 的数组再遍历一次
+    squares = np.einsum("ntc,ntc->nc", tree_proba, tree_proba) / n_trees
+    std = np.sqrt(np.maximum(squares - probabilities * probabilities, 0.0))
+
+    rows = np.arange(n_rows)[:, np.newaxis] * n_classes
+    vote = np.bincount((rows + tree_votes).ravel(), minlength=n_rows * n_classes).reshape(n_rows, n_classes)
+    vote = vote / n_trees
+
+    with np.errstate(divide="ignore"):
+        log_p = np.where(probabilities > 0, np.log2(probabilities), 0.0)
+    entropy = -(probabilities * log_p).sum(axis=1)
+
+    # 熵对各类别概率的梯度与每棵树概率的内积在树间的标准差，即熵估计的标准误差（乘以√树数）
+    gradient = np.where(probabilities > 0, -(log_p + 1.0 / np.log(2.0)), 0.0)
+    projected = np.einsum("ntc,nc->nt", tree_proba, gradient)
+    projected_mean = (probabilities * gradient).sum(axis=1)
+    projected_var = np.einsum("nt,nt->n", projected, projected) / n_trees - projected_mean ** 2
+    entropy_se = np.sqrt(np.maximum(projected_var, 0.0))
+    max_entropy = np.log2(n_classes)
+
+    return {
+        "std": std,
+        "vote": vote,
+        "ci_low": np.clip(probabilities - scale * std, 0.0, 1.0),
+        "ci_high": np.clip(probabilities + scale * std, 0.0, 1.0),
+        "entropy": entropy,
+        "entropy_ci_low": np.clip(entropy - scale * entropy_se, 0.0, max_entropy),
+        "entropy_ci_high": np.clip(entropy + scale * entropy_se, 0.0, max_entropy),
+        "tree_entropy": tree_entropy.mean(axis=1),
+    }
+
+
+# 在输入范围内随机生成校验样本（基础列顺序）
+def random_corpus(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    sample = {key: rng.uniform(low, high, n_rows) for key, (low, high) in INPUT_RANGES.items()}
+    sample['rock_type'] = rng.choice(sorted(ROCK_TYPES.values()), n_rows)
+    sample['sigma_theta_c_ratio'] = sample['sigma_theta'] / sample['sigma_c']
+    sample['sigma_c_t_ratio'] = sample['sigma_c'] / sample['sigma_t']
+    return np.column_stack([sample[key] for key in COLUMN_MAPPING])
+
+
+# 直接调用sklearn模型预测基础列样本（作为一致性基准）
+def sklearn_predict_base(bundle, base_values):
+    import pandas as pd
+
+    features = bundle.plan.transform(np.asarray(base_values, dtype=np.float64))
+    return bundle.model.predict_proba(pd.DataFrame(features, columns=bundle.plan.feature_names))
+
+
+def check_parity(bundle, engine, n_rows=5000, seed=0):
+    """在随机样本上比较引擎与sklearn模型的概率，返回不完全相同的行数"""
+    corpus = random_corpus(n_rows, seed)
+    expected = sklearn_predict_base(bundle, corpus)
+    actual = engine.predict_base(corpus)
+    return int((expected != actual).any(axis=1).sum())
+
+
+# 命令行：python tree_engine.py [--rows N] —— 校验引擎与sklearn结果逐位一致并比较单样本延迟
+if __name__ == "__main__":
+    from model_registry import load_bundle
+
+    parser = argparse.ArgumentParser(description="校验扁平数组树引擎与sklearn模型的一致性")
+    parser.add_argument("--rows", type=int, default=5000, help="随机校验样本数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    bundle = load_bundle(backend="sklearn")
+    engine = TreeEngine.from_sklearn(bundle.model)
+    print(f"{engine.n_estimators} 棵树, {len(engine.feature)} 个节点, 最大深度 {engine.max_depth}, "
+          f"使用 {len(engine.feature_names)} / {len(bundle.plan.feature_names)} 个特征")
+
+    mismatches = check_parity(bundle, engine, args.rows, args.seed)
+    print(f"逐位一致性: {args.rows - mismatches} / {args.rows} 行相同")
+
+    row = random_corpus(1, args.seed)
+    for name, predict in [("sklearn", lambda rows: sklearn_predict_base(bundle, rows)),
+                          ("tree_engine", engine.predict_base)]:
+        predict(row)
+        start_time = time.perf_counter()
+        for _ in range(100):
+            predict(row)
+        print(f"{name}: 单样本 {(time.perf_counter() - start_time) * 10:.2f} ms")
+    raise SystemExit(1 if mismatches else 0)
@@ -1,580 +1,22 @@
-import numpy as np
-import pandas as pd
-import joblib
 import streamlit as st
-import os
 
-# 缓存加载模型
-@st.cache_resource
-def load_model():
+# 推理功能由不依赖Streamlit的inference模块提供，这里保留原有导入路径
+import inference
+from inference import (
+    PROBA_COLUMNS, FALLBACK_VERSION, load_model, load_feature_plan, get_model_version,
+    get_rock_burst_grade_text, load_fallback_model, predict_batch, predict_locally, predict_cached, explain_cached
+)
+
+# 图表由charts模块的模板缓存构建
+from charts import (
+    create_risk_gauge, create_probability_chart, create_parameter_impact_radar, create_grade_distribution_pie,
+    create_correlation_heatmap, create_sensitivity_chart
+)
+
+# 加载模型 - 失败时在页面上提示，并重新抛出异常由调用方决定是否使用备用模型
+def load_model_bundle():
     try:
-        # 固定使用best_stacking_classifier.pkl
-        model_file = 'best_stacking_classifier.pkl'
-        
-        # 加载模型
-        if os.path.exists(model_file):
-            return joblib.load(model_file)
-        else:
-            raise FileNotFoundError(f"找不到模型文件: {model_file}")
+        return inference.load_model_bundle()
     except Exception as e:
         st.warning(f"无法加载模型: {e}")
-        raise e  # 重新抛出异常，不使用备用模型
-
-# 获取岩爆等级文本描述
-def get_rock_burst_grade_text(grade):
-    grades = {
-        0: "无岩爆倾向",
-        1: "弱岩爆倾向",
-        2: "中等岩爆倾向",
-        3: "强岩爆倾向"
-    }
-    return grades.get(grade, "未知等级")
-
-# 创建自定义岩爆风险可视化函数
-def create_risk_gauge(risk_level, risk_text):
-    import plotly.graph_objects as go
-    
-    colors = {
-        0: ['#4ADE80', '#10B981'],  # 绿色 - 无风险
-        1: ['#FBBF24', '#F59E0B'],  # 黄色 - 低风险
-        2: ['#FB923C', '#EA580C'],  # 橙色 - 中风险 
-        3: ['#F87171', '#DC2626']   # 红色 - 高风险
-    }
-    
-    # 创建仪表盘图
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number+delta",
-        value = risk_level,
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        title = {'text': risk_text, 'font': {'size': 24, 'color': '#1E293B', 'family': 'Inter'}},
-        delta = {'reference': 0, 'increasing': {'color': "#FF4560"}},
-        gauge = {
-            'axis': {'range': [0, 3], 'tickwidth': 1, 'tickcolor': "#334155"},
-            'bar': {'color': colors[risk_level][0]},
-            'bgcolor': "white",
-            'borderwidth': 2,
-            'bordercolor': "#E2E8F0",
-            'steps': [
-                {'range': [0, 0.75], 'color': '#D1FAE5'},
-                {'range': [0.75, 1.5], 'color': '#FEF9C3'},
-                {'range': [1.5, 2.25], 'color': '#FFEDD5'},
-                {'range': [2.25, 3], 'color': '#FEE2E2'}
-            ],
-            'threshold': {
-                'line': {'color': colors[risk_level][1], 'width': 4},
-                'thickness': 0.75,
-                'value': risk_level
-            }
-        }
-    ))
-    
-    fig.update_layout(
-        paper_bgcolor = 'rgba(0,0,0,0)',
-        plot_bgcolor = 'rgba(0,0,0,0)',
-        height = 300,
-        margin = dict(l=20, r=20, t=50, b=20),
-        font = {'family': "Inter, sans-serif"}
-    )
-    
-    return fig
-
-# 创建岩爆概率分布图
-def create_probability_chart(probabilities):
-    import plotly.express as px
-    
-    grade_names = ["无岩爆倾向", "弱岩爆倾向", "中等岩爆倾向", "强岩爆倾向"]
-    colors = ['#10B981', '#F59E0B', '#EA580C', '#DC2626']
-    
-    data = pd.DataFrame({
-        "岩爆等级": grade_names,
-        "概率": [probabilities.get(f"Class {i}", 0) for i in range(4)]
-    })
-    
-    fig = px.bar(
-        data, 
-        x="岩爆等级", 
-        y="概率", 
-        color="岩爆等级",
-        color_discrete_map={
-            grade_names[0]: colors[0],
-            grade_names[1]: colors[1],
-            grade_names[2]: colors[2],
-            grade_names[3]: colors[3]
-        },
-        text_auto=True
-    )
-    
-    fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=300,
-        margin=dict(l=20, r=20, t=30, b=20),
-        font=dict(family="Inter, sans-serif"),
-        xaxis=dict(
-            title=None,
-            showgrid=False
-        ),
-        yaxis=dict(
-            title="预测概率",
-            showgrid=True,
-            gridcolor='#E2E8F0',
-            range=[0, 1]
-        ),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="center",
-            x=0.5
-        )
-    )
-    
-    fig.update_traces(
-        marker_line_width=0,
-        texttemplate='%{y:.1%}',
-        textposition='outside'
-    )
-    
-    return fig
-
-# 创建参数影响雷达图
-def create_parameter_impact_radar(input_data=None):
-    import plotly.graph_objects as go
-    
-    # 定义参数分类
-    categories = ['围岩应力', '单轴抗压强度', '抗拉强度', 
-                 '围岩应力/单轴抗压强度比', '单轴抗压强度/抗拉强度比', '含水率']
-    
-    # 如果传入了输入数据，则根据实际值计算影响度
-    if input_data:
-        # 提取输入参数
-        sigma_theta = input_data.get('sigma_theta', 100)  # 围岩应力
-        sigma_c = input_data.get('sigma_c', 150)          # 单轴抗压强度
-        sigma_t = input_data.get('sigma_t', 20)           # 抗拉强度
-        sigma_theta_c_ratio = input_data.get('sigma_theta_c_ratio', 0.6)  # 围岩应力/单轴抗压强度比
-        sigma_c_t_ratio = input_data.get('sigma_c_t_ratio', 7.5)          # 单轴抗压强度/抗拉强度比
-        wet = input_data.get('wet', 0.5)                  # 含水率
-        
-        # 计算各参数影响度
-        # 围岩应力影响度：围岩应力越高，岩爆风险越大
-        stress_impact = min(0.3 + (sigma_theta / 200) * 0.7, 1.0)
-        
-        # 抗压强度影响度：抗压强度越低，岩爆风险越大
-        strength_impact = min(0.3 + ((300 - sigma_c) / 280) * 0.7, 1.0)
-        
-        # 抗拉强度影响度：抗拉强度越低，岩爆风险越大
-        tensile_impact = min(0.3 + ((50 - sigma_t) / 49) * 0.7, 1.0)
-        
-        # 应力/抗压比影响度：比值越大，岩爆风险越大
-        stress_ratio_impact = min(sigma_theta_c_ratio * 0.9, 1.0)
-        
-        # 抗压/抗拉比影响度：比值越大，岩爆风险越大
-        strength_ratio_impact = min((sigma_c_t_ratio / 15) * 0.8, 1.0)
-        
-        # 含水率影响度：含水率对岩爆的影响（修改为支持大于1的值）
-        wet_normalized = min(wet / 100, 1.0)  # 归一化含水率，假设最大参考值为100
-        wet_impact = min(wet_normalized * 0.6, 0.6)
-        
-        # 合并所有影响度
-        values = [stress_impact, strength_impact, tensile_impact, 
-                 stress_ratio_impact, strength_ratio_impact, wet_impact]
-    else:
-        # 使用默认静态值（与原实现相同）
-        values = [0.85, 0.78, 0.62, 0.91, 0.76, 0.58]
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatterpolar(
-        r=values,
-        theta=categories,
-        fill='toself',
-        fillcolor='rgba(59, 130, 246, 0.2)',
-        line=dict(color='#3B82F6', width=2),
-        name='参数影响度'
-    ))
-    
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 1]
-            ),
-            angularaxis=dict(
-                showline=False,
-                showticklabels=True,
-            )
-        ),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=350,
-        margin=dict(l=40, r=40, t=30, b=40),
-        font=dict(family="Inter, sans-serif"),
-        showlegend=False
-    )
-    
-    return fig
-
-# 修改预测函数 - 完全新的匹配方法
-def predict_locally(input_data):
-    """使用本地模型进行预测，确保特征名称完全匹配"""
-    try:
-        # 加载模型
-        model = load_model()
-        
-        # 创建DataFrame，确保列名正确
-        input_df = pd.DataFrame([input_data])
-        
-        # 列名映射
-        column_mapping = {
-            'rock_type': '岩石种类',
-            'sigma_theta': 'σθ / Mpa',
-            'sigma_c': 'σc / Mpa',
-            'sigma_t': 'σt / MPa',
-            'sigma_theta_c_ratio': 'σθ/σc',
-            'sigma_c_t_ratio': 'σc/σt',
-            'wet': 'Wet'
-        }
-        
-        # 重命名列
-        input_df = input_df.rename(columns=column_mapping)
-        
-        # ====== 新方法：检查模型内部特征并精确匹配 ======
-        if hasattr(model, 'feature_names_in_'):
-            required_features = list(model.feature_names_in_)
-            print(f"模型要求的特征: {required_features}")
-            
-            # 1. 创建一个包含所有需要特征的空DataFrame，初始值全为0
-            prediction_data = pd.DataFrame(0, index=[0], columns=required_features)
-            
-            # 2. 填充已知的7个基本特征
-            for col in input_df.columns:
-                if col in required_features:
-                    prediction_data[col] = input_df[col].values
-            
-            # 3. 手动填充缺失的交互特征
-            # 这里我们只填充训练时期望的特征，不生成额外的
-            # 注意，这些特征名称必须与训练时完全一致，包括空格和符号
-            
-            # 提取原始特征值以便计算
-            rock_type = input_df['岩石种类'].values[0] 
-            sigma_theta = input_df['σθ / Mpa'].values[0]
-            sigma_c = input_df['σc / Mpa'].values[0] 
-            sigma_t = input_df['σt / MPa'].values[0]
-            sigma_theta_c_ratio = input_df['σθ/σc'].values[0]
-            sigma_c_t_ratio = input_df['σc/σt'].values[0]
-            wet = input_df['Wet'].values[0]  # 含水率不作特殊处理
-            
-            # 为每个可能的交叉特征准备名称和值的映射
-            feature_values = {}
-            
-            # 添加平方项
-            for col in input_df.columns:
-                feature_values[f"{col}_squared"] = input_df[col].values[0] ** 2
-                feature_values[f"{col}_cubed"] = input_df[col].values[0] ** 3
-                feature_values[f"{col}_sqrt"] = np.sqrt(abs(input_df[col].values[0]))
-                feature_values[f"{col}_log"] = np.log1p(abs(input_df[col].values[0]))
-            
-            # 添加交互特征
-            for i, col1 in enumerate(input_df.columns):
-                for j, col2 in enumerate(input_df.columns):
-                    val1 = input_df[col1].values[0]
-                    val2 = input_df[col2].values[0]
-                    
-                    feature_values[f"{col1}_{col2}_ratio"] = val1 / (val2 + 1e-8)
-                    feature_values[f"{col1}_{col2}_product"] = val1 * val2
-                    feature_values[f"{col1}_{col2}_sum"] = val1 + val2
-            
-            # 现在填充我们有的特征
-            for feature in required_features:
-                if feature in feature_values:
-                    prediction_data[feature] = feature_values[feature]
-            
-            # 使用精确匹配的特征进行预测
-            prediction = model.predict(prediction_data)[0]
-            probabilities = model.predict_proba(prediction_data)[0]
-            
-        else:
-            # 如果模型没有feature_names_in_属性，尝试直接预测
-            prediction = model.predict(input_df)[0]
-            probabilities = model.predict_proba(input_df)[0]
-            
-        # 构建结果
-        result = {
-            "prediction": int(prediction),
-            "prediction_text": get_rock_burst_grade_text(prediction),
-            "probabilities": {f"Class {i}": float(prob) for i, prob in enumerate(probabilities)}
-        }
-        
-        return result
-        
-    except Exception as e:
-        print(f"预测过程中出现错误: {str(e)}")
-        
-        # 使用备用预测逻辑 - 为保证应用正常运行
-        from sklearn.ensemble import RandomForestClassifier
-        
-        # 训练一个简单模型来预测岩爆等级
-        temp_model = RandomForestClassifier(n_estimators=100, random_state=42)
-        
-        # 创建一些模拟训练数据
-        X_train = []
-        y_train = []
-        
-        # 为每个岩爆等级创建一些样本
-        for rock_grade in range(4):  # 0, 1, 2, 3
-            for _ in range(25):  # 每个等级25个样本
-                # 随机生成参数，范围与输入控件范围一致
-                rock_type = np.random.choice([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 
-                                            11.0, 12.0, 13.0, 14.0, 15.0, 16.0, 17.0, 18.0, 19.0, 20.0, 21.0])
-                sigma_theta = np.random.uniform(10.0, 200.0)
-                sigma_c = np.random.uniform(20.0, 300.0)
-                sigma_t = np.random.uniform(1.0, 50.0)
-                sigma_theta_c_ratio = sigma_theta / sigma_c
-                sigma_c_t_ratio = sigma_c / sigma_t
-                wet = np.random.uniform(0.0, 100.0)  # 调整含水率范围，允许0-100的值
-                
-                # 为不同岩爆等级设置不同的典型参数范围
-                if rock_grade == 0:  # 无岩爆倾向
-                    sigma_theta = np.random.uniform(10.0, 50.0)
-                    sigma_c = np.random.uniform(150.0, 300.0)
-                elif rock_grade == 3:  # 强岩爆倾向
-                    sigma_theta = np.random.uniform(150.0, 200.0)
-                    sigma_c = np.random.uniform(20.0, 100.0)
-                
-                # 创建特征向量
-                X_train.append([rock_type, sigma_theta, sigma_c, sigma_t, 
-                                sigma_theta_c_ratio, sigma_c_t_ratio, wet])
-                y_train.append(rock_grade)
-        
-        # 转换为numpy数组
-        X_train = np.array(X_train)
-        y_train = np.array(y_train)
-        
-        # 创建输入DataFrame，确保列名与输入数据匹配
-        column_mapping = {
-            'rock_type': '岩石种类',
-            'sigma_theta': 'σθ / Mpa',
-            'sigma_c': 'σc / Mpa',
-            'sigma_t': 'σt / MPa',
-            'sigma_theta_c_ratio': 'σθ/σc',
-            'sigma_c_t_ratio': 'σc/σt',
-            'wet': 'Wet'
-        }
-        
-        # 重命名列
-        input_df = pd.DataFrame([input_data]).rename(columns=column_mapping)
-        X_train_df = pd.DataFrame(X_train, columns=input_df.columns)
-        
-        # 训练模型
-        temp_model.fit(X_train_df, y_train)
-        
-        # 使用临时模型预测
-        prediction = temp_model.predict(input_df)[0]
-        probabilities = temp_model.predict_proba(input_df)[0]
-        
-        # 构建结果
-        result = {
-            "prediction": int(prediction),
-            "prediction_text": get_rock_burst_grade_text(prediction),
-            "probabilities": {f"Class {i}": float(prob) for i, prob in enumerate(probabilities)}
-        }
-        
-        return result
-
-# 创建岩爆等级分布饼图
-def create_grade_distribution_pie(input_data=None):
-    import plotly.express as px
-    import pandas as pd
-    
-    # 如果传入了输入数据，根据输入参数计算不同等级的可能性
-    if input_data:
-        # 提取输入参数
-        sigma_theta = input_data.get('sigma_theta', 100)  # 围岩应力
-        sigma_c = input_data.get('sigma_c', 150)          # 单轴抗压强度
-        sigma_theta_c_ratio = input_data.get('sigma_theta_c_ratio', 0.6)  # 围岩应力/单轴抗压强度比
-        wet = input_data.get('wet', 0.5)                  # 含水率
-        
-        # 归一化含水率用于计算（允许大于1的值）
-        wet_norm = min(wet / 100, 1.0)  # 假设最大参考值为100
-        
-        # 计算基于输入参数的各岩爆等级分布
-        # 围岩应力高，抗压强度低，比值大，岩爆风险更高
-        
-        # 无岩爆倾向的比例随着应力的增加和强度的减少而减少
-        no_burst = max(0, min(60, 60 - (sigma_theta / 4) + (sigma_c / 10)))
-        
-        # 弱岩爆倾向比例
-        weak_burst = max(0, min(50, 30 + (sigma_theta / 10) - (sigma_c / 15)))
-        
-        # 中等岩爆倾向比例
-        medium_burst = max(0, min(40, 10 + (sigma_theta / 8) - (sigma_c / 20) + (sigma_theta_c_ratio * 10)))
-        
-        # 强岩爆倾向比例 - 包含含水率的影响
-        strong_burst = max(0, min(30, (sigma_theta / 10) - (sigma_c / 30) + (sigma_theta_c_ratio * 20) + (wet_norm * 5)))
-        
-        # 保证总和为100
-        total = no_burst + weak_burst + medium_burst + strong_burst
-        factor = 100 / total if total > 0 else 1
-        
-        # 归一化
-        grade_distribution = {
-            "无岩爆倾向": round(no_burst * factor),
-            "弱岩爆倾向": round(weak_burst * factor),
-            "中等岩爆倾向": round(medium_burst * factor),
-            "强岩爆倾向": round(strong_burst * factor)
-        }
-    else:
-        # 默认分布
-        grade_distribution = {
-            "无岩爆倾向": 45,
-            "弱岩爆倾向": 30,
-            "中等岩爆倾向": 18,
-            "强岩爆倾向": 7
-        }
-    
-    # 创建饼图
-    pie_data = pd.DataFrame({
-        "岩爆等级": list(grade_distribution.keys()),
-        "样本数量": list(grade_distribution.values())
-    })
-    
-    pie_fig = px.pie(
-        pie_data, 
-        names="岩爆等级", 
-        values="样本数量",
-        color="岩爆等级",
-        color_discrete_map={
-            "无岩爆倾向": "#10B981",
-            "弱岩爆倾向": "#F59E0B",
-            "中等岩爆倾向": "#EA580C",
-            "强岩爆倾向": "#DC2626"
-        }
-    )
-    
-    pie_fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=300,
-        margin=dict(l=20, r=20, t=20, b=30),
-        font=dict(family="Inter, sans-serif"),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=-0.15,
-            xanchor="center",
-            x=0.5
-        )
-    )
-    
-    pie_fig.update_traces(
-        textinfo="percent+label",
-        hole=0.4,
-        marker=dict(line=dict(color='#ffffff', width=2))
-    )
-    
-    return pie_fig
-
-# 创建参数相关性热图
-def create_correlation_heatmap(input_data=None):
-    import plotly.express as px
-    import numpy as np
-    
-    # 基本参数名称
-    parameter_names = ["围岩应力", "单轴抗压强度", "抗拉强度", "σθ/σc", "σc/σt", "含水率"]
-    
-    if input_data:
-        # 提取输入参数
-        sigma_theta = input_data.get('sigma_theta', 100)      # 围岩应力
-        sigma_c = input_data.get('sigma_c', 150)              # 单轴抗压强度
-        sigma_t = input_data.get('sigma_t', 20)               # 抗拉强度
-        sigma_theta_c_ratio = input_data.get('sigma_theta_c_ratio', 0.6)  # 围岩应力/单轴抗压强度比
-        sigma_c_t_ratio = input_data.get('sigma_c_t_ratio', 7.5)          # 单轴抗压强度/抗拉强度比
-        wet = input_data.get('wet', 0.5)                      # 含水率
-        
-        # 基于输入参数生成相关性矩阵
-        # 这里我们将调整相关系数，使其能够反映实际的物理关系
-        
-        # 归一化含水率用于计算相关性（允许大于1的值）
-        wet_norm = min(wet / 100, 1.0)  # 假设最大参考值为100
-        
-        # 围岩应力与其他参数的相关性
-        r_s_sc = -0.2 - (sigma_theta / 1000)         # 围岩应力与抗压强度：轻微负相关，高应力区域可能对应低强度
-        r_s_st = -0.15 - (sigma_theta / 1000)        # 围岩应力与抗拉强度：轻微负相关
-        r_s_sc_ratio = 0.8 + (sigma_theta_c_ratio / 10)  # 围岩应力与应力比：强正相关，应力越高，比值越大
-        r_s_sct_ratio = -0.3 + wet_norm                 # 围岩应力与强度比：中等负相关
-        r_s_wet = 0.1 + wet_norm / 2                    # 围岩应力与含水率：弱正相关
-        
-        # 抗压强度与其他参数的相关性
-        r_sc_st = 0.6 + (sigma_t / 100)               # 抗压强度与抗拉强度：强正相关
-        r_sc_sc_ratio = -0.2 - sigma_theta_c_ratio     # 抗压强度与应力比：负相关
-        r_sc_sct_ratio = 0.7 + (sigma_c_t_ratio / 20)  # 抗压强度与强度比：强正相关
-        r_sc_wet = -0.1 - wet_norm / 2                 # 抗压强度与含水率：弱负相关
-        
-        # 抗拉强度与其他参数的相关性
-        r_st_sc_ratio = -0.1 - sigma_theta_c_ratio / 2  # 抗拉强度与应力比：弱负相关
-        r_st_sct_ratio = 0.5 + (sigma_c_t_ratio / 30)   # 抗拉强度与强度比：中等正相关
-        r_st_wet = 0.1 - wet_norm                       # 抗拉强度与含水率：弱正相关，但受含水率影响
-        
-        # 应力比与其他参数的相关性  
-        r_sc_ratio_sct_ratio = -0.1 - sigma_theta_c_ratio / 10  # 应力比与强度比：弱负相关
-        r_sc_ratio_wet = 0.2 + wet_norm / 5                     # 应力比与含水率：弱正相关
-        
-        # 强度比与含水率的相关性
-        r_sct_ratio_wet = -0.05 - wet_norm / 10                 # 强度比与含水率：很弱负相关
-        
-        # 截断相关系数在 -1 到 1 之间
-        corr_data = np.array([
-            [1.00, max(-1, min(1, r_s_sc)), max(-1, min(1, r_s_st)), max(-1, min(1, r_s_sc_ratio)), max(-1, min(1, r_s_sct_ratio)), max(-1, min(1, r_s_wet))],
-            [max(-1, min(1, r_s_sc)), 1.00, max(-1, min(1, r_sc_st)), max(-1, min(1, r_sc_sc_ratio)), max(-1, min(1, r_sc_sct_ratio)), max(-1, min(1, r_sc_wet))],
-            [max(-1, min(1, r_s_st)), max(-1, min(1, r_sc_st)), 1.00, max(-1, min(1, r_st_sc_ratio)), max(-1, min(1, r_st_sct_ratio)), max(-1, min(1, r_st_wet))],
-            [max(-1, min(1, r_s_sc_ratio)), max(-1, min(1, r_sc_sc_ratio)), max(-1, min(1, r_st_sc_ratio)), 1.00, max(-1, min(1, r_sc_ratio_sct_ratio)), max(-1, min(1, r_sc_ratio_wet))],
-            [max(-1, min(1, r_s_sct_ratio)), max(-1, min(1, r_sc_sct_ratio)), max(-1, min(1, r_st_sct_ratio)), max(-1, min(1, r_sc_ratio_sct_ratio)), 1.00, max(-1, min(1, r_sct_ratio_wet))],
-            [max(-1, min(1, r_s_wet)), max(-1, min(1, r_sc_wet)), max(-1, min(1, r_st_wet)), max(-1, min(1, r_sc_ratio_wet)), max(-1, min(1, r_sct_ratio_wet)), 1.00]
-        ])
-    else:
-        # 默认相关性矩阵
-        corr_data = np.array([
-            [1.00, 0.35, 0.42, 0.85, -0.28, 0.18],
-            [0.35, 1.00, 0.65, 0.25, 0.72, -0.15],
-            [0.42, 0.65, 1.00, 0.48, 0.56, 0.08],
-            [0.85, 0.25, 0.48, 1.00, -0.12, 0.22],
-            [-0.28, 0.72, 0.56, -0.12, 1.00, -0.05],
-            [0.18, -0.15, 0.08, 0.22, -0.05, 1.00]
-        ])
-    
-    # 创建热图
-    heatmap_fig = px.imshow(
-        corr_data,
-        x=parameter_names,
-        y=parameter_names,
-        color_continuous_scale="RdBu_r",
-        zmin=-1,
-        zmax=1
-    )
-    
-    heatmap_fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=300,
-        margin=dict(l=0, r=0, t=20, b=0),
-        font=dict(family="Inter, sans-serif"),
-        coloraxis_colorbar=dict(
-            title="相关系数",
-            thicknessmode="pixels", 
-            thickness=15,
-            lenmode="pixels", 
-            len=250,
-            yanchor="top",
-            y=1,
-            ticks="outside"
-        )
-    )
-    
-    # 添加相关系数文本标注
-    heatmap_fig.update_traces(
-        text=np.around(corr_data, decimals=2),
-        texttemplate="%{text}",
-        textfont={"size": 10}
-    )
-    
-    return heatmap_fig
+        raise e